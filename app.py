@@ -1,8 +1,9 @@
 import streamlit as st
 
+from src.db.bootstrap import ensure_bootstrapped
 from src.db.database import init_db
-from src.db.seed import seed_if_empty
 from src.ui.router import current_page, goto
+from src.ui.run_scope import run_scope
 from src.ui.pages import landing, home, unit_details, admin, matrouh_guide
 
 st.set_page_config(page_title="دليل مطروح السياحى", layout="wide")
@@ -15,24 +16,24 @@ def ensure_defaults():
 
 def main():
     init_db()
-    seed_if_empty()
+    ensure_bootstrapped()
     ensure_defaults()
 
     page = current_page()
-
-    if page == "landing":
-        landing.render()
-    elif page == "home":
-        home.render()
-    elif page == "unit":
-        unit_details.render()
-    elif page == "admin":
-        admin.render()
-    elif page == "guide":
-        matrouh_guide.render()
-    else:
-        goto("landing")
-        landing.render()
+    with run_scope():
+        if page == "landing":
+            landing.render()
+        elif page == "home":
+            home.render()
+        elif page == "unit":
+            unit_details.render()
+        elif page == "admin":
+            admin.render()
+        elif page == "guide":
+            matrouh_guide.render()
+        else:
+            goto("landing")
+            landing.render()
 
 
 if __name__ == "__main__":
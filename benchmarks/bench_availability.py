@@ -0,0 +1,154 @@
+"""Date-range availability: per-unit date parsing and SQL vs. the bitset index.
+
+    python benchmarks/bench_availability.py [--units 100000] [--days 365] [--repeat 5]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.db import database  # noqa: E402
+
+LOCATIONS = ["الساحل الشمالي", "العين السخنة", "مرسى مطروح", "الإسكندرية", "الغردقة", "رأس الحكمة"]
+TYPES = ["شقة", "منزل", "فيلا", "شاليه"]
+# (offset from today, nights)
+RANGES = [(10, 7), (40, 3), (120, 14), (300, 30)]
+
+
+def populate(n: int, days: int) -> None:
+    rng = random.Random(11)
+    today = date.today()
+    units, reservations = [], []
+    for i in range(1, n + 1):
+        uid = f"SH-{i:06d}"
+        a = rng.randint(0, days // 3)
+        b = rng.randint(days // 2, days - 1)
+        units.append(
+            (
+                uid,
+                f"وحدة {i}",
+                rng.choice(TYPES),
+                rng.choice(LOCATIONS),
+                rng.randint(1, 6),
+                (today + timedelta(days=a)).isoformat(),
+                (today + timedelta(days=b)).isoformat(),
+                1 if rng.random() < 0.9 else 0,
+            )
+        )
+        day = a
+        for _ in range(rng.randint(0, 4)):
+            day += rng.randint(3, 40)
+            nights = rng.randint(2, 10)
+            if day + nights > b:
+                break
+            reservations.append(
+                (uid, (today + timedelta(days=day)).isoformat(), (today + timedelta(days=day + nights)).isoformat())
+            )
+            day += nights
+    with database.get_conn() as conn:
+        conn.executemany(
+            "INSERT INTO units(unit_id, title, property_type, location, rooms, available_from, available_to, is_active)"
+            " VALUES(?,?,?,?,?,?,?,?)",
+            units,
+        )
+        conn.executemany(
+            "INSERT INTO unit_reservations(unit_id, start_date, end_date) VALUES(?,?,?)",
+            reservations,
+        )
+    print(f"{len(units)} units, {len(reservations)} reservations")
+
+
+def python_scan(start: date, end: date) -> int:
+    # What the app would do without the index: load everything, parse dates per unit.
+    with database.get_conn() as conn:
+        units = conn.execute("SELECT unit_id, available_from, available_to FROM units WHERE is_active=1").fetchall()
+        stays: dict[str, list] = {}
+        for r in conn.execute("SELECT unit_id, start_date, end_date FROM unit_reservations").fetchall():
+            stays.setdefault(r["unit_id"], []).append((r["start_date"], r["end_date"]))
+    free = 0
+    for u in units:
+        af = date.fromisoformat(u["available_from"]) if u["available_from"] else None
+        at = date.fromisoformat(u["available_to"]) if u["available_to"] else None
+        if (af and af > start) or (at and at < end):
+            continue
+        if any(date.fromisoformat(s) <= end and date.fromisoformat(e) >= start for s, e in stays.get(u["unit_id"], ())):
+            continue
+        free += 1
+    return free
+
+
+def sql_count(start: date, end: date) -> int:
+    with database.get_conn() as conn:
+        return int(
+            conn.execute(
+                """
+                SELECT COUNT(*) FROM units u
+                WHERE u.is_active=1
+                  AND (u.available_from='' OR u.available_from<=?)
+                  AND (u.available_to='' OR u.available_to>=?)
+                  AND NOT EXISTS (
+                    SELECT 1 FROM unit_reservations r
+                    WHERE r.unit_id=u.unit_id AND r.start_date<=? AND r.end_date>=?
+                  )
+                """,
+                (start.isoformat(), end.isoformat(), end.isoformat(), start.isoformat()),
+            ).fetchone()[0]
+        )
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    database.DB_PATH = Path(tempfile.mkdtemp()) / "bench.db"
+    database.init_db()
+    populate(args.units, args.days)
+
+    from src.db.availability import AvailabilityIndex
+    from src.db.repository import search_units
+
+    idx = AvailabilityIndex(date.today(), args.days)
+    t0 = time.perf_counter()
+    with database.get_conn() as conn:
+        idx.build(conn)
+    build_ms = (time.perf_counter() - t0) * 1000
+    print(f"index build {build_ms:.0f} ms, {idx.bits.nbytes / 1e6:.1f} MB of bits, best of {args.repeat}")
+
+    print(f"{'range':<12}{'python ms':>11}{'sql ms':>9}{'bitset ms':>11}{'page ms':>9}{'free':>8}")
+    today = date.today()
+    for offset, nights in RANGES:
+        start = today + timedelta(days=offset)
+        end = start + timedelta(days=nights)
+        py_ms = timed(lambda: python_scan(start, end), min(args.repeat, 2))
+        sql_ms = timed(lambda: sql_count(start, end), args.repeat)
+        bit_ms = timed(lambda: idx.free_mask(start, end), args.repeat)
+        page_ms = timed(
+            lambda: search_units(stay_from=start.isoformat(), stay_to=end.isoformat(), limit=30), args.repeat
+        )
+        free = int(idx.free_mask(start, end).sum())
+        assert free == sql_count(start, end) == python_scan(start, end)
+        print(f"+{offset}d/{nights}n{'':<5}{py_ms:>11.1f}{sql_ms:>9.1f}{bit_ms:>11.2f}{page_ms:>9.1f}{free:>8}")
+    database.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Catalog reads of one public page view, uncached vs. through the
+read-through cache (src/db/cache.py).
+
+    python benchmarks/bench_catalog_cache.py [--units 2000] [--views 500]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.db import database  # noqa: E402
+from src.db import repository as repo  # noqa: E402
+from src.db.cache import cache_stats  # noqa: E402
+
+
+def seed(units: int) -> None:
+    database.DB_PATH = Path(tempfile.mkdtemp()) / "cache.db"
+    database.init_db()
+    with database.transaction():
+        for i in range(units):
+            repo.create_unit(
+                {"title": f"شقة {i}", "location": "مطروح", "description": "وصف " * 40, "photo_urls": [f"https://x/{i}.jpg"]}
+            )
+        for slot in ("hero", "sidebar"):
+            repo.add_sponsor_media(slot=slot, media_kind="image", url="https://x/s.jpg")
+        cat = repo.create_guide_category("مطاعم")
+        for i in range(50):
+            repo.create_guide_item(category_id=cat, name=f"مكان {i}")
+
+
+def page_view(read) -> None:
+    # landing + home + guide, as rendered today.
+    read(repo.list_sponsor_media)
+    read(repo.list_sponsor_media)
+    read(repo.list_units)
+    read(repo.list_guide_categories)
+    read(repo.list_guide_items)
+
+
+def timed(views: int, read) -> float:
+    t0 = time.perf_counter()
+    for _ in range(views):
+        page_view(read)
+    return (time.perf_counter() - t0) * 1000 / views
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--units", type=int, default=2000)
+    ap.add_argument("--views", type=int, default=500)
+    args = ap.parse_args()
+    seed(args.units)
+    uncached = timed(args.views, lambda fn: fn.uncached(active_only=True))
+    cached = timed(args.views, lambda fn: fn(active_only=True))
+    print(f"units={args.units} views={args.views}")
+    print(f"uncached {uncached:8.3f} ms/view")
+    print(f"cached   {cached:8.3f} ms/view  ({uncached / cached:,.0f}x)")
+    print(cache_stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Home grid time-to-first-card: first page of search_units() with the
+total COUNT(*) (old grid) vs. count=False (paged grid), as the catalog grows.
+
+    python benchmarks/bench_home_grid.py [--sizes 1000 10000 100000] [--page-size 30] [--repeat 5]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.db import database  # noqa: E402
+
+LOCATIONS = ["الساحل الشمالي", "العين السخنة", "مرسى مطروح", "الإسكندرية", "الغردقة", "رأس الحكمة"]
+TYPES = ["شقة", "منزل", "فيلا", "شالية", "شاليه", "محل تجاري"]
+FILTERS = {
+    "no filter": {},
+    "location": {"location": "مرسى مطروح"},
+    "price sort": {"sort": "price_asc"},
+    "price range": {"min_price": 500, "max_price": 1500},
+}
+
+
+def populate(n: int) -> None:
+    rng = random.Random(7)
+    rows = []
+    for i in range(1, n + 1):
+        price = rng.randint(300, 3000)
+        rows.append(
+            (f"SH-{i:06d}", f"وحدة {i}", rng.choice(TYPES), rng.choice(LOCATIONS), rng.randint(1, 6), str(price), price)
+        )
+    with database.get_conn() as conn:
+        conn.executemany(
+            "INSERT INTO units(unit_id, title, property_type, location, rooms, price_day, price_day_value)"
+            " VALUES(?,?,?,?,?,?,?)",
+            rows,
+        )
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--page-size", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from src.db.repository import search_units
+
+    print(f"first page of {args.page_size}, best of {args.repeat}, ms")
+    print(f"{'units':>8}  {'filter':<12}{'with count':>12}{'paged':>10}")
+    for n in args.sizes:
+        database.close_pool()
+        database.DB_PATH = Path(tempfile.mkdtemp()) / "grid.db"
+        database.init_db()
+        populate(n)
+        for label, filters in FILTERS.items():
+            counted = timed(lambda: search_units(**filters, limit=args.page_size), args.repeat)
+            paged = timed(lambda: search_units(**filters, limit=args.page_size, count=False), args.repeat)
+            print(f"{n:>8}  {label:<12}{counted:>12.2f}{paged:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Lead writes on the request path: one INSERT + commit per click vs. the
+background batched writer.
+
+    python benchmarks/bench_lead_writer.py [--clicks 5000] [--threads 16] [--synchronous FULL]
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.db import database  # noqa: E402
+from src.db import lead_writer  # noqa: E402
+
+
+def fresh_db(name: str, synchronous: str) -> None:
+    database.close_pool()
+    database.DB_PATH = Path(tempfile.mkdtemp()) / f"{name}.db"
+    database.CONNECTION_PRAGMAS = tuple(
+        f"PRAGMA synchronous={synchronous}" if p.startswith("PRAGMA synchronous") else p
+        for p in database.CONNECTION_PRAGMAS
+    )
+    database.init_db()
+
+
+def clicks(n: int, threads: int, submit) -> list[float]:
+    latencies: list[float] = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def work(i: int) -> None:
+        mine = []
+        barrier.wait()
+        for k in range(n // threads):
+            t0 = time.perf_counter()
+            submit(unit_id="SH-0001", action="call", guest_name=f"g{i}", guest_phone=f"01{i:02d}{k:07d}", guest_residence="")
+            mine.append((time.perf_counter() - t0) * 1000)
+        with lock:
+            latencies.extend(mine)
+
+    ts = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    return latencies
+
+
+def sync_create_lead(*, unit_id: str, action: str, guest_name: str, guest_phone: str, guest_residence: str) -> None:
+    # What create_lead() did before the writer: build the row, write it inline.
+    now = time.time()
+    row = (
+        str(uuid.uuid4()),
+        time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(now)),
+        int(now * 1000),
+        unit_id,
+        action,
+        "",
+        "",
+        guest_name,
+        guest_phone,
+        guest_residence,
+        "{}",
+    )
+    lead_writer.write_lead_rows([row])
+
+
+def report(name: str, latencies: list[float], wall: float) -> None:
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    with database.get_conn() as conn:
+        rows = conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+    print(
+        f"{name:<8}{wall:>9.0f}{statistics.mean(latencies):>10.3f}{p99:>10.3f}"
+        f"{database.pool_stats()['commits']:>9}{rows:>8}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clicks", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--synchronous", default="NORMAL", choices=["OFF", "NORMAL", "FULL"])
+    args = parser.parse_args()
+
+    from src.db.repository import create_lead
+
+    print(f"{args.clicks} clicks from {args.threads} threads, synchronous={args.synchronous}")
+    print(f"{'mode':<8}{'wall ms':>9}{'mean ms':>10}{'p99 ms':>10}{'commits':>9}{'rows':>8}")
+
+    fresh_db("sync", args.synchronous)
+    t0 = time.perf_counter()
+    lat = clicks(args.clicks, args.threads, sync_create_lead)
+    report("sync", lat, (time.perf_counter() - t0) * 1000)
+
+    fresh_db("queued", args.synchronous)
+    t0 = time.perf_counter()
+    lat = clicks(args.clicks, args.threads, create_lead)
+    lead_writer.flush_leads()
+    report("queued", lat, (time.perf_counter() - t0) * 1000)
+    print(f"writer: {lead_writer.lead_writer_stats()}")
+    database.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Streamlit delta messages and serialized bytes per page, measured with
+streamlit.testing.v1.AppTest against a seeded temporary database. Bytes are
+the ForwardMsg protos the server would put on the websocket for one run.
+
+    python benchmarks/bench_page_elements.py [--units 60] [--guide-items 30] [--gallery 8]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.db import database  # noqa: E402
+
+PAGES = {
+    "landing": {"page": "landing"},
+    "home": {"page": "home", "role": "guest"},
+    "unit": {"page": "unit", "role": "guest", "unit_id": "SH-0001"},
+    "guide": {"page": "guide", "role": "guest"},
+}
+
+
+def seed(units: int, guide_items: int, gallery: int) -> None:
+    from src.db import bootstrap
+    from src.db import repository as repo
+
+    database.DB_PATH = Path(tempfile.mkdtemp()) / "pages.db"
+    bootstrap.ensure_bootstrapped()
+    with database.transaction():
+        for i in range(units):
+            repo.create_unit(
+                {
+                    "title": f"شاليه <{i}> & بحر",
+                    "location": "مرسى مطروح",
+                    "rooms": 1 + i % 4,
+                    "cover_image_url": f"https://picsum.photos/seed/u{i}/1200/800",
+                    "photo_urls": [f"https://picsum.photos/seed/u{i}-{k}/1200/800" for k in range(6)],
+                    "price_day": "1500",
+                    "price_week": "9000",
+                }
+            )
+        repo.update_unit(
+            "SH-0001",
+            {
+                "title": "شاليه",
+                "location": "مرسى مطروح",
+                "cover_image_url": "https://picsum.photos/seed/u/1200/800",
+                "photo_urls": [f"https://picsum.photos/seed/p{k}/1200/800" for k in range(12)],
+            },
+        )
+        for i in range(gallery):
+            repo.add_sponsor_media(slot="gallery", media_kind="image", url=f"https://picsum.photos/seed/g{i}/600/400")
+        cat = repo.create_guide_category("مطاعم")
+        for i in range(guide_items):
+            repo.create_guide_item(
+                category_id=cat,
+                name=f"مطعم {i}",
+                description="سمك طازج على البحر",
+                location="الكورنيش",
+                image_url=f"https://picsum.photos/seed/i{i}/1600/800",
+            )
+
+
+def measure(state: dict) -> tuple[int, int]:
+    from streamlit.testing.v1 import app_test
+
+    sent: list = []
+
+    class RecordingRunner(app_test.LocalScriptRunner):
+        def forward_msgs(self):
+            msgs = super().forward_msgs()
+            sent[:] = [m for m in msgs if m.HasField("delta")]
+            return msgs
+
+    app_test.LocalScriptRunner = RecordingRunner
+    at = app_test.AppTest.from_file(str(ROOT / "app.py"), default_timeout=60)
+    for k, v in state.items():
+        at.session_state[k] = v
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return len(sent), sum(m.ByteSize() for m in sent)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--units", type=int, default=60)
+    ap.add_argument("--guide-items", type=int, default=30)
+    ap.add_argument("--gallery", type=int, default=8)
+    args = ap.parse_args()
+    seed(args.units, args.guide_items, args.gallery)
+    print(f"{'page':<10}{'deltas':>10}{'bytes':>10}")
+    for name, state in PAGES.items():
+        deltas, size = measure(state)
+        print(f"{name:<10}{deltas:>10}{size:>10}")
+
+
+if __name__ == "__main__":
+    main()
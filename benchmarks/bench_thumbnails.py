@@ -0,0 +1,141 @@
+"""Image bytes per page: original remote images vs. the resized derivatives
+picked from srcset, served by a local HTTP stand-in that counts fetches.
+
+    python benchmarks/bench_thumbnails.py [--cards 30] [--viewport 1280] [--views 5]
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from PIL import Image, ImageDraw, ImageFilter  # noqa: E402
+
+from src.db import database  # noqa: E402
+from src.media.thumbnails import Thumbnails  # noqa: E402
+
+SIZES = [(1200, 800), (1600, 800)]
+# (label, CSS width of one card as a fraction of the viewport)
+PAGES = [("home grid (33vw)", 0.33), ("sponsor gallery (20vw)", 0.20)]
+
+
+def photo(seed: int, size: tuple[int, int]) -> bytes:
+    # Smooth shapes plus grain, so the JPEG weighs about what a real photo does.
+    rng = random.Random(seed)
+    img = Image.new("RGB", size, tuple(rng.randrange(256) for _ in range(3)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(40):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        r = rng.randrange(40, 300)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=tuple(rng.randrange(256) for _ in range(3)))
+    img = img.filter(ImageFilter.GaussianBlur(6))
+    noise = Image.effect_noise(size, 24).convert("RGB")
+    img = Image.blend(img, noise, 0.12)
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=88)
+    return buf.getvalue()
+
+
+class Origin:
+    """Stand-in for the remote image host; counts GETs per path."""
+
+    def __init__(self, images: dict[str, bytes]) -> None:
+        self.images = images
+        self.hits: dict[str, int] = {}
+        origin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                origin.hits[self.path] = origin.hits.get(self.path, 0) + 1
+                body = origin.images.get(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "image/jpeg")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}{path}"
+
+
+def pick(srcset: str, slot_px: float) -> str:
+    # What a browser does with srcset + sizes: the smallest candidate at least
+    # as wide as the slot in device pixels, else the largest one.
+    candidates = sorted((int(w.rstrip("w")), u) for u, w in (c.split() for c in srcset.split(", ")))
+    return next((u for w, u in candidates if w >= slot_px), candidates[-1][1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=30)
+    parser.add_argument("--viewport", type=int, default=1280, help="CSS px")
+    parser.add_argument("--views", type=int, default=5, help="page views after the first")
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp())
+    database.DB_PATH = tmp / "thumbs.db"
+    database.init_db()
+
+    images = {f"/img/{i}.jpg": photo(i, SIZES[i % len(SIZES)]) for i in range(args.cards)}
+    # Two more URLs serving bytes already seen: fetched, but not derived again.
+    images["/mirror/0.jpg"] = images["/img/0.jpg"]
+    images["/mirror/1.jpg"] = images["/img/1.jpg"]
+    origin = Origin(images)
+    urls = [origin.url(p) for p in images]
+
+    thumbs = Thumbnails(root=tmp / "thumbs")
+    t0 = time.perf_counter()
+    cold = [thumbs.lookup(u) for u in urls]
+    thumbs.wait()
+    fill_ms = (time.perf_counter() - t0) * 1000
+    warm = [thumbs.lookup(u) for u in urls]
+    t0 = time.perf_counter()
+    for _ in range(args.views):
+        for u in urls:
+            thumbs.lookup(u)
+    lookup_us = (time.perf_counter() - t0) / (args.views * len(urls)) * 1e6
+
+    stats = thumbs.stats()
+    print(f"{len(urls)} URLs, {len(set(map(id, images.values())))} distinct sources")
+    print(f"first view: {sum(1 for c in cold if c is None)} fell back to the original; derivatives ready in {fill_ms:.0f} ms")
+    print(f"origin GETs per URL after {args.views + 2} views: max {max(origin.hits.values())}, total {sum(origin.hits.values())}")
+    print(f"derivative sets on disk: {stats['sources']} ({stats['bytes'] / 1024:.0f} kB), lookup {lookup_us:.1f} us")
+
+    page = [(u, w) for u, w in zip(urls[: args.cards], warm[: args.cards])]
+    original = sum(len(images[u[u.index("/", 8):]]) for u, _ in page)
+    print()
+    print(f"image bytes for {args.cards} cards, viewport {args.viewport}px, kB")
+    print(f"{'page':<24}{'original':>10}{'jpg 1x':>9}{'webp 1x':>9}{'webp 2x':>9}")
+    for label, fraction in PAGES:
+        slot = args.viewport * fraction
+        row = [original]
+        for key, dpr in (("srcset", 1), ("webp_srcset", 1), ("webp_srcset", 2)):
+            total = 0
+            for _, w in page:
+                rel = pick(w[key], slot * dpr)
+                total += (thumbs.root / rel.split("/thumbs/", 1)[1]).stat().st_size
+            row.append(total)
+        print(f"{label:<24}" + "".join(f"{b / 1024:>{10 if i == 0 else 9}.0f}" for i, b in enumerate(row)))
+    origin.server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Lead inserts keyed by random UUIDv4 vs. time-ordered UUIDv7 (ids.new_id).
+
+Random keys land on random pages of the primary-key index, so inserts touch
+more pages and leave them half full; time-ordered keys append to the end.
+
+    python benchmarks/bench_time_ordered_ids.py [--rows 1000000] [--batch 5000]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.db import database  # noqa: E402
+from src.db.ids import new_id  # noqa: E402
+from src.db.lead_writer import LEAD_INSERT_SQL  # noqa: E402
+
+
+def fresh_db(name: str) -> None:
+    database.close_pool()
+    database.DB_PATH = Path(tempfile.mkdtemp()) / f"{name}.db"
+    database.init_db()
+
+
+def run(name: str, make_id, rows: int, batch: int) -> None:
+    fresh_db(name)
+    base_ms = int(time.time() * 1000) - rows
+    t0 = time.perf_counter()
+    for start in range(0, rows, batch):
+        params = []
+        for i in range(start, min(rows, start + batch)):
+            ms = base_ms + i
+            params.append((make_id(), "", ms, "SH-0001", "call", "", "", "", f"g{i}", "", "", "{}"))
+        with database.transaction() as conn:
+            conn.executemany(LEAD_INSERT_SQL, params)
+    elapsed = time.perf_counter() - t0
+    with database.get_conn() as conn:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        pk_pages = None
+        try:
+            pk_pages = conn.execute(
+                "SELECT SUM(pageno) FROM (SELECT COUNT(*) AS pageno FROM dbstat WHERE name LIKE 'sqlite_autoindex_leads%')"
+            ).fetchone()[0]
+        except Exception:
+            pass
+    database.close_pool()
+    size_mb = pages * page_size / 1e6
+    pk = f"  pk index {pk_pages * page_size / 1e6:7.1f} MB" if pk_pages else ""
+    print(f"{name:8} {rows / elapsed:10,.0f} rows/s  {elapsed:6.1f} s  file {size_mb:7.1f} MB{pk}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--batch", type=int, default=5000)
+    args = ap.parse_args()
+    run("uuid4", lambda: str(uuid.uuid4()), args.rows, args.batch)
+    run("uuid7", new_id, args.rows, args.batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Unit listings: fully hydrated dict rows (list_units) vs. the UnitCard
+projection (list_unit_cards), uncached, on a seeded catalog.
+
+    python benchmarks/bench_unit_cards.py [--units 20000] [--repeat 5]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.db import database  # noqa: E402
+from src.db import repository as repo  # noqa: E402
+
+
+def seed(units: int) -> None:
+    database.DB_PATH = Path(tempfile.mkdtemp()) / "cards.db"
+    database.init_db()
+    ids = repo.reserve_unit_ids(units)
+    rows = [
+        (
+            uid, f"شاليه {i}", "شاليه", f"منطقة {i % 40}", 1 + i % 5, "وصف طويل للعقار " * 30,
+            f"https://img.example/{i}/cover.jpg", json.dumps([f"https://img.example/{i}/{k}.jpg" for k in range(8)]),
+            "01000000000", "01000000000", "2026-06-01", "2026-09-30", str(500 + i % 900), str(3000 + i % 5000),
+            i % 7 == 0, "2026-07-01" if i % 7 == 0 else "", "2026-07-10" if i % 7 == 0 else "",
+        )
+        for i, uid in enumerate(ids)
+    ]
+    with database.transaction() as conn:
+        conn.executemany(
+            """
+            INSERT INTO units(
+              unit_id, title, property_type, location, rooms, description, cover_image_url,
+              photo_urls_json, contact_whatsapp, contact_phone, available_from, available_to,
+              price_day, price_week, is_booked, booked_from, booked_to, created_at, updated_at
+            ) VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,'','')
+            """,
+            rows,
+        )
+
+
+def measure(fn) -> tuple[float, float]:
+    times = []
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    tracemalloc.start()
+    result = fn()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return statistics.median(times), size / 1e6
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--units", type=int, default=20_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+    seed(args.units)
+    full_ms, full_mb = measure(lambda: repo.list_units.uncached(active_only=True))
+    card_ms, card_mb = measure(lambda: repo.list_unit_cards.uncached(active_only=True))
+    print(f"units={args.units}")
+    print(f"list_units       {full_ms:8.1f} ms  {full_mb:7.1f} MB")
+    print(f"list_unit_cards  {card_ms:8.1f} ms  {card_mb:7.1f} MB")
+    print(f"saved            {full_ms - card_ms:8.1f} ms  {full_mb - card_mb:7.1f} MB per call")
@@ -0,0 +1,103 @@
+"""Admin booking flow: one commit per step vs. one unit of work.
+
+    python benchmarks/bench_unit_of_work.py [--bookings 300] [--synchronous FULL]
+
+"split" is the old shape of confirming a booking: update the booking and
+commit, then update the unit status on a second checkout and commit again.
+"review_booking" does both in one transaction. "batch" confirms every
+booking inside a single database.transaction() block.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.db import database  # noqa: E402
+
+
+def setup(n: int) -> list[str]:
+    from src.db.repository import create_booking_request, create_unit
+
+    unit_ids = [create_unit({"title": f"u{i}", "location": "x"}) for i in range(n)]
+    # One guest per booking: the booking throttle allows a few requests per
+    # phone, not a whole benchmark's worth.
+    return [
+        create_booking_request(unit_id=u, guest_name="g", guest_phone=f"010{i:08d}", guest_residence="")
+        for i, u in enumerate(unit_ids)
+    ]
+
+
+def stay(i: int) -> tuple[str, str]:
+    start = date.today() + timedelta(days=30 + i % 200)
+    return start.isoformat(), (start + timedelta(days=5)).isoformat()
+
+
+def split(booking_ids: list[str]) -> None:
+    from src.db.repository import set_unit_booking_status
+
+    for i, bid in enumerate(booking_ids):
+        start, end = stay(i)
+        with database.get_conn() as conn:
+            unit_id = conn.execute("SELECT unit_id FROM bookings WHERE booking_id=?", (bid,)).fetchone()[0]
+            conn.execute(
+                "UPDATE bookings SET status='confirmed', is_new_admin=0, booked_from=?, booked_to=? WHERE booking_id=?",
+                (start, end, bid),
+            )
+        set_unit_booking_status(unit_id=unit_id, is_booked=True, booked_from=start, booked_to=end)
+
+
+def one_each(booking_ids: list[str]) -> None:
+    from src.db.repository import review_booking
+
+    for i, bid in enumerate(booking_ids):
+        start, end = stay(i)
+        review_booking(booking_id=bid, status="confirmed", booked_from=start, booked_to=end)
+
+
+def batch(booking_ids: list[str]) -> None:
+    with database.transaction():
+        one_each(booking_ids)
+
+
+def run(name: str, fn, n: int, synchronous: str) -> None:
+    database.close_pool()
+    database.DB_PATH = Path(tempfile.mkdtemp()) / f"{name}.db"
+    database.CONNECTION_PRAGMAS = tuple(
+        f"PRAGMA synchronous={synchronous}" if p.startswith("PRAGMA synchronous") else p
+        for p in database.CONNECTION_PRAGMAS
+    )
+    database.init_db()
+    booking_ids = setup(n)
+    before = database.pool_stats()["commits"]
+    t0 = time.perf_counter()
+    fn(booking_ids)
+    elapsed = (time.perf_counter() - t0) * 1000
+    commits = database.pool_stats()["commits"] - before
+    with database.get_conn() as conn:
+        confirmed = conn.execute("SELECT COUNT(*) FROM bookings WHERE status='confirmed'").fetchone()[0]
+        reserved = conn.execute("SELECT COUNT(*) FROM unit_reservations").fetchone()[0]
+    print(f"{name:<16}{elapsed:>10.1f}{elapsed / n:>12.3f}{commits:>9}{confirmed:>11}{reserved:>10}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bookings", type=int, default=300)
+    parser.add_argument("--synchronous", default="NORMAL", choices=["OFF", "NORMAL", "FULL"])
+    args = parser.parse_args()
+
+    print(f"{args.bookings} confirmations, synchronous={args.synchronous}")
+    print(f"{'flow':<16}{'total ms':>10}{'ms/booking':>12}{'commits':>9}{'confirmed':>11}{'reserved':>10}")
+    run("split", split, args.bookings, args.synchronous)
+    run("review_booking", one_each, args.bookings, args.synchronous)
+    run("batch", batch, args.bookings, args.synchronous)
+    database.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Unit search: old list_units() + Python substring loop vs. search_units() over FTS5.
+
+    python benchmarks/bench_unit_search.py [--units 50000] [--repeat 5]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.db import database  # noqa: E402
+
+LOCATIONS = ["الساحل الشمالي", "العين السخنة", "مرسى مطروح", "الإسكندرية", "الغردقة", "رأس الحكمة"]
+TYPES = ["شقة", "منزل", "فيلا", "شالية", "شاليه", "محل تجاري"]
+WORDS = ["إطلالة", "البحر", "حمام سباحة", "قريبة", "الخدمات", "مناسبة", "للعائلات", "هادئة", "مميزة", "حديقة"]
+QUERIES = ["شاليه", "الساحل", "بحر", "SH-00012", "مطروح فيلا", "حديقة"]
+
+
+def populate(n: int) -> None:
+    rng = random.Random(7)
+    rows = []
+    for i in range(1, n + 1):
+        ptype = rng.choice(TYPES)
+        loc = rng.choice(LOCATIONS)
+        rows.append(
+            (
+                f"SH-{i:06d}",
+                f"{ptype} {loc} {rng.choice(WORDS)}",
+                ptype,
+                loc,
+                rng.randint(1, 6),
+                " ".join(rng.choice(WORDS) for _ in range(25)),
+                1 if rng.random() < 0.9 else 0,
+            )
+        )
+    with database.get_conn() as conn:
+        conn.executemany(
+            "INSERT INTO units(unit_id, title, property_type, location, rooms, description, is_active)"
+            " VALUES(?,?,?,?,?,?,?)",
+            rows,
+        )
+
+
+def old_search(list_units, query: str) -> list:
+    s = query.strip().lower()
+    return [u for u in list_units(active_only=True) if s in u["title"].lower() or s in u["unit_id"].lower()]
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    database.DB_PATH = Path(tempfile.mkdtemp()) / "bench.db"
+    database.init_db()
+    populate(args.units)
+
+    from src.db.repository import list_units, search_units
+
+    print(f"{args.units} units, best of {args.repeat}")
+    print(f"{'query':<14}{'old ms':>10}{'old hits':>10}{'fts ms':>10}{'fts hits':>10}")
+    for q in QUERIES:
+        old_ms = timed(lambda: old_search(list_units, q), args.repeat)
+        new_ms = timed(lambda: search_units(search=q, limit=30), args.repeat)
+        old_hits = len(old_search(list_units, q))
+        new_hits = search_units(search=q, limit=30)["total"]
+        print(f"{q:<14}{old_ms:>10.1f}{old_hits:>10}{new_ms:>10.1f}{new_hits:>10}")
+    database.close_pool()
+
+
+if __name__ == "__main__":
+    main()
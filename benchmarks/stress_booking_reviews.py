@@ -0,0 +1,143 @@
+"""Booking reviews under contention: many threads confirm, re-date and reject
+the same bookings at once. Afterwards every confirmed booking must own
+exactly its reservation, no unit may have overlapping stays, and a unit
+shown as booked must point at a reservation that still exists.
+
+    python benchmarks/stress_booking_reviews.py [--units 20] [--bookings 10] [--reviews 4000] [--threads 16]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.db import database  # noqa: E402
+
+
+def stay(rng: random.Random) -> tuple[str, str]:
+    # Few distinct windows, so confirmations keep colliding.
+    start = date(2026, 7, 1) + timedelta(days=rng.randrange(8) * 3)
+    return start.isoformat(), (start + timedelta(days=rng.choice((1, 4)))).isoformat()
+
+
+def check(conn) -> list[str]:
+    problems = []
+    for b in conn.execute(
+        """
+        SELECT b.booking_id, b.status, b.booked_from, b.booked_to, COUNT(r.reservation_id) AS n,
+               MIN(r.start_date) AS start_date, MIN(r.end_date) AS end_date
+        FROM bookings b LEFT JOIN unit_reservations r USING(booking_id)
+        GROUP BY b.booking_id
+        """
+    ):
+        want = 1 if b["status"] == "confirmed" else 0
+        if b["n"] != want or want and (b["start_date"], b["end_date"]) != (b["booked_from"], b["booked_to"]):
+            problems.append(f"booking {b['booking_id']} {b['status']} has {b['n']} reservations")
+    for r in conn.execute(
+        """
+        SELECT a.unit_id, a.start_date, a.end_date, b.start_date AS s2, b.end_date AS e2
+        FROM unit_reservations a JOIN unit_reservations b
+          ON a.unit_id=b.unit_id AND a.reservation_id<b.reservation_id
+         AND a.start_date<=b.end_date AND b.start_date<=a.end_date
+        """
+    ):
+        problems.append(f"{r['unit_id']}: {r['start_date']}..{r['end_date']} overlaps {r['s2']}..{r['e2']}")
+    for u in conn.execute(
+        """
+        SELECT unit_id, booked_from, booked_to FROM units
+        WHERE is_booked=1 AND NOT EXISTS (
+          SELECT 1 FROM unit_reservations r
+          WHERE r.unit_id=units.unit_id AND r.start_date=units.booked_from AND r.end_date=units.booked_to
+        )
+        """
+    ):
+        problems.append(f"{u['unit_id']} shown booked {u['booked_from']}..{u['booked_to']} without a reservation")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=20)
+    parser.add_argument("--bookings", type=int, default=10, help="booking requests per unit")
+    parser.add_argument("--reviews", type=int, default=4000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    database.DB_PATH = Path(tempfile.mkdtemp()) / "stress.db"
+    database.init_db()
+
+    from src.db.repository import ReservationConflict, create_booking_request, create_unit, review_booking
+
+    booking_ids = []
+    for u in range(args.units):
+        unit_id = create_unit({"title": f"u{u}", "location": "x"})
+        for b in range(args.bookings):
+            booking_ids.append(
+                create_booking_request(unit_id=unit_id, guest_name="g", guest_phone=f"010{u:04d}{b:04d}", guest_residence="")
+            )
+
+    per_thread = args.reviews // args.threads
+    counts = {"confirmed": 0, "rejected": 0, "conflicts": 0}
+    errors: list[BaseException] = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(args.threads)
+
+    def work(i: int) -> None:
+        rng = random.Random(args.seed * 1000 + i)
+        mine = dict.fromkeys(counts, 0)
+        barrier.wait()
+        try:
+            for _ in range(per_thread):
+                booking_id = rng.choice(booking_ids)
+                if rng.random() < 0.6:
+                    start, end = stay(rng)
+                    try:
+                        review_booking(booking_id=booking_id, status="confirmed", booked_from=start, booked_to=end)
+                        mine["confirmed"] += 1
+                    except ReservationConflict:
+                        mine["conflicts"] += 1
+                else:
+                    review_booking(booking_id=booking_id, status="rejected")
+                    mine["rejected"] += 1
+        except BaseException as e:  # noqa: BLE001
+            errors.append(e)
+        with lock:
+            for k, v in mine.items():
+                counts[k] += v
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    with database.get_conn() as conn:
+        problems = check(conn)
+        booked = int(conn.execute("SELECT COUNT(*) FROM units WHERE is_booked=1").fetchone()[0])
+    print(f"{per_thread * args.threads} reviews in {elapsed:.1f} s from {args.threads} threads, {len(errors)} errors")
+    print(
+        f"confirmed: {counts['confirmed']}, rejected: {counts['rejected']}, conflicts: {counts['conflicts']}, "
+        f"units shown booked: {booked}"
+    )
+    database.close_pool()
+    for p in problems[:10]:
+        print(f"  {p}")
+    if errors:
+        print(f"first error: {errors[0]!r}")
+    ok = not errors and not problems
+    print("OK" if ok else f"FAILED ({len(problems)} inconsistencies)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,78 @@
+"""Unit code allocation under contention: many threads call create_unit() and
+reserve_unit_ids() at once; every code must be unique and the sequence must
+end exactly at the number of codes handed out.
+
+    python benchmarks/stress_unit_ids.py [--units 10000] [--threads 16] [--block 50]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.db import database  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=10_000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--block", type=int, default=50, help="size of each reserve_unit_ids() block")
+    args = parser.parse_args()
+
+    database.DB_PATH = Path(tempfile.mkdtemp()) / "stress.db"
+    database.init_db()
+
+    from src.db.repository import create_unit, reserve_unit_ids
+
+    per_thread = args.units // args.threads
+    issued: list[list[str]] = [[] for _ in range(args.threads)]
+    errors: list[BaseException] = []
+    barrier = threading.Barrier(args.threads)
+
+    def work(i: int) -> None:
+        barrier.wait()
+        try:
+            # Half the threads create units one by one, half import in blocks.
+            if i % 2 == 0:
+                for n in range(per_thread):
+                    issued[i].append(create_unit({"title": f"t{i}-{n}", "location": "x"}))
+            else:
+                done = 0
+                while done < per_thread:
+                    for unit_id in reserve_unit_ids(min(args.block, per_thread - done)):
+                        issued[i].append(create_unit({"title": f"t{i}", "location": "x"}, unit_id=unit_id))
+                        done += 1
+        except BaseException as e:  # noqa: BLE001
+            errors.append(e)
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    codes = [c for chunk in issued for c in chunk]
+    with database.get_conn() as conn:
+        rows = int(conn.execute("SELECT COUNT(*) FROM units").fetchone()[0])
+        seq = int(conn.execute("SELECT value FROM id_sequences WHERE name='units'").fetchone()[0])
+    widest = max(codes, key=len) if codes else "-"
+    print(f"{len(codes)} codes in {elapsed:.1f} s from {args.threads} threads, {len(errors)} errors")
+    print(f"unique: {len(set(codes))}, rows: {rows}, sequence: {seq}, widest: {widest}")
+    database.close_pool()
+    ok = not errors and len(set(codes)) == len(codes) == rows == seq
+    if errors:
+        print(f"first error: {errors[0]!r}")
+    print("OK" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import date, timedelta
+from typing import Iterable, Optional
+
+import numpy as np
+
+from .cache import table_generations
+from .database import get_conn
+
+# In-memory day-availability index. Each unit gets one bit per day of the
+# season window (bit set = not bookable: outside available_from/available_to
+# or covered by a unit_reservations row), packed eight days to a byte. A
+# date-range query is a vectorised AND of every unit's bits against a day
+# mask, so its cost does not depend on parsing dates per unit.
+#
+# The index is per process. Writes made through repository.py refresh the
+# affected units immediately. The index also remembers the generations of
+# units and unit_reservations it was built from (table_generations, see
+# cache.py) and is rebuilt once they move, so writes from other processes
+# show up as soon as the cache notices them. Only the first build happens on
+# a request; later ones run on a background thread while the old index keeps
+# answering, and the fresh one is swapped in once the units refreshed
+# meanwhile are re-read into it. SQL never runs under _index_lock.
+#
+# available_from/available_to bound a unit only when they hold a real
+# YYYY-MM-DD date; anything else leaves that side open. BOUND_SQL is the
+# same rule for the SQL fallback in repository.py.
+SEASON_DAYS = 400
+REBUILD_SECONDS = 300.0
+WATCHED_TABLES = ("units", "unit_reservations")
+BOUND_SQL = "date({col}, '+0 days') IS {col}"
+
+
+def _day(value: str) -> Optional[date]:
+    try:
+        return date.fromisoformat((value or "").strip())
+    except ValueError:
+        return None
+
+
+def _bound(value: str) -> Optional[date]:
+    # Strict counterpart of BOUND_SQL: no whitespace, no other ISO forms.
+    d = _day(value)
+    return d if d is not None and d.isoformat() == value else None
+
+
+class AvailabilityIndex:
+    def __init__(self, start: date, days: int = SEASON_DAYS) -> None:
+        self.start = start
+        self.days = int(days)
+        self.width = (self.days + 7) // 8
+        self.unit_ids: list[str] = []
+        self.positions: dict[str, int] = {}
+        self.bits = np.zeros((0, self.width), dtype=np.uint8)
+        self.active = np.zeros(0, dtype=bool)
+        self.built_at = 0.0
+        self.generations: tuple[int, ...] = ()
+
+    @property
+    def end(self) -> date:
+        return self.start + timedelta(days=self.days - 1)
+
+    def _offset(self, d: date) -> int:
+        return (d - self.start).days
+
+    def _blocked_rows(self, units: list, reservations: Iterable) -> np.ndarray:
+        n = len(units)
+        day_idx = np.arange(self.days, dtype=np.int32)
+        lo = np.full(n, -1, dtype=np.int32)
+        hi = np.full(n, self.days, dtype=np.int32)
+        for i, u in enumerate(units):
+            af = _bound(u["available_from"])
+            at = _bound(u["available_to"])
+            if af is not None:
+                lo[i] = self._offset(af)
+            if at is not None:
+                hi[i] = self._offset(at)
+        blocked = (day_idx[None, :] < lo[:, None]) | (day_idx[None, :] > hi[:, None])
+
+        row_of = {u["unit_id"]: i for i, u in enumerate(units)}
+        for r in reservations:
+            i = row_of.get(r["unit_id"])
+            s = _day(r["start_date"])
+            e = _day(r["end_date"])
+            if i is None or s is None or e is None:
+                continue
+            a = max(0, self._offset(s))
+            b = min(self.days - 1, self._offset(e))
+            if a <= b:
+                blocked[i, a : b + 1] = True
+        return np.packbits(blocked, axis=1) if n else np.zeros((0, self.width), dtype=np.uint8)
+
+    def build(self, conn) -> None:
+        units = conn.execute(
+            "SELECT unit_id, available_from, available_to, is_active FROM units ORDER BY unit_id"
+        ).fetchall()
+        reservations = conn.execute(
+            "SELECT unit_id, start_date, end_date FROM unit_reservations WHERE end_date>=? AND start_date<=?",
+            (self.start.isoformat(), self.end.isoformat()),
+        ).fetchall()
+        self.unit_ids = [u["unit_id"] for u in units]
+        self.positions = {uid: i for i, uid in enumerate(self.unit_ids)}
+        self.bits = self._blocked_rows(units, reservations)
+        self.active = np.array([int(u["is_active"]) == 1 for u in units], dtype=bool)
+        self.built_at = time.monotonic()
+
+    def read_units(self, conn, unit_ids: Iterable[str]) -> tuple[list[str], list, np.ndarray]:
+        # Current rows for unit_ids, to be applied with apply_units().
+        ids = sorted(set(unit_ids))
+        if not ids:
+            return ids, [], np.zeros((0, self.width), dtype=np.uint8)
+        marks = ",".join("?" for _ in ids)
+        units = conn.execute(
+            f"SELECT unit_id, available_from, available_to, is_active FROM units WHERE unit_id IN ({marks})",
+            ids,
+        ).fetchall()
+        reservations = conn.execute(
+            f"SELECT unit_id, start_date, end_date FROM unit_reservations WHERE unit_id IN ({marks})",
+            ids,
+        ).fetchall()
+        return ids, units, self._blocked_rows(units, reservations)
+
+    def apply_units(self, ids: list[str], units: list, rows: np.ndarray) -> None:
+        found = set()
+        new_ids, new_rows, new_active = [], [], []
+        for i, u in enumerate(units):
+            uid = u["unit_id"]
+            found.add(uid)
+            pos = self.positions.get(uid)
+            if pos is None:
+                new_ids.append(uid)
+                new_rows.append(rows[i])
+                new_active.append(int(u["is_active"]) == 1)
+            else:
+                self.bits[pos] = rows[i]
+                self.active[pos] = int(u["is_active"]) == 1
+        for uid in ids:
+            if uid not in found and uid in self.positions:
+                self.active[self.positions[uid]] = False
+        if new_ids:
+            for uid in new_ids:
+                self.positions[uid] = len(self.unit_ids)
+                self.unit_ids.append(uid)
+            self.bits = np.vstack([self.bits, np.array(new_rows, dtype=np.uint8)])
+            self.active = np.concatenate([self.active, np.array(new_active, dtype=bool)])
+
+    def covers(self, start: date, end: date) -> bool:
+        return self.start <= start <= end <= self.end
+
+    def free_mask(self, start: date, end: date) -> np.ndarray:
+        a = self._offset(start)
+        b = self._offset(end)
+        want = np.zeros(self.width * 8, dtype=bool)
+        want[a : b + 1] = True
+        mask = np.packbits(want)
+        lo, hi = a // 8, b // 8 + 1
+        clash = (self.bits[:, lo:hi] & mask[lo:hi]).any(axis=1)
+        return self.active & ~clash
+
+    def free_unit_ids(self, start: date, end: date) -> list[str]:
+        ids = np.asarray(self.unit_ids, dtype=object)
+        return ids[self.free_mask(start, end)].tolist()
+
+
+class FreeUnits:
+    """Membership test for the units free over a date range, answered from
+    one index snapshot without materialising the ids."""
+
+    def __init__(self, positions: dict[str, int], free: np.ndarray) -> None:
+        self._positions = positions
+        self._free = free.tolist()
+
+    def __contains__(self, unit_id: str) -> bool:
+        pos = self._positions.get(unit_id)
+        # Units appended to the index after the snapshot are not in it.
+        return pos is not None and pos < len(self._free) and self._free[pos]
+
+
+_index: Optional[AvailabilityIndex] = None
+# Guards _index, _building and _refreshed; held only for in-memory work,
+# never for SQL.
+_index_lock = threading.Lock()
+# One build at a time.
+_build_lock = threading.Lock()
+_building = False
+_refreshed: set[str] = set()
+_generation = 0
+
+
+def _rebuild() -> None:
+    global _index, _building
+    with _index_lock:
+        generation = _generation
+        _refreshed.clear()
+    try:
+        fresh = AvailabilityIndex(date.today())
+        # Read before the build: a write racing with it only makes the next
+        # check rebuild again.
+        fresh.generations = table_generations(*WATCHED_TABLES)
+        with get_conn() as conn:
+            fresh.build(conn)
+            while True:
+                # Units written while the build was reading may be missing
+                # from it; read them again before the swap.
+                with _index_lock:
+                    if generation != _generation:
+                        return
+                    pending = set(_refreshed)
+                    _refreshed.clear()
+                    if not pending:
+                        _index = fresh
+                        return
+                fresh.apply_units(*fresh.read_units(conn, pending))
+    finally:
+        with _index_lock:
+            _building = False
+            _refreshed.clear()
+
+
+def _rebuild_in_background() -> None:
+    with _build_lock:
+        _rebuild()
+
+
+def _current_index() -> Optional[AvailabilityIndex]:
+    global _building
+    generations = table_generations(*WATCHED_TABLES)
+    with _index_lock:
+        idx = _index
+        stale = idx is not None and (
+            idx.start != date.today()
+            or idx.generations != generations
+            or time.monotonic() - idx.built_at > REBUILD_SECONDS
+        )
+        if stale and not _building:
+            _building = True
+            threading.Thread(target=_rebuild_in_background, name="availability-rebuild", daemon=True).start()
+    if idx is not None:
+        return idx
+    # First use: nothing to answer from yet, so this request builds it.
+    with _build_lock:
+        with _index_lock:
+            if _index is not None:
+                return _index
+            _building = True
+        _rebuild()
+    with _index_lock:
+        return _index
+
+
+def free_unit_ids(start: str, end: str) -> Optional[list[str]]:
+    # None means the range falls outside the indexed season; callers should
+    # fall back to the SQL overlap query.
+    d1, d2 = _day(start), _day(end)
+    if d1 is None or d2 is None or d2 < d1:
+        return None
+    idx = _current_index()
+    with _index_lock:
+        if idx is None or not idx.covers(d1, d2):
+            return None
+        return idx.free_unit_ids(d1, d2)
+
+
+def free_units(start: str, end: str) -> Optional[FreeUnits]:
+    # Like free_unit_ids(), as a membership test for filtering SQL results.
+    d1, d2 = _day(start), _day(end)
+    if d1 is None or d2 is None or d2 < d1:
+        return None
+    idx = _current_index()
+    with _index_lock:
+        if idx is None or not idx.covers(d1, d2):
+            return None
+        return FreeUnits(idx.positions, idx.free_mask(d1, d2))
+
+
+def refresh_units(*unit_ids: str) -> None:
+    with _index_lock:
+        if _building:
+            _refreshed.update(unit_ids)
+        idx = _index
+    if idx is None:
+        return
+    with get_conn() as conn:
+        rows = idx.read_units(conn, unit_ids)
+    with _index_lock:
+        # A newer index was built after these writes committed.
+        if _index is idx:
+            idx.apply_units(*rows)
+
+
+def reset() -> None:
+    global _index, _generation
+    # Waits for a build in progress so it cannot outlive the reset.
+    with _build_lock, _index_lock:
+        _index = None
+        _generation += 1
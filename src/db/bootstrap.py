@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from . import database
+from .repository import get_meta, set_meta
+from .search import rebuild_units_fts
+from .seed import backfill_media_links, seed_catalog
+
+# Seeding runs once per database and is recorded in app_meta. The media
+# backfill keeps an updated_at watermark so later runs only look at units
+# that changed since the previous pass.
+SEEDED_KEY = "bootstrap.seeded_at"
+BACKFILL_WATERMARK_KEY = "bootstrap.media_backfill_watermark"
+
+_bootstrapped = False
+_bootstrap_lock = threading.Lock()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def run_bootstrap(
+    *, force_seed: bool = False, full_backfill: bool = False, reindex_search: bool = False
+) -> dict[str, str]:
+    database.init_db()
+    if reindex_search:
+        with database.transaction() as conn:
+            rebuild_units_fts(conn)
+
+    # Seeding and its marker commit together, so a crash cannot leave a
+    # half-seeded catalog that is recorded as done (or the reverse).
+    with database.transaction():
+        seeded_at = get_meta(SEEDED_KEY)
+        if force_seed or not seeded_at:
+            seed_catalog()
+            seeded_at = _now()
+            set_meta(SEEDED_KEY, seeded_at)
+
+    since = "" if full_backfill else get_meta(BACKFILL_WATERMARK_KEY)
+    watermark = backfill_media_links(since)
+    if watermark and watermark != since:
+        set_meta(BACKFILL_WATERMARK_KEY, watermark)
+
+    return {"seeded_at": seeded_at, "media_backfill_watermark": watermark}
+
+
+def ensure_bootstrapped() -> None:
+    global _bootstrapped
+    if _bootstrapped:
+        return
+    with _bootstrap_lock:
+        if _bootstrapped:
+            return
+        run_bootstrap()
+        _bootstrapped = True
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.db.bootstrap",
+        description="Apply migrations, seed an empty catalog and backfill missing media links.",
+    )
+    parser.add_argument("--db", type=Path, help="database file (defaults to data/app.db)")
+    parser.add_argument("--force-seed", action="store_true", help="re-run seeding even if already recorded")
+    parser.add_argument("--full-backfill", action="store_true", help="scan every unit, ignoring the watermark")
+    parser.add_argument(
+        "--reindex-search", action="store_true", help="rebuild the unit search index from the units table"
+    )
+    args = parser.parse_args(argv)
+
+    if args.db:
+        database.close_pool()
+        database.DB_PATH = args.db.resolve()
+
+    result = run_bootstrap(
+        force_seed=args.force_seed, full_backfill=args.full_backfill, reindex_search=args.reindex_search
+    )
+    print(f"database: {database.DB_PATH}")
+    for key, value in result.items():
+        print(f"{key}: {value or '-'}")
+    database.close_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import functools
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Optional
+
+from . import database
+
+# Read-through cache for near-static catalog reads (units, sponsor media,
+# guide). Each entry remembers the generations of the tables it was read
+# from; triggers bump table_generations on every write (migration 0014), so
+# an entry is valid while those generations are unchanged.
+#
+# Checking generations costs SQL, so it is done at most once per
+# CACHE_CHECK_SECONDS, and sooner only when this process has committed
+# since the last check. A check first asks a dedicated watcher connection
+# for PRAGMA data_version, which changes only when some other connection
+# (in this or another process) has committed; the generations table is read
+# only then. Between checks a hit costs no SQL, so another process's write
+# shows up here within CACHE_CHECK_SECONDS.
+#
+# Cached rows are shared between callers, so they are frozen once when
+# loaded: dicts become read-only MappingProxyType views and lists become
+# tuples (UnitCard is a tuple already). Each call gets its own outer list.
+CACHE_CHECK_SECONDS = 1.0
+CACHE_MAX_ENTRIES = 256
+
+
+class ReadCache:
+    def __init__(self, check_seconds: float = CACHE_CHECK_SECONDS, max_entries: int = CACHE_MAX_ENTRIES) -> None:
+        self.check_seconds = check_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: dict[tuple, tuple[tuple[int, ...], Any]] = {}
+        self._generations: dict[str, int] = {}
+        self._watch: Optional[sqlite3.Connection] = None
+        self._watch_path: Optional[Path] = None
+        self._data_version: Optional[int] = None
+        self._commits = -1
+        self._checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.checks = 0
+        self.reads = 0
+
+    def _open_watch(self, path: Path) -> None:
+        if self._watch is not None:
+            self._watch.close()
+        self._watch = sqlite3.connect(path, check_same_thread=False)
+        self._watch.execute("PRAGMA busy_timeout=5000")
+        self._watch_path = path
+        self._data_version = None
+        self._generations = {}
+        self._entries.clear()
+
+    def _refresh(self) -> None:
+        # Called with self._lock held.
+        pool = database.get_pool()
+        now = time.monotonic()
+        commits = pool.commits
+        if commits == self._commits and now - self._checked_at < self.check_seconds and self._watch_path == pool.path:
+            return
+        if self._watch_path != pool.path:
+            self._open_watch(pool.path)
+        self.checks += 1
+        self._commits = commits
+        self._checked_at = now
+        version = self._watch.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return
+        self.reads += 1
+        self._data_version = version
+        self._generations = dict(self._watch.execute("SELECT name, generation FROM table_generations").fetchall())
+
+    def get(self, key: tuple, tables: tuple[str, ...], load: Callable[[], Any]) -> Any:
+        if database.in_transaction():
+            # Uncommitted writes on this thread are invisible to the cache.
+            with self._lock:
+                self.bypassed += 1
+            return load()
+        with self._lock:
+            self._refresh()
+            generations = tuple(self._generations.get(t, 0) for t in tables)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == generations:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        # Loaded outside the lock under the generations seen before the read,
+        # so a write racing with it only makes the entry expire early.
+        value = load()
+        with self._lock:
+            if len(self._entries) >= self.max_entries and key not in self._entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (generations, value)
+        return value
+
+    def generations(self, tables: tuple[str, ...]) -> tuple[int, ...]:
+        # Current generations of tables, checked as often as for a cached read.
+        with self._lock:
+            self._refresh()
+            return tuple(self._generations.get(t, 0) for t in tables)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._commits = -1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "bypassed": self.bypassed,
+                "checks": self.checks,
+                "generation_reads": self.reads,
+            }
+
+
+catalog_cache = ReadCache()
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def cached_read(*tables: str) -> Callable:
+    """Cache a catalog read until one of ``tables`` is written."""
+
+    def wrap(fn: Callable[..., list]) -> Callable[..., list]:
+        @functools.wraps(fn)
+        def read(*args: Any, **kwargs: Any) -> list:
+            key = (fn.__name__, args, tuple(sorted(kwargs.items())))
+            return list(catalog_cache.get(key, tables, lambda: _freeze(fn(*args, **kwargs))))
+
+        read.uncached = fn
+        return read
+
+    return wrap
+
+
+def table_generations(*tables: str) -> tuple[int, ...]:
+    return catalog_cache.generations(tables)
+
+
+def cache_stats() -> dict[str, Any]:
+    return catalog_cache.stats()
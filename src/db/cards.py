@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import NamedTuple
+
+
+class UnitCard(NamedTuple):
+    """What a unit listing shows: no description, contacts or photo list.
+
+    Built straight from a plain SQLite tuple (``UnitCard._make(row)``);
+    full rows with decoded photos stay on ``repository.get_unit``.
+    """
+
+    unit_id: str
+    title: str
+    property_type: str
+    location: str
+    rooms: int
+    cover_image_url: str
+    available_from: str
+    available_to: str
+    price_day: str
+    price_week: str
+    is_booked: int
+    booked_from: str
+    booked_to: str
+    booking_note_text: str
+
+    @property
+    def booked_days(self) -> int:
+        if not self.is_booked:
+            return 0
+        try:
+            d1 = date.fromisoformat(self.booked_from.strip())
+            d2 = date.fromisoformat(self.booked_to.strip())
+        except (AttributeError, ValueError):
+            return 0
+        return (d2 - d1).days + 1 if d2 >= d1 else 0
+
+
+UNIT_CARD_COLUMNS = ", ".join(UnitCard._fields)
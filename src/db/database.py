@@ -1,133 +1,234 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from .indexes import sync_indexes
+from .migrations import migrate
+from .search import sync_units_fts
 
 DB_PATH = Path(__file__).resolve().parents[2] / "data" / "app.db"
 
+POOL_SIZE = 8
+POOL_TIMEOUT_SECONDS = 30.0
 
-def get_conn() -> sqlite3.Connection:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+# Applied once per physical connection, not per checkout.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA mmap_size=134217728",
+    "PRAGMA temp_store=MEMORY",
+)
 
 
-def init_db() -> None:
-    ddl = """
-    CREATE TABLE IF NOT EXISTS units (
-        unit_id TEXT PRIMARY KEY,
-        title TEXT NOT NULL,
-        property_type TEXT NOT NULL DEFAULT 'شقة',
-        location TEXT NOT NULL,
-        rooms INTEGER NOT NULL DEFAULT 0,
-        description TEXT NOT NULL DEFAULT '',
-        youtube_url TEXT NOT NULL DEFAULT '',
-        cover_image_url TEXT NOT NULL DEFAULT '',
-        photo_urls_json TEXT NOT NULL DEFAULT '[]',
-        contact_whatsapp TEXT NOT NULL DEFAULT '',
-        contact_phone TEXT NOT NULL DEFAULT '',
-        available_from TEXT NOT NULL DEFAULT '',
-        available_to TEXT NOT NULL DEFAULT '',
-        price_day TEXT NOT NULL DEFAULT '',
-        price_week TEXT NOT NULL DEFAULT '',
-        is_booked INTEGER NOT NULL DEFAULT 0,
-        booked_from TEXT NOT NULL DEFAULT '',
-        booked_to TEXT NOT NULL DEFAULT '',
-        booking_note_text TEXT NOT NULL DEFAULT '',
-        is_active INTEGER NOT NULL DEFAULT 1,
-        created_at TEXT NOT NULL DEFAULT (datetime('now')),
-        updated_at TEXT NOT NULL DEFAULT (datetime('now'))
-    );
-
-    CREATE TABLE IF NOT EXISTS leads (
-        lead_id TEXT PRIMARY KEY,
-        created_at TEXT NOT NULL DEFAULT (datetime('now')),
-        unit_id TEXT NOT NULL,
-        action TEXT NOT NULL,
-        duration_text TEXT NOT NULL DEFAULT '',
-        note TEXT NOT NULL DEFAULT '',
-        guest_name TEXT NOT NULL DEFAULT '',
-        guest_phone TEXT NOT NULL DEFAULT '',
-        guest_residence TEXT NOT NULL DEFAULT '',
-        meta_json TEXT NOT NULL DEFAULT '{}'
-    );
-
-    CREATE TABLE IF NOT EXISTS bookings (
-        booking_id TEXT PRIMARY KEY,
-        created_at TEXT NOT NULL DEFAULT (datetime('now')),
-        unit_id TEXT NOT NULL,
-        guest_name TEXT NOT NULL DEFAULT '',
-        guest_phone TEXT NOT NULL DEFAULT '',
-        guest_residence TEXT NOT NULL DEFAULT '',
-        duration_text TEXT NOT NULL DEFAULT '',
-        note TEXT NOT NULL DEFAULT '',
-        status TEXT NOT NULL DEFAULT 'new',
-        is_new_admin INTEGER NOT NULL DEFAULT 1,
-        booked_from TEXT NOT NULL DEFAULT '',
-        booked_to TEXT NOT NULL DEFAULT '',
-        admin_schedule_text TEXT NOT NULL DEFAULT '',
-        reviewed_at TEXT NOT NULL DEFAULT ''
-    );
-
-    CREATE TABLE IF NOT EXISTS sponsor_media (
-        media_id TEXT PRIMARY KEY,
-        created_at TEXT NOT NULL DEFAULT (datetime('now')),
-        slot TEXT NOT NULL DEFAULT 'gallery',
-        media_kind TEXT NOT NULL DEFAULT 'image',
-        title TEXT NOT NULL DEFAULT '',
-        url TEXT NOT NULL DEFAULT '',
-        is_active INTEGER NOT NULL DEFAULT 1,
-        sort_order INTEGER NOT NULL DEFAULT 0
-    );
-
-    CREATE TABLE IF NOT EXISTS guide_categories (
-        category_id TEXT PRIMARY KEY,
-        created_at TEXT NOT NULL DEFAULT (datetime('now')),
-        name TEXT NOT NULL,
-        is_active INTEGER NOT NULL DEFAULT 1,
-        sort_order INTEGER NOT NULL DEFAULT 0
-    );
-
-    CREATE TABLE IF NOT EXISTS guide_items (
-        item_id TEXT PRIMARY KEY,
-        created_at TEXT NOT NULL DEFAULT (datetime('now')),
-        category_id TEXT NOT NULL,
-        name TEXT NOT NULL,
-        description TEXT NOT NULL DEFAULT '',
-        location TEXT NOT NULL DEFAULT '',
-        image_url TEXT NOT NULL DEFAULT '',
-        is_active INTEGER NOT NULL DEFAULT 1
-    );
+class ConnectionPool:
+    """Bounded pool of pre-configured SQLite connections.
+
+    Streamlit runs every script rerun on its own thread, so connections are
+    shared across threads (``check_same_thread=False``) but only ever checked
+    out by one thread at a time. A thread that asks for a connection while it
+    already holds one gets the same connection back, and only the outermost
+    checkout commits. Callbacks registered with ``after_commit`` while a
+    connection is held run once that commit has succeeded.
     """
+
+    def __init__(self, path: Path, size: int = POOL_SIZE, timeout: float = POOL_TIMEOUT_SECONDS) -> None:
+        self.path = Path(path)
+        self.size = max(1, int(size))
+        self.timeout = timeout
+        self._idle: list[sqlite3.Connection] = []
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._open = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._commits = 0
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        with self._cond:
+            if self._closed:
+                raise sqlite3.ProgrammingError("connection pool is closed")
+            self._checkouts += 1
+            if not self._idle and self._open >= self.size:
+                self._waits += 1
+                if not self._cond.wait_for(lambda: self._idle or self._open < self.size, self.timeout):
+                    raise sqlite3.OperationalError("timed out waiting for a database connection")
+            if self._idle:
+                return self._idle.pop()
+            self._open += 1
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        with self._cond:
+            if self._closed:
+                self._open -= 1
+                conn.close()
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        held: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if held is not None:
+            yield held
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.after_commit = []
+        try:
+            with conn:
+                yield conn
+                wrote = conn.in_transaction
+            callbacks = self._local.after_commit
+        finally:
+            self._local.conn = None
+            self._local.after_commit = []
+            self._release(conn)
+        if wrote:
+            with self._cond:
+                self._commits += 1
+        for fn, args in callbacks:
+            fn(*args)
+
+    def after_commit(self, fn: Callable[..., Any], *args: Any) -> None:
+        if getattr(self._local, "conn", None) is None:
+            fn(*args)
+        else:
+            self._local.after_commit.append((fn, args))
+
+    def in_transaction(self) -> bool:
+        conn = getattr(self._local, "conn", None)
+        return conn is not None and conn.in_transaction
+
+    @property
+    def commits(self) -> int:
+        return self._commits
+
+    def stats(self) -> dict[str, int]:
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "size": self.size,
+                "open": self._open,
+                "idle": idle,
+                "in_use": self._open - idle,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "commits": self._commits,
+            }
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._idle.pop().close()
+                self._open -= 1
+            self._cond.notify_all()
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH)
+    return _pool
+
+
+def close_pool() -> None:
+    global _pool, _schema_ready
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+        _schema_ready = False
+
+
+def pool_stats() -> dict[str, int]:
+    return get_pool().stats()
+
+
+@contextmanager
+def get_conn() -> Iterator[sqlite3.Connection]:
+    with get_pool().connection() as conn:
+        yield conn
+
+
+@contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    # Unit of work: the outermost block takes the write lock up front
+    # (BEGIN IMMEDIATE); repository calls made inside it on the same thread
+    # reuse its connection, so everything lands in a single commit or, if
+    # an exception escapes the block, not at all.
     with get_conn() as conn:
-        conn.executescript(ddl)
-        _migrate_units_table(conn)
-
-
-def _migrate_units_table(conn: sqlite3.Connection) -> None:
-    unit_cols = {r["name"] for r in conn.execute("PRAGMA table_info(units)").fetchall()}
-    if "property_type" not in unit_cols:
-        conn.execute("ALTER TABLE units ADD COLUMN property_type TEXT NOT NULL DEFAULT 'شقة'")
-    if "contact_whatsapp" not in unit_cols:
-        conn.execute("ALTER TABLE units ADD COLUMN contact_whatsapp TEXT NOT NULL DEFAULT ''")
-    if "contact_phone" not in unit_cols:
-        conn.execute("ALTER TABLE units ADD COLUMN contact_phone TEXT NOT NULL DEFAULT ''")
-    if "available_to" not in unit_cols:
-        conn.execute("ALTER TABLE units ADD COLUMN available_to TEXT NOT NULL DEFAULT ''")
-    if "is_booked" not in unit_cols:
-        conn.execute("ALTER TABLE units ADD COLUMN is_booked INTEGER NOT NULL DEFAULT 0")
-    if "booked_from" not in unit_cols:
-        conn.execute("ALTER TABLE units ADD COLUMN booked_from TEXT NOT NULL DEFAULT ''")
-    if "booked_to" not in unit_cols:
-        conn.execute("ALTER TABLE units ADD COLUMN booked_to TEXT NOT NULL DEFAULT ''")
-    if "booking_note_text" not in unit_cols:
-        conn.execute("ALTER TABLE units ADD COLUMN booking_note_text TEXT NOT NULL DEFAULT ''")
-
-    booking_cols = {r["name"] for r in conn.execute("PRAGMA table_info(bookings)").fetchall()}
-    if booking_cols and "reviewed_at" not in booking_cols:
-        conn.execute("ALTER TABLE bookings ADD COLUMN reviewed_at TEXT NOT NULL DEFAULT ''")
-
-    category_cols = {r["name"] for r in conn.execute("PRAGMA table_info(guide_categories)").fetchall()}
-    if category_cols and "sort_order" not in category_cols:
-        conn.execute("ALTER TABLE guide_categories ADD COLUMN sort_order INTEGER NOT NULL DEFAULT 0")
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        yield conn
+
+
+def after_commit(fn: Callable[..., Any], *args: Any) -> None:
+    # Run fn(*args) after the current thread's outermost commit, or right
+    # away when no connection is held. Skipped if the work is rolled back.
+    get_pool().after_commit(fn, *args)
+
+
+def in_transaction() -> bool:
+    # True while this thread holds a connection with uncommitted writes.
+    return get_pool().in_transaction()
+
+
+def init_db() -> None:
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        with get_conn() as conn:
+            migrate(conn)
+            sync_indexes(conn)
+            sync_units_fts(conn)
+        _schema_ready = True
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Optional
+
+# One row per guest, keyed by normalized phone (see phones.normalize_phone).
+# leads and bookings point at it through guest_id; the name and residence
+# are the most recent non-empty values the guest entered.
+GUEST_UPSERT_SQL = """
+    INSERT INTO guests(phone, name, residence, first_seen_at_ms, last_seen_at_ms)
+    VALUES(?,?,?,?,?)
+    ON CONFLICT(phone) DO UPDATE SET
+      name=CASE WHEN excluded.name<>'' THEN excluded.name ELSE guests.name END,
+      residence=CASE WHEN excluded.residence<>'' THEN excluded.residence ELSE guests.residence END,
+      last_seen_at_ms=MAX(guests.last_seen_at_ms, excluded.last_seen_at_ms)
+"""
+
+
+def upsert_guest(conn: sqlite3.Connection, phone: str, name: str, residence: str, at_ms: int) -> Optional[int]:
+    if not phone:
+        return None
+    conn.execute(GUEST_UPSERT_SQL, (phone, name.strip(), residence.strip(), at_ms, at_ms))
+    return int(conn.execute("SELECT guest_id FROM guests WHERE phone=?", (phone,)).fetchone()[0])
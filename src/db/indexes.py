@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+
+# Every secondary index lives here. sync_indexes() creates missing ones,
+# rebuilds ones whose definition changed and drops idx_* indexes that are no
+# longer declared. init_db() calls it on every start; with nothing to change
+# it costs one sqlite_master read.
+INDEXES: dict[str, str] = {
+    "idx_units_active": "CREATE INDEX idx_units_active ON units(unit_id) WHERE is_active=1",
+    "idx_units_location": (
+        "CREATE INDEX idx_units_location ON units(location, property_type, rooms, unit_id) WHERE is_active=1"
+    ),
+    "idx_units_type": "CREATE INDEX idx_units_type ON units(property_type, rooms, unit_id) WHERE is_active=1",
+    "idx_units_price": (
+        "CREATE INDEX idx_units_price ON units(location, property_type, price_day_value) WHERE is_active=1"
+    ),
+    "idx_units_price_day": "CREATE INDEX idx_units_price_day ON units(price_day_value, unit_id) WHERE is_active=1",
+    # Home grid pages in index order: LIMIT stops early instead of sorting
+    # every match.
+    "idx_units_location_code": "CREATE INDEX idx_units_location_code ON units(location, unit_id) WHERE is_active=1",
+    "idx_units_price_asc": (
+        "CREATE INDEX idx_units_price_asc ON units(price_day_value IS NULL, price_day_value, unit_id) WHERE is_active=1"
+    ),
+    "idx_units_price_desc": (
+        "CREATE INDEX idx_units_price_desc ON units(price_day_value IS NULL, price_day_value DESC, unit_id)"
+        " WHERE is_active=1"
+    ),
+    # Media backfill watermark (bootstrap): only units changed since the last pass.
+    "idx_units_updated": "CREATE INDEX idx_units_updated ON units(updated_at)",
+    "idx_leads_created": "CREATE INDEX idx_leads_created ON leads(created_at_ms, lead_id)",
+    "idx_leads_guest_name": "CREATE INDEX idx_leads_guest_name ON leads(guest_name)",
+    "idx_leads_guest": "CREATE INDEX idx_leads_guest ON leads(guest_id, created_at_ms)",
+    "idx_leads_unit": "CREATE INDEX idx_leads_unit ON leads(unit_id, created_at_ms, lead_id)",
+    "idx_leads_action": "CREATE INDEX idx_leads_action ON leads(action, created_at_ms, lead_id)",
+    "idx_bookings_created": "CREATE INDEX idx_bookings_created ON bookings(created_at_ms, booking_id)",
+    "idx_bookings_new_admin": (
+        "CREATE INDEX idx_bookings_new_admin ON bookings(created_at_ms, booking_id) WHERE is_new_admin=1"
+    ),
+    "idx_bookings_guest": "CREATE INDEX idx_bookings_guest ON bookings(guest_id, created_at_ms)",
+    "idx_bookings_pending_guest": (
+        "CREATE INDEX idx_bookings_pending_guest ON bookings(guest_id, unit_id, created_at_ms)"
+        " WHERE is_new_admin=1"
+    ),
+    "idx_bookings_reviewed": (
+        "CREATE INDEX idx_bookings_reviewed ON bookings(created_at_ms, booking_id) WHERE is_new_admin=0"
+    ),
+    "idx_bookings_unit": "CREATE INDEX idx_bookings_unit ON bookings(unit_id, created_at_ms, booking_id)",
+    "idx_bookings_status": "CREATE INDEX idx_bookings_status ON bookings(status, created_at_ms, booking_id)",
+    "idx_guests_name": "CREATE INDEX idx_guests_name ON guests(name)",
+    "idx_unit_reservations_span": (
+        "CREATE INDEX idx_unit_reservations_span ON unit_reservations(unit_id, start_date, end_date)"
+    ),
+    "idx_unit_reservations_booking": "CREATE INDEX idx_unit_reservations_booking ON unit_reservations(booking_id)",
+    "idx_sponsor_media_slot": (
+        "CREATE INDEX idx_sponsor_media_slot ON sponsor_media(slot, sort_order, created_at_ms)"
+    ),
+    "idx_sponsor_media_active": (
+        "CREATE INDEX idx_sponsor_media_active ON sponsor_media(slot, sort_order, created_at_ms) WHERE is_active=1"
+    ),
+    "idx_guide_categories_sort": (
+        "CREATE INDEX idx_guide_categories_sort ON guide_categories(sort_order, created_at_ms)"
+    ),
+    "idx_guide_items_category": "CREATE INDEX idx_guide_items_category ON guide_items(category_id)",
+    "idx_guide_items_active": (
+        "CREATE INDEX idx_guide_items_active ON guide_items(category_id, created_at_ms) WHERE is_active=1"
+    ),
+    "idx_media_refs_media": "CREATE INDEX idx_media_refs_media ON media_refs(media_id)",
+    "idx_media_blobs_unused": "CREATE INDEX idx_media_blobs_unused ON media_blobs(uploaded_at_ms) WHERE ref_count=0",
+}
+
+
+def _normalize(sql: str) -> str:
+    return re.sub(r"\s+", " ", sql or "").strip().lower()
+
+
+def _index_changes(conn: sqlite3.Connection) -> tuple[list[str], list[str]]:
+    existing = {
+        r[0]: r[1]
+        for r in conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type='index' AND name LIKE 'idx\\_%' ESCAPE '\\'"
+        ).fetchall()
+    }
+    drop = [
+        name
+        for name, sql in existing.items()
+        if name not in INDEXES or _normalize(INDEXES[name]) != _normalize(sql)
+    ]
+    create = [sql for name, sql in INDEXES.items() if name not in existing or name in drop]
+    return drop, create
+
+
+def sync_indexes(conn: sqlite3.Connection) -> None:
+    drop, create = _index_changes(conn)
+    if not drop and not create:
+        return
+    if conn.in_transaction:
+        conn.commit()
+    # Another process may be syncing too: take the write lock, then diff again.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        drop, create = _index_changes(conn)
+        for name in drop:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+        for sql in create:
+            conn.execute(sql)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+# A full scan is a plain `SCAN t` or a walk over a whole index
+# (`SCAN t USING [COVERING] INDEX i`); virtual tables (FTS, json_each),
+# subqueries and constant rows are not tables and are ignored. An index walk
+# under LIMIT with no sort step is a page: it stops after LIMIT rows.
+_FULL_SCAN = re.compile(r"^SCAN (\w+)( USING (?:COVERING )?INDEX \w+)?$")
+_LIMIT = re.compile(r"\bLIMIT\s+\d+", re.IGNORECASE)
+_ALIAS = re.compile(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_NOT_ALIAS = {"where", "left", "inner", "join", "on", "order", "group", "limit", "set", "values", "select"}
+
+
+def _aliases(sql: str) -> dict[str, str]:
+    found = {}
+    for table, alias in _ALIAS.findall(sql):
+        found[table] = table
+        if alias and alias.lower() not in _NOT_ALIAS:
+            found[alias] = table
+    return found
+
+
+def full_scans(conn: sqlite3.Connection, sql: str) -> list[tuple[str, str]]:
+    """(table, plan line) for every full scan in the plan of ``sql``, a
+    statement with its parameters already inlined (as trace callbacks see it)."""
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+    aliases = _aliases(sql)
+    plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()]
+    paged = bool(_LIMIT.search(sql)) and not any("TEMP B-TREE" in line for line in plan)
+    found = []
+    for line in plan:
+        match = _FULL_SCAN.match(line)
+        if not match or (match.group(2) and paged):
+            continue
+        table = aliases.get(match.group(1), match.group(1))
+        if table in tables:
+            found.append((table, line))
+    return found
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Any, Optional, Sequence
+
+from .database import transaction
+from .guests import GUEST_UPSERT_SQL
+from .phones import normalize_phone
+
+# Leads are written off the request path: create_lead() drops a row on an
+# in-process queue and a background thread inserts whole batches with
+# executemany in one transaction. A batch is flushed when it reaches
+# LEAD_BATCH_SIZE rows or LEAD_FLUSH_SECONDS after its first row, and
+# whatever is queued is flushed on shutdown. If the queue is full the caller
+# writes its row synchronously instead of waiting. Repeat clicks coalesced
+# onto an existing lead are kept as pending hit counts and applied once the
+# lead's row has been written.
+#
+# Queued rows are numbered in queue order. A hit remembers the last number
+# handed out when it was recorded, so it is applied in the first batch that
+# reaches that number; flush() waits, for at most LEAD_FLUSH_TIMEOUT_SECONDS,
+# until the rows queued before the call are written, then writes the hits
+# that are due.
+LEAD_QUEUE_SIZE = 5000
+LEAD_BATCH_SIZE = 500
+LEAD_FLUSH_SECONDS = 0.5
+LEAD_FLUSH_TIMEOUT_SECONDS = 10.0
+
+# Rows are (lead_id, created_at, created_at_ms, unit_id, action,
+# duration_text, note, guest_name, guest_phone, guest_residence, meta_json)
+# with the guest fields as typed. Guests with a usable phone are upserted in
+# the same transaction and the lead keeps only their guest_id; otherwise the
+# lead keeps the text itself.
+LEAD_INSERT_SQL = """
+    INSERT INTO leads(
+      lead_id, created_at, created_at_ms, unit_id, action, duration_text, note,
+      guest_id, guest_name, guest_phone, guest_residence, meta_json
+    )
+    VALUES(?,?,?,?,?,?,?,(SELECT guest_id FROM guests WHERE phone=?),?,?,?,?)
+"""
+
+LEAD_HIT_SQL = "UPDATE leads SET hit_count=hit_count+?, last_hit_at_ms=MAX(COALESCE(last_hit_at_ms, 0), ?) WHERE lead_id=?"
+
+log = logging.getLogger(__name__)
+
+
+def _lead_params(row: tuple, phone: str) -> tuple:
+    lead_id, created_at, created_at_ms, unit_id, action, duration_text, note, name, raw_phone, residence, meta = row
+    if phone:
+        name = raw_phone = residence = ""
+    return (
+        lead_id, created_at, created_at_ms, unit_id, action, duration_text, note, phone, name, raw_phone, residence, meta
+    )
+
+
+def write_lead_rows(rows: Sequence[tuple], hits: Sequence[tuple] = ()) -> None:
+    phones = [normalize_phone(r[8]) for r in rows]
+    with transaction() as conn:
+        conn.executemany(GUEST_UPSERT_SQL, [(p, r[7], r[9], r[2], r[2]) for r, p in zip(rows, phones) if p])
+        conn.executemany(LEAD_INSERT_SQL, [_lead_params(r, p) for r, p in zip(rows, phones)])
+        if hits:
+            conn.executemany(LEAD_HIT_SQL, hits)
+
+
+class LeadWriter:
+    def __init__(
+        self,
+        queue_size: int = LEAD_QUEUE_SIZE,
+        batch_size: int = LEAD_BATCH_SIZE,
+        flush_seconds: float = LEAD_FLUSH_SECONDS,
+    ) -> None:
+        self.batch_size = max(1, int(batch_size))
+        self.flush_seconds = flush_seconds
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._lock = threading.Lock()
+        self._written_cond = threading.Condition(self._lock)
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        # lead_id -> (count, last hit ms, sequence number the lead is within)
+        self._hits: dict[str, tuple[int, int, int]] = {}
+        self._seq = 0
+        self._written_seq = 0
+        self._enqueued = 0
+        self._written = 0
+        self._batches = 0
+        self._sync_writes = 0
+        self._failed = 0
+        self._hit_count = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="lead-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, row: tuple) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._start()
+        with self._lock:
+            try:
+                self._queue.put_nowait((self._seq + 1, row))
+            except queue.Full:
+                pass
+            else:
+                self._seq += 1
+                self._enqueued += 1
+                return
+        # Backpressure: the writer is behind, so pay for this one inline.
+        write_lead_rows([row])
+        with self._lock:
+            self._sync_writes += 1
+            self._written += 1
+
+    def hit(self, lead_id: str, at_ms: int) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._start()
+        with self._lock:
+            # The lead was queued (or written inline) before this hit, so its
+            # row is written once the writer is past the current number.
+            count, last, seq = self._hits.get(lead_id, (0, 0, self._seq))
+            self._hits[lead_id] = (count + 1, max(last, at_ms), seq)
+            self._hit_count += 1
+
+    def _take_hits(self, upto: int) -> list[tuple]:
+        # Called with self._lock held: the hits whose leads are written once
+        # rows up to ``upto`` are.
+        hits = []
+        for lead_id, (count, last, seq) in list(self._hits.items()):
+            if seq <= upto:
+                del self._hits[lead_id]
+                hits.append((count, last, lead_id))
+        return hits
+
+    def _take_batch(self) -> list[tuple[int, tuple]]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_seconds)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: list[tuple], hits: list[tuple]) -> None:
+        t0 = time.perf_counter()
+        failed = 0
+        try:
+            write_lead_rows(batch, hits)
+        except Exception:
+            # Retry row by row so one bad row does not lose the whole batch.
+            log.exception("lead batch of %d failed; retrying rows one by one", len(batch))
+            for row in batch:
+                try:
+                    write_lead_rows([row])
+                except Exception:
+                    failed += 1
+                    log.exception("dropping lead %s", row[0])
+            try:
+                write_lead_rows([], hits)
+            except Exception:
+                log.exception("dropping %d lead hit counts", len(hits))
+        elapsed = (time.perf_counter() - t0) * 1000
+        with self._lock:
+            self._batches += 1
+            self._written += len(batch) - failed
+            self._failed += failed
+            self._last_flush_ms = elapsed
+            self._max_flush_ms = max(self._max_flush_ms, elapsed)
+            self._total_flush_ms += elapsed
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            with self._write_lock:
+                with self._lock:
+                    upto = batch[-1][0] if batch else self._written_seq
+                    hits = self._take_hits(upto)
+                if batch or hits:
+                    self._write([row for _, row in batch], hits)
+                with self._lock:
+                    self._written_seq = upto
+                    self._written_cond.notify_all()
+            if not batch and not hits and self._stopping:
+                return
+
+    def flush(self, timeout: float = LEAD_FLUSH_TIMEOUT_SECONDS) -> bool:
+        """Write everything queued and hit before this call; False if the
+        writer did not get through it within ``timeout`` seconds."""
+        with self._lock:
+            target = self._seq
+            if self._thread is not None and self._thread.is_alive():
+                done = self._written_cond.wait_for(lambda: self._written_seq >= target, timeout)
+            else:
+                done = self._written_seq >= target
+        if not done:
+            log.warning("lead flush timed out after %.1fs", timeout)
+            return False
+        with self._write_lock:
+            with self._lock:
+                hits = self._take_hits(target)
+            if hits:
+                self._write([], hits)
+        return True
+
+    def close(self) -> None:
+        self.flush()
+        self._stopping = True
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_seconds * 4)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "enqueued": self._enqueued,
+                "written": self._written,
+                "batches": self._batches,
+                "sync_writes": self._sync_writes,
+                "hits": self._hit_count,
+                "failed": self._failed,
+                "last_flush_ms": round(self._last_flush_ms, 2),
+                "max_flush_ms": round(self._max_flush_ms, 2),
+                "avg_flush_ms": round(self._total_flush_ms / self._batches, 2) if self._batches else 0.0,
+            }
+
+
+_writer: Optional[LeadWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> LeadWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = LeadWriter()
+                atexit.register(_writer.close)
+    return _writer
+
+
+def submit_lead(row: tuple) -> None:
+    get_writer().submit(row)
+
+
+def submit_lead_hit(lead_id: str, at_ms: int) -> None:
+    get_writer().hit(lead_id, at_ms)
+
+
+def flush_leads(timeout: float = LEAD_FLUSH_TIMEOUT_SECONDS) -> bool:
+    if _writer is None:
+        return True
+    return _writer.flush(timeout)
+
+
+def lead_writer_stats() -> dict[str, Any]:
+    return get_writer().stats()
@@ -0,0 +1,614 @@
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import unicodedata
+import uuid
+from typing import Callable, Optional
+
+# Schema changes are numbered (the digits in the function name) and applied
+# in order. The number of the last applied migration is stored in PRAGMA
+# user_version, so an up-to-date database costs a single pragma read. Never
+# edit a migration that has shipped; add a new one instead, with a number
+# above every number ever used: 3, 5, 6, 15 and 18 only added indexes, which
+# init_db() now syncs from indexes.py on every start, and were removed; 7
+# built the first units_fts, which 19 replaces.
+#
+# Migrations carry their own SQL and helpers instead of importing the live
+# ones, so a later change to the app cannot change what an old step does.
+
+Migration = Callable[[sqlite3.Connection], None]
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> set[str]:
+    return {r[1] for r in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def _add_missing_columns(conn: sqlite3.Connection, table: str, columns: dict[str, str]) -> None:
+    existing = _columns(conn, table)
+    if not existing:
+        return
+    for name, decl in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+
+def _0001_initial_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS units (
+            unit_id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            property_type TEXT NOT NULL DEFAULT 'شقة',
+            location TEXT NOT NULL,
+            rooms INTEGER NOT NULL DEFAULT 0,
+            description TEXT NOT NULL DEFAULT '',
+            youtube_url TEXT NOT NULL DEFAULT '',
+            cover_image_url TEXT NOT NULL DEFAULT '',
+            photo_urls_json TEXT NOT NULL DEFAULT '[]',
+            contact_whatsapp TEXT NOT NULL DEFAULT '',
+            contact_phone TEXT NOT NULL DEFAULT '',
+            available_from TEXT NOT NULL DEFAULT '',
+            available_to TEXT NOT NULL DEFAULT '',
+            price_day TEXT NOT NULL DEFAULT '',
+            price_week TEXT NOT NULL DEFAULT '',
+            is_booked INTEGER NOT NULL DEFAULT 0,
+            booked_from TEXT NOT NULL DEFAULT '',
+            booked_to TEXT NOT NULL DEFAULT '',
+            booking_note_text TEXT NOT NULL DEFAULT '',
+            is_active INTEGER NOT NULL DEFAULT 1,
+            created_at TEXT NOT NULL DEFAULT (datetime('now')),
+            updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS leads (
+            lead_id TEXT PRIMARY KEY,
+            created_at TEXT NOT NULL DEFAULT (datetime('now')),
+            unit_id TEXT NOT NULL,
+            action TEXT NOT NULL,
+            duration_text TEXT NOT NULL DEFAULT '',
+            note TEXT NOT NULL DEFAULT '',
+            guest_name TEXT NOT NULL DEFAULT '',
+            guest_phone TEXT NOT NULL DEFAULT '',
+            guest_residence TEXT NOT NULL DEFAULT '',
+            meta_json TEXT NOT NULL DEFAULT '{}'
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS bookings (
+            booking_id TEXT PRIMARY KEY,
+            created_at TEXT NOT NULL DEFAULT (datetime('now')),
+            unit_id TEXT NOT NULL,
+            guest_name TEXT NOT NULL DEFAULT '',
+            guest_phone TEXT NOT NULL DEFAULT '',
+            guest_residence TEXT NOT NULL DEFAULT '',
+            duration_text TEXT NOT NULL DEFAULT '',
+            note TEXT NOT NULL DEFAULT '',
+            status TEXT NOT NULL DEFAULT 'new',
+            is_new_admin INTEGER NOT NULL DEFAULT 1,
+            booked_from TEXT NOT NULL DEFAULT '',
+            booked_to TEXT NOT NULL DEFAULT '',
+            admin_schedule_text TEXT NOT NULL DEFAULT '',
+            reviewed_at TEXT NOT NULL DEFAULT ''
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sponsor_media (
+            media_id TEXT PRIMARY KEY,
+            created_at TEXT NOT NULL DEFAULT (datetime('now')),
+            slot TEXT NOT NULL DEFAULT 'gallery',
+            media_kind TEXT NOT NULL DEFAULT 'image',
+            title TEXT NOT NULL DEFAULT '',
+            url TEXT NOT NULL DEFAULT '',
+            is_active INTEGER NOT NULL DEFAULT 1,
+            sort_order INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS guide_categories (
+            category_id TEXT PRIMARY KEY,
+            created_at TEXT NOT NULL DEFAULT (datetime('now')),
+            name TEXT NOT NULL,
+            is_active INTEGER NOT NULL DEFAULT 1,
+            sort_order INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS guide_items (
+            item_id TEXT PRIMARY KEY,
+            created_at TEXT NOT NULL DEFAULT (datetime('now')),
+            category_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT NOT NULL DEFAULT '',
+            location TEXT NOT NULL DEFAULT '',
+            image_url TEXT NOT NULL DEFAULT '',
+            is_active INTEGER NOT NULL DEFAULT 1
+        )
+        """
+    )
+
+    # Databases created before versioning may lack columns added over time.
+    _add_missing_columns(
+        conn,
+        "units",
+        {
+            "property_type": "TEXT NOT NULL DEFAULT 'شقة'",
+            "contact_whatsapp": "TEXT NOT NULL DEFAULT ''",
+            "contact_phone": "TEXT NOT NULL DEFAULT ''",
+            "available_to": "TEXT NOT NULL DEFAULT ''",
+            "is_booked": "INTEGER NOT NULL DEFAULT 0",
+            "booked_from": "TEXT NOT NULL DEFAULT ''",
+            "booked_to": "TEXT NOT NULL DEFAULT ''",
+            "booking_note_text": "TEXT NOT NULL DEFAULT ''",
+        },
+    )
+    _add_missing_columns(conn, "bookings", {"reviewed_at": "TEXT NOT NULL DEFAULT ''"})
+    _add_missing_columns(conn, "guide_categories", {"sort_order": "INTEGER NOT NULL DEFAULT 0"})
+
+
+def _0002_app_meta(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS app_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL DEFAULT '',
+            updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+        """
+    )
+
+
+_TEXT_TO_EPOCH_MS = "COALESCE(CAST(ROUND((julianday({col}) - 2440587.5) * 86400000) AS INTEGER), 0)"
+
+
+def _0004_epoch_ms_timestamps(conn: sqlite3.Connection) -> None:
+    for table in ("leads", "bookings", "sponsor_media", "guide_categories", "guide_items"):
+        _add_missing_columns(conn, table, {"created_at_ms": "INTEGER NOT NULL DEFAULT 0"})
+        conn.execute(
+            f"UPDATE {table} SET created_at_ms={_TEXT_TO_EPOCH_MS.format(col='created_at')} WHERE created_at_ms=0"
+        )
+    _add_missing_columns(conn, "bookings", {"reviewed_at_ms": "INTEGER NOT NULL DEFAULT 0"})
+    conn.execute(
+        f"UPDATE bookings SET reviewed_at_ms={_TEXT_TO_EPOCH_MS.format(col='reviewed_at')} "
+        "WHERE reviewed_at_ms=0 AND reviewed_at<>''"
+    )
+
+
+_PRICE_DIGITS = str.maketrans("٠١٢٣٤٥٦٧٨٩۰۱۲۳۴۵۶۷۸۹", "01234567890123456789")
+_PRICE_CURRENCY = re.compile(r"(جنيه|جنية|ج\.?م|egp|le|l\.e\.?|ج)", re.IGNORECASE)
+_PRICE_NUMBER = re.compile(r"^\d+(?:\.\d+)?$")
+
+
+def _lenient_price(text) -> Optional[int]:
+    # Whole pounds from the free-text price, or None if it is not a number.
+    value = str(text or "").strip().translate(_PRICE_DIGITS)
+    value = value.replace("٬", "").replace(",", "").replace("،", "")
+    value = _PRICE_CURRENCY.sub("", value).strip()
+    if not _PRICE_NUMBER.match(value):
+        return None
+    return int(round(float(value)))
+
+
+def _0008_numeric_prices(conn: sqlite3.Connection) -> None:
+    _add_missing_columns(conn, "units", {"price_day_value": "INTEGER", "price_week_value": "INTEGER"})
+    rows = conn.execute("SELECT unit_id, price_day, price_week FROM units").fetchall()
+    conn.executemany(
+        "UPDATE units SET price_day_value=?, price_week_value=? WHERE unit_id=?",
+        [(_lenient_price(r[1]), _lenient_price(r[2]), r[0]) for r in rows],
+    )
+
+
+def _0009_unit_reservations(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS unit_reservations (
+            reservation_id INTEGER PRIMARY KEY,
+            unit_id TEXT NOT NULL,
+            start_date TEXT NOT NULL,
+            end_date TEXT NOT NULL,
+            booking_id TEXT NOT NULL DEFAULT '',
+            note TEXT NOT NULL DEFAULT '',
+            created_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+        """
+    )
+    # Confirmed bookings first, then any unit marked booked by hand whose
+    # dates are not already covered. Rows without valid ISO dates are skipped.
+    conn.execute(
+        """
+        INSERT INTO unit_reservations(unit_id, start_date, end_date, booking_id, note)
+        SELECT unit_id, booked_from, booked_to, booking_id, admin_schedule_text
+        FROM bookings
+        WHERE status='confirmed'
+          AND date(booked_from) = booked_from AND date(booked_to) = booked_to
+          AND booked_to >= booked_from
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO unit_reservations(unit_id, start_date, end_date, note)
+        SELECT u.unit_id, u.booked_from, u.booked_to, u.booking_note_text
+        FROM units u
+        WHERE u.is_booked=1
+          AND date(u.booked_from) = u.booked_from AND date(u.booked_to) = u.booked_to
+          AND u.booked_to >= u.booked_from
+          AND NOT EXISTS (
+            SELECT 1 FROM unit_reservations r
+            WHERE r.unit_id=u.unit_id AND r.start_date=u.booked_from AND r.end_date=u.booked_to
+          )
+        """
+    )
+
+
+def _0010_id_sequences(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS id_sequences (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+        """
+    )
+    # Start after the highest numeric unit code already issued, whatever its
+    # width; codes that are not SH-<digits> are ignored.
+    last = 0
+    for row in conn.execute("SELECT unit_id FROM units WHERE unit_id LIKE 'SH-%'"):
+        suffix = str(row[0])[3:]
+        if suffix.isdigit():
+            last = max(last, int(suffix))
+    conn.execute("INSERT OR IGNORE INTO id_sequences(name, value) VALUES('units', ?)", (last,))
+
+
+def _0011_hit_counts(conn: sqlite3.Connection) -> None:
+    # Repeat clicks and resubmitted booking forms are coalesced onto the
+    # first row; these count the repeats.
+    for table in ("leads", "bookings"):
+        _add_missing_columns(
+            conn, table, {"hit_count": "INTEGER NOT NULL DEFAULT 1", "last_hit_at_ms": "INTEGER"}
+        )
+
+
+def _guest_phone(raw) -> str:
+    # International digits without "+", as guests.phone has always held them.
+    digits = "".join(str(unicodedata.decimal(ch)) for ch in str(raw or "") if ch.isdecimal())
+    if digits.startswith("00"):
+        return digits[2:]
+    if digits.startswith("0") and len(digits) == 11:
+        return "20" + digits[1:]
+    return digits
+
+
+def _0012_guests(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS guests (
+            guest_id INTEGER PRIMARY KEY,
+            phone TEXT NOT NULL UNIQUE,
+            name TEXT NOT NULL DEFAULT '',
+            residence TEXT NOT NULL DEFAULT '',
+            first_seen_at_ms INTEGER NOT NULL DEFAULT 0,
+            last_seen_at_ms INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    _add_missing_columns(conn, "leads", {"guest_id": "INTEGER"})
+    _add_missing_columns(conn, "bookings", {"guest_id": "INTEGER"})
+
+    # Rows are replayed oldest first so each guest ends up with the latest
+    # name/residence they typed. Every row keeps the text it was created
+    # with; rows with a usable phone also get a guest_id.
+    first_seen: dict[int, int] = {}
+    for table, key in (("leads", "lead_id"), ("bookings", "booking_id")):
+        rows = conn.execute(
+            f"""
+            SELECT {key}, created_at_ms, guest_name, guest_phone, guest_residence
+            FROM {table} WHERE guest_id IS NULL ORDER BY created_at_ms
+            """
+        ).fetchall()
+        linked = []
+        for row_id, at_ms, name, phone, residence in rows:
+            at_ms = int(at_ms or 0)
+            phone = _guest_phone(phone)
+            if not phone:
+                continue
+            conn.execute(
+                """
+                INSERT INTO guests(phone, name, residence, first_seen_at_ms, last_seen_at_ms)
+                VALUES(?,?,?,?,?)
+                ON CONFLICT(phone) DO UPDATE SET
+                  name=CASE WHEN excluded.name<>'' THEN excluded.name ELSE guests.name END,
+                  residence=CASE WHEN excluded.residence<>'' THEN excluded.residence ELSE guests.residence END,
+                  last_seen_at_ms=MAX(guests.last_seen_at_ms, excluded.last_seen_at_ms)
+                """,
+                (phone, (name or "").strip(), (residence or "").strip(), at_ms, at_ms),
+            )
+            guest_id = int(conn.execute("SELECT guest_id FROM guests WHERE phone=?", (phone,)).fetchone()[0])
+            linked.append((guest_id, row_id))
+            first_seen[guest_id] = min(first_seen.get(guest_id, at_ms), at_ms)
+        conn.executemany(
+            f"""
+            UPDATE {table} SET guest_id=? WHERE {key}=?
+            """,
+            linked,
+        )
+    conn.executemany(
+        "UPDATE guests SET first_seen_at_ms=? WHERE guest_id=? AND first_seen_at_ms>?",
+        [(ms, guest_id, ms) for guest_id, ms in first_seen.items()],
+    )
+
+
+def _uuid7_at(at_ms: int) -> str:
+    # UUIDv7 (RFC 9562) for a row created at at_ms: 48-bit Unix ms, version,
+    # then random bits.
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (at_ms & 0xFFFF_FFFF_FFFF) << 80 | 0x7 << 76 | (rand >> 68 & 0xFFF) << 64
+    value |= 0b10 << 62 | rand & 0x3FFF_FFFF_FFFF_FFFF
+    return str(uuid.UUID(int=value))
+
+
+def _is_uuid7(value: str) -> bool:
+    try:
+        return uuid.UUID(value).version == 7
+    except ValueError:
+        return False
+
+
+def _0013_time_ordered_ids(conn: sqlite3.Connection) -> None:
+    # Re-key rows created with random uuid4 ids to UUIDv7 ids carrying their
+    # own created_at_ms, so old and new rows share one time-ordered key
+    # space. References (unit_reservations.booking_id,
+    # guide_items.category_id) are rewritten in the same transaction.
+    rekey = (
+        ("leads", "lead_id", ()),
+        ("bookings", "booking_id", (("unit_reservations", "booking_id"),)),
+        ("sponsor_media", "media_id", ()),
+        ("guide_categories", "category_id", (("guide_items", "category_id"),)),
+        ("guide_items", "item_id", ()),
+    )
+    for table, key, refs in rekey:
+        rows = conn.execute(f"SELECT {key}, created_at_ms FROM {table} ORDER BY created_at_ms, {key}").fetchall()
+        mapping = [(_uuid7_at(int(at_ms or 0)), old) for old, at_ms in rows if not _is_uuid7(old)]
+        if not mapping:
+            continue
+        conn.executemany(f"UPDATE {table} SET {key}=? WHERE {key}=?", mapping)
+        for ref_table, ref_col in refs:
+            conn.executemany(f"UPDATE {ref_table} SET {ref_col}=? WHERE {ref_col}=?", mapping)
+
+
+# Catalog tables whose writes bump table_generations (see cache.py).
+GENERATION_TABLES = ("units", "sponsor_media", "guide_categories", "guide_items")
+
+
+def _0014_table_generations(conn: sqlite3.Connection) -> None:
+    # One counter per catalog table, bumped by triggers so writes from any
+    # process (admin app, bootstrap, scripts) invalidate cached reads.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS table_generations (
+            name TEXT PRIMARY KEY,
+            generation INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    for table in GENERATION_TABLES:
+        conn.execute("INSERT OR IGNORE INTO table_generations(name, generation) VALUES(?, 0)", (table,))
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_generation_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                  UPDATE table_generations SET generation=generation+1 WHERE name='{table}';
+                END
+                """
+            )
+
+
+def _0016_media_sources(conn: sqlite3.Connection) -> None:
+    # One row per remote image URL the thumbnail pipeline has fetched: the
+    # SHA-256 of the source bytes names its derivatives on disk.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS media_sources (
+            url TEXT PRIMARY KEY,
+            sha256 TEXT NOT NULL DEFAULT '',
+            widths TEXT NOT NULL DEFAULT '',
+            source_bytes INTEGER NOT NULL DEFAULT 0,
+            fetched_at_ms INTEGER NOT NULL DEFAULT 0,
+            error TEXT NOT NULL DEFAULT ''
+        )
+        """
+    )
+
+
+# Columns that may hold media IDs ('media:<sha256>.<ext>', see
+# src/media/store.py), as SQL yielding one `ref` per value of the row.
+MEDIA_OWNERS = {
+    "units": (
+        "unit_id",
+        ("cover_image_url", "photo_urls_json"),
+        "SELECT {row}.cover_image_url AS ref UNION SELECT value FROM json_each("
+        "CASE WHEN json_valid({row}.photo_urls_json) THEN {row}.photo_urls_json ELSE '[]' END)",
+    ),
+    "sponsor_media": ("media_id", ("url",), "SELECT {row}.url AS ref"),
+    "guide_items": ("item_id", ("image_url",), "SELECT {row}.image_url AS ref"),
+}
+
+
+def _0017_media_store(conn: sqlite3.Connection) -> None:
+    # Uploaded files, one row per distinct content (media_id is the SHA-256).
+    # media_refs lists which catalog rows use which file; triggers on the
+    # catalog tables keep it current and triggers on media_refs keep
+    # media_blobs.ref_count, so every write path counts, including cascades
+    # such as delete_guide_category().
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS media_blobs (
+            media_id TEXT PRIMARY KEY,
+            ext TEXT NOT NULL,
+            mime TEXT NOT NULL DEFAULT '',
+            media_kind TEXT NOT NULL DEFAULT 'image',
+            size_bytes INTEGER NOT NULL DEFAULT 0,
+            width INTEGER NOT NULL DEFAULT 0,
+            height INTEGER NOT NULL DEFAULT 0,
+            original_name TEXT NOT NULL DEFAULT '',
+            ref_count INTEGER NOT NULL DEFAULT 0,
+            uploaded_at_ms INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS media_refs (
+            owner_table TEXT NOT NULL,
+            owner_id TEXT NOT NULL,
+            media_id TEXT NOT NULL,
+            PRIMARY KEY(owner_table, owner_id, media_id)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS media_refs_count_insert AFTER INSERT ON media_refs
+        BEGIN
+          UPDATE media_blobs SET ref_count=ref_count+1 WHERE media_id=NEW.media_id;
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS media_refs_count_delete AFTER DELETE ON media_refs
+        BEGIN
+          UPDATE media_blobs SET ref_count=ref_count-1 WHERE media_id=OLD.media_id;
+        END
+        """
+    )
+    for table, (key, columns, refs) in MEDIA_OWNERS.items():
+        forget = f"DELETE FROM media_refs WHERE owner_table='{table}' AND owner_id=OLD.{key};"
+        record = (
+            f"INSERT OR IGNORE INTO media_refs(owner_table, owner_id, media_id)"
+            f" SELECT '{table}', NEW.{key}, substr(ref, 7, 64) FROM ({refs.format(row='NEW')})"
+            f" WHERE ref GLOB 'media:[0-9a-f]*.*' AND length(ref) >= 73;"
+        )
+        triggers = (
+            ("insert", "AFTER INSERT", record),
+            ("update", f"AFTER UPDATE OF {key}, {', '.join(columns)}", forget + record),
+            ("delete", "AFTER DELETE", forget),
+        )
+        for name, event, body in triggers:
+            conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_media_refs_{name}
+                {event} ON {table}
+                BEGIN
+                  {body}
+                END
+                """
+            )
+
+
+def _0019_units_fts_rowid(conn: sqlite3.Connection) -> None:
+    # units_fts rows take the rowid of their unit, so the delete trigger is a
+    # rowid lookup instead of a scan of the UNINDEXED unit_id column, and the
+    # text is normalized by the app (search.py) instead of by triggers calling
+    # a Python function. init_db() fills the new table.
+    for trigger in ("units_fts_ai", "units_fts_ad", "units_fts_au"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.execute("DROP TABLE IF EXISTS units_fts")
+    conn.execute(
+        """
+        CREATE VIRTUAL TABLE units_fts USING fts5(
+            unit_id UNINDEXED, title, description, location, property_type,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS units_fts_delete AFTER DELETE ON units BEGIN
+            DELETE FROM units_fts WHERE rowid = old.rowid;
+        END
+        """
+    )
+    conn.execute("DELETE FROM app_meta WHERE key='search.normalizer_version'")
+
+
+def _0020_reservation_generations(conn: sqlite3.Connection) -> None:
+    # The availability index (availability.py) is rebuilt when units or
+    # unit_reservations change in any process.
+    conn.execute("INSERT OR IGNORE INTO table_generations(name, generation) VALUES('unit_reservations', 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS unit_reservations_generation_{event.lower()}
+            AFTER {event} ON unit_reservations
+            BEGIN
+              UPDATE table_generations SET generation=generation+1 WHERE name='unit_reservations';
+            END
+            """
+        )
+
+
+MIGRATIONS: list[Migration] = [
+    _0001_initial_schema,
+    _0002_app_meta,
+    _0004_epoch_ms_timestamps,
+    _0008_numeric_prices,
+    _0009_unit_reservations,
+    _0010_id_sequences,
+    _0011_hit_counts,
+    _0012_guests,
+    _0013_time_ordered_ids,
+    _0014_table_generations,
+    _0016_media_sources,
+    _0017_media_store,
+    _0019_units_fts_rowid,
+    _0020_reservation_generations,
+]
+
+
+def _version(step: Migration) -> int:
+    return int(step.__name__[1:5])
+
+
+LATEST_VERSION = max(_version(step) for step in MIGRATIONS)
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    if schema_version(conn) >= LATEST_VERSION:
+        return LATEST_VERSION
+
+    if conn.in_transaction:
+        conn.commit()
+    # BEGIN IMMEDIATE serialises concurrent processes; re-read the version
+    # once the write lock is held in case another process got there first.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        current = schema_version(conn)
+        for step in MIGRATIONS:
+            version = _version(step)
+            if version <= current:
+                continue
+            step(conn)
+            conn.execute(f"PRAGMA user_version={version:d}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return schema_version(conn)
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import unicodedata
+
+# Phones are stored as international digits without "+": guests type
+# "010 1234 5678", "+20 10 1234 5678", "00201012345678" or Arabic-Indic
+# digits for the same number, and all of those become "201012345678".
+DEFAULT_COUNTRY_CODE = "20"
+_LOCAL_MOBILE_LENGTH = 11
+
+
+def normalize_phone(raw) -> str:
+    digits = "".join(str(unicodedata.decimal(ch)) for ch in str(raw or "") if ch.isdecimal())
+    if digits.startswith("00"):
+        return digits[2:]
+    if digits.startswith("0") and len(digits) == _LOCAL_MOBILE_LENGTH:
+        return DEFAULT_COUNTRY_CODE + digits[1:]
+    return digits
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import re
+from typing import Optional
+
+_DIGITS = str.maketrans("٠١٢٣٤٥٦٧٨٩۰۱۲۳۴۵۶۷۸۹", "01234567890123456789")
+_CURRENCY = re.compile(r"(جنيه|جنية|ج\.?م|egp|le|l\.e\.?|ج)", re.IGNORECASE)
+_NUMBER = re.compile(r"^\d+(?:\.\d+)?$")
+
+
+def parse_price(text) -> Optional[int]:
+    """Return a whole-pound price for admin-entered text, or None if empty.
+
+    Accepts Arabic-Indic digits, thousands separators and a trailing currency
+    word ("1,500 جنيه", "١٥٠٠", "9000 EGP"). Raises ValueError for anything
+    else so the admin forms can reject it.
+    """
+    value = str(text or "").strip()
+    if not value:
+        return None
+    value = value.translate(_DIGITS).replace("٬", "").replace(",", "").replace("،", "")
+    value = _CURRENCY.sub("", value).strip()
+    if not _NUMBER.match(value):
+        raise ValueError(f"invalid price: {text!r}")
+    return int(round(float(value)))
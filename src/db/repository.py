@@ -1,22 +1,145 @@
 from __future__ import annotations
 
+import base64
 import json
-import uuid
-from datetime import date
+from datetime import date, datetime, time, timezone
 from typing import Any, Optional
 
-from .database import get_conn
+from . import availability
+from .cache import cached_read
+from .cards import UNIT_CARD_COLUMNS, UnitCard
+from .database import after_commit, get_conn, transaction
+from .lead_writer import flush_leads, submit_lead, submit_lead_hit
+from .guests import upsert_guest
+from .ids import new_id
+from .phones import normalize_phone
+from .prices import parse_price
+from .search import bm25_expr, fts_query, index_unit
+from .throttle import BOOKING_COALESCE_SECONDS, check_rate, lead_coalescer
 
 
-def _next_unit_id(conn) -> str:
-    row = conn.execute("SELECT unit_id FROM units ORDER BY unit_id DESC LIMIT 1").fetchone()
-    if not row:
-        return "SH-0001"
+def get_meta(key: str, default: str = "") -> str:
+    with get_conn() as conn:
+        row = conn.execute("SELECT value FROM app_meta WHERE key=?", (key,)).fetchone()
+        return str(row["value"]) if row else default
+
+
+def set_meta(key: str, value: str) -> None:
+    with get_conn() as conn:
+        conn.execute(
+            """
+            INSERT INTO app_meta(key, value, updated_at) VALUES(?,?, datetime('now'))
+            ON CONFLICT(key) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at
+            """,
+            (key, value),
+        )
+
+
+def _timestamp() -> tuple[str, int]:
+    now = datetime.now(timezone.utc)
+    return now.strftime("%Y-%m-%d %H:%M:%S"), int(now.timestamp() * 1000)
+
+
+def _encode_cursor(*key: Any) -> str:
+    raw = json.dumps(list(key), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, size: int) -> list[Any]:
     try:
-        n = int(str(row["unit_id"]).split("-")[1])
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
     except Exception:
-        n = 0
-    return f"SH-{n+1:04d}"
+        raise ValueError("invalid cursor") from None
+    if not isinstance(key, list) or len(key) != size:
+        raise ValueError("invalid cursor")
+    return key
+
+
+def _date_range_ms(date_from: str, date_to: str) -> tuple[Optional[int], Optional[int]]:
+    def _ms(value: str, end_of_day: bool) -> Optional[int]:
+        try:
+            d = date.fromisoformat((value or "").strip())
+        except ValueError:
+            return None
+        dt = datetime.combine(d, time.max if end_of_day else time.min, tzinfo=timezone.utc)
+        return int(dt.timestamp() * 1000)
+
+    return _ms(date_from, False), _ms(date_to, True)
+
+
+def _keyset_page(
+    conn,
+    *,
+    select: str,
+    where: list[str],
+    params: list[Any],
+    key_columns: tuple[str, ...],
+    descending: bool,
+    cursor: Optional[str],
+    limit: int,
+) -> tuple[list[Any], Optional[str]]:
+    where = list(where)
+    params = list(params)
+    if cursor:
+        cols = ", ".join(key_columns)
+        marks = ", ".join("?" for _ in key_columns)
+        where.append(f"({cols}) {'<' if descending else '>'} ({marks})")
+        params.extend(_decode_cursor(cursor, len(key_columns)))
+    q = select
+    if where:
+        q += " WHERE " + " AND ".join(where)
+    direction = "DESC" if descending else "ASC"
+    q += " ORDER BY " + ", ".join(f"{c} {direction}" for c in key_columns) + " LIMIT ?"
+    limit = max(1, int(limit))
+    rows = conn.execute(q, (*params, limit + 1)).fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = _encode_cursor(*(last[c] for c in key_columns))
+    return rows, next_cursor
+
+
+UNIT_ID_PREFIX = "SH-"
+UNIT_ID_WIDTH = 4
+
+
+def _format_unit_id(n: int) -> str:
+    # Zero-padded to four digits; larger numbers simply grow (SH-10000).
+    return f"{UNIT_ID_PREFIX}{n:0{UNIT_ID_WIDTH}d}"
+
+
+def _allocate(conn, name: str, count: int = 1) -> range:
+    # The UPDATE runs inside an IMMEDIATE transaction, so concurrent callers
+    # are serialised by SQLite's write lock and never see the same value.
+    _begin_immediate(conn)
+    rows = conn.execute(
+        "UPDATE id_sequences SET value=value+? WHERE name=? RETURNING value", (count, name)
+    ).fetchall()
+    if rows:
+        last = int(rows[0]["value"])
+    else:
+        last = count
+        conn.execute("INSERT INTO id_sequences(name, value) VALUES(?,?)", (name, last))
+    return range(last - count + 1, last + 1)
+
+
+def _next_unit_id(conn) -> str:
+    while True:
+        unit_id = _format_unit_id(_allocate(conn, "units")[0])
+        # Skip codes inserted by hand outside the allocator.
+        if not conn.execute("SELECT 1 FROM units WHERE unit_id=?", (unit_id,)).fetchone():
+            return unit_id
+
+
+def reserve_unit_ids(count: int) -> list[str]:
+    # For bulk imports: reserve the codes up front, then pass each one to
+    # create_unit(payload, unit_id=...).
+    if count < 1:
+        return []
+    with get_conn() as conn:
+        return [_format_unit_id(n) for n in _allocate(conn, "units", int(count))]
 
 
 def _unit_days(booked_from: str, booked_to: str) -> int:
@@ -35,6 +158,7 @@ def _hydrate_unit(row) -> dict[str, Any]:
     return d
 
 
+@cached_read("units")
 def list_units(active_only: bool = True) -> list[dict[str, Any]]:
     q = "SELECT * FROM units"
     if active_only:
@@ -44,24 +168,235 @@ def list_units(active_only: bool = True) -> list[dict[str, Any]]:
         return [_hydrate_unit(r) for r in conn.execute(q).fetchall()]
 
 
+def list_units_page(
+    *,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    active_only: bool = True,
+) -> dict[str, Any]:
+    with get_conn() as conn:
+        rows, next_cursor = _keyset_page(
+            conn,
+            select="SELECT * FROM units",
+            where=["is_active=1"] if active_only else [],
+            params=[],
+            key_columns=("unit_id",),
+            descending=False,
+            cursor=cursor,
+            limit=limit,
+        )
+    return {"items": [_hydrate_unit(r) for r in rows], "next_cursor": next_cursor}
+
+
+def _unit_cards(conn, sql: str, params: Any = ()) -> list[UnitCard]:
+    # Plain tuples straight into UnitCard: no sqlite3.Row, no dict.
+    cur = conn.cursor()
+    cur.row_factory = None
+    return list(map(UnitCard._make, cur.execute(sql, params)))
+
+
+@cached_read("units")
+def list_unit_cards(active_only: bool = True) -> list[UnitCard]:
+    q = f"SELECT {UNIT_CARD_COLUMNS} FROM units"
+    if active_only:
+        q += " WHERE is_active=1"
+    q += " ORDER BY unit_id ASC"
+    with get_conn() as conn:
+        return _unit_cards(conn, q)
+
+
+UNIT_SORTS = {
+    "code": "unit_id ASC",
+    "price_asc": "price_day_value IS NULL, price_day_value ASC, unit_id ASC",
+    "price_desc": "price_day_value IS NULL, price_day_value DESC, unit_id ASC",
+}
+
+
+def _prefix_range(prefix: str) -> tuple[str, str]:
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def list_unit_facets() -> dict[str, list[str]]:
+    with get_conn() as conn:
+        locations = [
+            r["location"]
+            for r in conn.execute("SELECT DISTINCT location FROM units WHERE is_active=1 ORDER BY location").fetchall()
+        ]
+        property_types = [
+            r["property_type"]
+            for r in conn.execute(
+                "SELECT DISTINCT property_type FROM units WHERE is_active=1 ORDER BY property_type"
+            ).fetchall()
+        ]
+    return {"locations": locations, "property_types": property_types}
+
+
+_FREE_BETWEEN_SQL = f"""
+    (NOT {availability.BOUND_SQL.format(col="available_from")} OR available_from<=?)
+    AND (NOT {availability.BOUND_SQL.format(col="available_to")} OR available_to>=?)
+    AND NOT EXISTS (
+        SELECT 1 FROM unit_reservations r
+        WHERE r.unit_id=units.unit_id AND r.start_date<=? AND r.end_date>=?
+    )
+"""
+
+
+def _free_page(
+    conn, sql: str, params: list[Any], free: availability.FreeUnits, limit: int, offset: int, count: bool
+) -> tuple[list[str], int]:
+    # The stay filter is answered from the availability index: walk the
+    # matching ids in page order and keep the free ones, stopping after the
+    # page (plus one row for has_more) unless every match must be counted.
+    want = limit if count else limit + 1
+    page: list[str] = []
+    matched = 0
+    cur = conn.cursor()
+    cur.row_factory = None
+    for (unit_id,) in cur.execute(sql, params):
+        if unit_id not in free:
+            continue
+        if matched >= offset and len(page) < want:
+            page.append(unit_id)
+        matched += 1
+        if not count and len(page) == want:
+            break
+    return page, matched
+
+
+def _cards_by_id(conn, unit_ids: list[str]) -> list[UnitCard]:
+    if not unit_ids:
+        return []
+    marks = ",".join("?" for _ in unit_ids)
+    rows = _unit_cards(conn, f"SELECT {UNIT_CARD_COLUMNS} FROM units WHERE unit_id IN ({marks})", unit_ids)
+    cards = {c.unit_id: c for c in rows}
+    return [cards[u] for u in unit_ids if u in cards]
+
+
+def search_units(
+    *,
+    location: str = "",
+    property_type: str = "",
+    min_rooms: int = 0,
+    search: str = "",
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    stay_from: str = "",
+    stay_to: str = "",
+    sort: str = "code",
+    limit: int = 30,
+    offset: int = 0,
+    count: bool = True,
+) -> dict[str, Any]:
+    # count=False skips counting every match (total is None) and reads one
+    # extra row to tell whether another page follows.
+    where = ["is_active=1"]
+    params: list[Any] = []
+    free: Optional[availability.FreeUnits] = None
+    if stay_from or stay_to:
+        start, end = _stay_dates(stay_from, stay_to)
+        free = availability.free_units(start, end)
+        if free is None:
+            # Outside the indexed season: answer from the tables directly.
+            where.append(_FREE_BETWEEN_SQL)
+            params.extend([start, end, end, start])
+    if location:
+        where.append("location=?")
+        params.append(location)
+    if property_type:
+        where.append("property_type=?")
+        params.append(property_type)
+    if int(min_rooms or 0) > 0:
+        where.append("rooms>=?")
+        params.append(int(min_rooms))
+    if min_price is not None:
+        where.append("price_day_value>=?")
+        params.append(int(min_price))
+    if max_price is not None:
+        where.append("price_day_value<=?")
+        params.append(int(max_price))
+    where_sql = " WHERE " + " AND ".join(where)
+    source = "units"
+    order = UNIT_SORTS.get(sort, UNIT_SORTS["code"])
+
+    s = (search or "").strip()
+    if s:
+        # Unit code prefixes rank first, then bm25 over the normalized text.
+        id_lo, id_hi = _prefix_range(s.upper())
+        match = fts_query(s)
+        matched = "SELECT unit_id FROM units WHERE unit_id>=? AND unit_id<?"
+        ranked = "SELECT unit_id, -1e9 AS rank FROM units WHERE unit_id>=? AND unit_id<?"
+        search_params: list[Any] = [id_lo, id_hi]
+        if match:
+            matched += " UNION SELECT unit_id FROM units_fts WHERE units_fts MATCH ?"
+            ranked += f" UNION ALL SELECT unit_id, {bm25_expr()} FROM units_fts WHERE units_fts MATCH ?"
+            search_params.append(match)
+        count_sql = f"SELECT COUNT(*) AS c FROM units{where_sql} AND unit_id IN ({matched})"
+        count_params = params + search_params
+        source = f"units JOIN (SELECT unit_id, MIN(rank) AS rank FROM ({ranked}) GROUP BY unit_id) m USING(unit_id)"
+        params = search_params + params
+        if sort == "code":
+            order = "m.rank ASC, unit_id ASC"
+    else:
+        count_sql = f"SELECT COUNT(*) AS c FROM units{where_sql}"
+        count_params = params
+
+    limit, offset = max(1, int(limit)), max(0, int(offset))
+    with get_conn() as conn:
+        if free is not None:
+            page, matched = _free_page(
+                conn, f"SELECT unit_id FROM {source}{where_sql} ORDER BY {order}", params, free, limit, offset, count
+            )
+            total = matched if count else None
+            items = _cards_by_id(conn, page)
+        else:
+            if count:
+                total = int(conn.execute(count_sql, count_params).fetchone()["c"])
+            else:
+                total = None
+            items = _unit_cards(
+                conn,
+                f"SELECT {UNIT_CARD_COLUMNS} FROM {source}{where_sql} ORDER BY {order} LIMIT ? OFFSET ?",
+                (*params, limit if total is not None else limit + 1, offset),
+            )
+    if total is None:
+        has_more = len(items) > limit
+        del items[limit:]
+    else:
+        has_more = offset + len(items) < total
+    return {"items": items, "total": total, "has_more": has_more}
+
+
 def get_unit(unit_id: str) -> Optional[dict[str, Any]]:
     with get_conn() as conn:
         row = conn.execute("SELECT * FROM units WHERE unit_id=?", (unit_id,)).fetchone()
         return _hydrate_unit(row) if row else None
 
 
-def create_unit(payload: dict[str, Any]) -> str:
+def get_units(unit_ids) -> dict[str, dict[str, Any]]:
+    ids = list(dict.fromkeys(u for u in unit_ids if u))
+    if not ids:
+        return {}
     with get_conn() as conn:
-        unit_id = _next_unit_id(conn)
+        rows = conn.execute(
+            "SELECT * FROM units WHERE unit_id IN (SELECT value FROM json_each(?))", (json.dumps(ids),)
+        ).fetchall()
+    return {r["unit_id"]: _hydrate_unit(r) for r in rows}
+
+
+def create_unit(payload: dict[str, Any], *, unit_id: str = "") -> str:
+    price_day_value = parse_price(payload.get("price_day", ""))
+    price_week_value = parse_price(payload.get("price_week", ""))
+    with transaction() as conn:
+        unit_id = unit_id or _next_unit_id(conn)
         photo_urls_json = json.dumps(payload.get("photo_urls") or [], ensure_ascii=False)
         conn.execute(
             """
             INSERT INTO units(
               unit_id, title, property_type, location, rooms, description, youtube_url, cover_image_url,
               photo_urls_json, contact_whatsapp, contact_phone, available_from, available_to,
-              price_day, price_week, is_active, updated_at
+              price_day, price_week, price_day_value, price_week_value, is_active, updated_at
             )
-            VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?, datetime('now'))
+            VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?, datetime('now'))
             """,
             (
                 unit_id,
@@ -79,15 +414,21 @@ def create_unit(payload: dict[str, Any]) -> str:
                 payload.get("available_to", "").strip(),
                 payload.get("price_day", "").strip(),
                 payload.get("price_week", "").strip(),
+                price_day_value,
+                price_week_value,
                 1 if payload.get("is_active", True) else 0,
             ),
         )
-        return unit_id
+        index_unit(conn, unit_id)
+        after_commit(availability.refresh_units, unit_id)
+    return unit_id
 
 
 def update_unit(unit_id: str, payload: dict[str, Any]) -> None:
+    price_day_value = parse_price(payload.get("price_day", ""))
+    price_week_value = parse_price(payload.get("price_week", ""))
     photo_urls_json = json.dumps(payload.get("photo_urls") or [], ensure_ascii=False)
-    with get_conn() as conn:
+    with transaction() as conn:
         conn.execute(
             """
             UPDATE units SET
@@ -95,6 +436,7 @@ def update_unit(unit_id: str, payload: dict[str, Any]) -> None:
               youtube_url=?, cover_image_url=?, photo_urls_json=?,
               contact_whatsapp=?, contact_phone=?,
               available_from=?, available_to=?, price_day=?, price_week=?,
+              price_day_value=?, price_week_value=?,
               is_active=?, updated_at=datetime('now')
             WHERE unit_id=?
             """,
@@ -113,10 +455,111 @@ def update_unit(unit_id: str, payload: dict[str, Any]) -> None:
                 payload.get("available_to", "").strip(),
                 payload.get("price_day", "").strip(),
                 payload.get("price_week", "").strip(),
+                price_day_value,
+                price_week_value,
                 1 if payload.get("is_active", True) else 0,
                 unit_id,
             ),
         )
+        index_unit(conn, unit_id)
+        after_commit(availability.refresh_units, unit_id)
+
+
+class ReservationConflict(ValueError):
+    pass
+
+
+def _begin_immediate(conn) -> None:
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+
+
+def _stay_dates(booked_from: str, booked_to: str) -> tuple[str, str]:
+    try:
+        d1 = date.fromisoformat((booked_from or "").strip())
+        d2 = date.fromisoformat((booked_to or "").strip())
+    except ValueError:
+        raise ValueError("booking dates must be YYYY-MM-DD") from None
+    if d2 < d1:
+        raise ValueError("booking end date is before its start date")
+    return d1.isoformat(), d2.isoformat()
+
+
+def _overlapping_reservations(conn, unit_id: str, start: str, end: str, exclude_id: Optional[int] = None) -> list:
+    q = """
+        SELECT reservation_id, unit_id, start_date, end_date, booking_id
+        FROM unit_reservations
+        WHERE unit_id=? AND start_date<=? AND end_date>=?
+    """
+    params: list[Any] = [unit_id, end, start]
+    if exclude_id is not None:
+        q += " AND reservation_id<>?"
+        params.append(exclude_id)
+    return conn.execute(q, params).fetchall()
+
+
+def find_overlapping_reservations(unit_id: str, start: str, end: str) -> list[dict[str, Any]]:
+    start, end = _stay_dates(start, end)
+    with get_conn() as conn:
+        return [dict(r) for r in _overlapping_reservations(conn, unit_id, start, end)]
+
+
+def list_unit_reservations(unit_id: str) -> list[dict[str, Any]]:
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT reservation_id, unit_id, start_date, end_date, booking_id, note, created_at
+            FROM unit_reservations
+            WHERE unit_id=?
+            ORDER BY start_date ASC
+            """,
+            (unit_id,),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+
+def _reserve(conn, *, unit_id: str, start: str, end: str, booking_id: str = "", note: str = "") -> int:
+    clash = _overlapping_reservations(conn, unit_id, start, end)
+    if clash:
+        c = clash[0]
+        raise ReservationConflict(f"{unit_id} is already reserved {c['start_date']} .. {c['end_date']}")
+    cur = conn.execute(
+        """
+        INSERT INTO unit_reservations(unit_id, start_date, end_date, booking_id, note)
+        VALUES(?,?,?,?,?)
+        """,
+        (unit_id, start, end, booking_id, note.strip()),
+    )
+    return int(cur.lastrowid)
+
+
+def _write_unit_booking_status(
+    conn,
+    *,
+    unit_id: str,
+    is_booked: bool,
+    booked_from: str,
+    booked_to: str,
+    booking_note_text: str,
+) -> None:
+    conn.execute(
+        """
+        UPDATE units
+        SET is_booked=?,
+            booked_from=?,
+            booked_to=?,
+            booking_note_text=?,
+            updated_at=datetime('now')
+        WHERE unit_id=?
+        """,
+        (
+            1 if is_booked else 0,
+            booked_from.strip() if is_booked else "",
+            booked_to.strip() if is_booked else "",
+            booking_note_text.strip() if is_booked else "",
+            unit_id,
+        ),
+    )
 
 
 def set_unit_booking_status(
@@ -127,25 +570,49 @@ def set_unit_booking_status(
     booked_to: str = "",
     booking_note_text: str = "",
 ) -> None:
-    with get_conn() as conn:
-        conn.execute(
-            """
-            UPDATE units
-            SET is_booked=?,
-                booked_from=?,
-                booked_to=?,
-                booking_note_text=?,
-                updated_at=datetime('now')
-            WHERE unit_id=?
-            """,
-            (
-                1 if is_booked else 0,
-                booked_from.strip() if is_booked else "",
-                booked_to.strip() if is_booked else "",
-                booking_note_text.strip() if is_booked else "",
-                unit_id,
-            ),
+    # The dates shown on the unit are its "current" reservation. Changing or
+    # clearing them moves or releases that reservation; other stays are kept.
+    with transaction() as conn:
+        cur = conn.execute(
+            "SELECT is_booked, booked_from, booked_to FROM units WHERE unit_id=?", (unit_id,)
+        ).fetchone()
+        if not cur:
+            return
+        booking_id = ""
+        if int(cur["is_booked"]) == 1 and cur["booked_from"] and cur["booked_to"]:
+            current = conn.execute(
+                """
+                SELECT reservation_id, booking_id FROM unit_reservations
+                WHERE unit_id=? AND start_date=? AND end_date=?
+                """,
+                (unit_id, cur["booked_from"], cur["booked_to"]),
+            ).fetchone()
+            if current:
+                booking_id = current["booking_id"]
+                conn.execute("DELETE FROM unit_reservations WHERE reservation_id=?", (current["reservation_id"],))
+        if is_booked:
+            start, end = _stay_dates(booked_from, booked_to)
+            _reserve(conn, unit_id=unit_id, start=start, end=end, booking_id=booking_id, note=booking_note_text)
+            booked_from, booked_to = start, end
+        _write_unit_booking_status(
+            conn,
+            unit_id=unit_id,
+            is_booked=is_booked,
+            booked_from=booked_from,
+            booked_to=booked_to,
+            booking_note_text=booking_note_text,
         )
+        after_commit(availability.refresh_units, unit_id)
+
+
+def list_available_units(
+    start: str,
+    end: str,
+    *,
+    limit: int = 30,
+    offset: int = 0,
+) -> dict[str, Any]:
+    return search_units(stay_from=start, stay_to=end, limit=limit, offset=offset)
 
 
 def create_lead(
@@ -158,63 +625,180 @@ def create_lead(
     duration_text: str = "",
     note: str = "",
     meta: dict | None = None,
+    session_key: str = "",
 ) -> str:
-    lead_id = str(uuid.uuid4())
+    phone = normalize_phone(guest_phone)
+    check_rate(session_key, phone)
+    created_at, created_at_ms = _timestamp()
+    key = (phone, unit_id, action)
+    if phone:
+        existing = lead_coalescer.recent(key)
+        if existing:
+            submit_lead_hit(existing, created_at_ms)
+            return existing
+
+    lead_id = new_id()
     meta_json = json.dumps(meta or {}, ensure_ascii=False)
-    with get_conn() as conn:
-        conn.execute(
-            """
-            INSERT INTO leads(
-              lead_id, unit_id, action, duration_text, note,
-              guest_name, guest_phone, guest_residence, meta_json
-            )
-            VALUES(?,?,?,?,?,?,?,?,?)
-            """,
-            (
-                lead_id,
-                unit_id,
-                action,
-                (duration_text or "").strip(),
-                (note or "").strip(),
-                (guest_name or "").strip(),
-                (guest_phone or "").strip(),
-                (guest_residence or "").strip(),
-                meta_json,
-            ),
+    # Queued for the background lead writer; the id and timestamps are
+    # fixed here so they reflect the click, not the flush.
+    submit_lead(
+        (
+            lead_id,
+            created_at,
+            created_at_ms,
+            unit_id,
+            action,
+            (duration_text or "").strip(),
+            (note or "").strip(),
+            (guest_name or "").strip(),
+            (guest_phone or "").strip(),
+            (guest_residence or "").strip(),
+            meta_json,
         )
+    )
+    if phone:
+        lead_coalescer.remember(key, lead_id)
     return lead_id
 
 
+# Guest text lives in guests; rows from before the guests table (or without
+# a phone) still carry their own copy.
+_GUEST_COLUMNS = """
+    guest_id, COALESCE(guests.name, guest_name) AS guest_name,
+    COALESCE(guests.phone, guest_phone) AS guest_phone,
+    COALESCE(guests.residence, guest_residence) AS guest_residence
+"""
+
+_LEAD_COLUMNS = f"""
+    lead_id, created_at, unit_id, action, duration_text, note,
+    {_GUEST_COLUMNS}, hit_count
+"""
+_LEADS_FROM = "leads LEFT JOIN guests USING(guest_id)"
+
+
 def list_leads(limit: int = 300) -> list[dict[str, Any]]:
     with get_conn() as conn:
         rows = conn.execute(
-            """
-            SELECT lead_id, created_at, unit_id, action, duration_text, note,
-                   guest_name, guest_phone, guest_residence
-            FROM leads
-            ORDER BY datetime(created_at) DESC
-            LIMIT ?
-            """,
+            f"SELECT {_LEAD_COLUMNS} FROM {_LEADS_FROM} ORDER BY created_at_ms DESC, lead_id DESC LIMIT ?",
             (limit,),
         ).fetchall()
         return [dict(r) for r in rows]
 
 
-def delete_all_leads() -> None:
+def list_leads_page(
+    *,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    unit_id: str = "",
+    action: str = "",
+    date_from: str = "",
+    date_to: str = "",
+) -> dict[str, Any]:
+    where: list[str] = []
+    params: list[Any] = []
+    if unit_id.strip():
+        where.append("unit_id=?")
+        params.append(unit_id.strip())
+    if action.strip():
+        where.append("action=?")
+        params.append(action.strip())
+    start_ms, end_ms = _date_range_ms(date_from, date_to)
+    if start_ms is not None:
+        where.append("created_at_ms>=?")
+        params.append(start_ms)
+    if end_ms is not None:
+        where.append("created_at_ms<=?")
+        params.append(end_ms)
     with get_conn() as conn:
+        rows, next_cursor = _keyset_page(
+            conn,
+            select=f"SELECT {_LEAD_COLUMNS}, created_at_ms FROM {_LEADS_FROM}",
+            where=where,
+            params=params,
+            key_columns=("created_at_ms", "lead_id"),
+            descending=True,
+            cursor=cursor,
+            limit=limit,
+        )
+    items = []
+    for r in rows:
+        d = dict(r)
+        d.pop("created_at_ms", None)
+        items.append(d)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def delete_all_leads() -> None:
+    flush_leads()
+    with transaction() as conn:
         conn.execute("DELETE FROM leads")
+        after_commit(lead_coalescer.forget)
+
+
+def _guest_ids(conn, guest_key: str) -> list[int]:
+    # guest_key is either a phone number (in any format) or a guest name.
+    v = (guest_key or "").strip()
+    phone = normalize_phone(v)
+    rows = conn.execute(
+        "SELECT guest_id FROM guests WHERE phone=? UNION SELECT guest_id FROM guests WHERE name=?",
+        (phone, v),
+    ).fetchall()
+    return [int(r["guest_id"]) for r in rows]
+
+
+def get_guest(guest_key: str) -> Optional[dict[str, Any]]:
+    with get_conn() as conn:
+        ids = _guest_ids(conn, guest_key)
+        if not ids:
+            return None
+        row = conn.execute("SELECT * FROM guests WHERE guest_id=?", (ids[0],)).fetchone()
+        return dict(row) if row else None
+
+
+def list_guest_activity(guest_key: str, limit: int = 200) -> list[dict[str, Any]]:
+    flush_leads()
+    with get_conn() as conn:
+        ids = _guest_ids(conn, guest_key)
+        if not ids:
+            return []
+        marks = ",".join("?" for _ in ids)
+        rows = conn.execute(
+            f"""
+            SELECT 'lead' AS kind, lead_id AS id, created_at, created_at_ms, unit_id, action AS detail, hit_count
+            FROM leads WHERE guest_id IN ({marks})
+            UNION ALL
+            SELECT 'booking', booking_id, created_at, created_at_ms, unit_id, status, hit_count
+            FROM bookings WHERE guest_id IN ({marks})
+            ORDER BY created_at_ms DESC
+            LIMIT ?
+            """,
+            (*ids, *ids, max(1, int(limit))),
+        ).fetchall()
+    items = []
+    for r in rows:
+        d = dict(r)
+        d.pop("created_at_ms", None)
+        items.append(d)
+    return items
 
 
 def delete_leads_by_guest(guest_key: str) -> int:
     v = (guest_key or "").strip()
     if not v:
         return 0
-    with get_conn() as conn:
-        cur = conn.execute(
-            "DELETE FROM leads WHERE guest_name=? OR guest_phone=?",
-            (v, v),
-        )
-        return int(cur.rowcount or 0)
+    flush_leads()
+    with transaction() as conn:
+        ids = _guest_ids(conn, v)
+        deleted: list[str] = []
+        if ids:
+            marks = ",".join("?" for _ in ids)
+            rows = conn.execute(f"DELETE FROM leads WHERE guest_id IN ({marks}) RETURNING lead_id", ids).fetchall()
+            deleted += [r["lead_id"] for r in rows]
+        # Phone-less rows (guest logins) only have the name they typed.
+        rows = conn.execute("DELETE FROM leads WHERE guest_name=? AND guest_id IS NULL RETURNING lead_id", (v,))
+        deleted += [r["lead_id"] for r in rows.fetchall()]
+        after_commit(lead_coalescer.forget, deleted)
+        return len(deleted)
 
 
 def create_booking_request(
@@ -225,22 +809,48 @@ def create_booking_request(
     guest_residence: str,
     duration_text: str = "",
     note: str = "",
+    session_key: str = "",
 ) -> str:
-    booking_id = str(uuid.uuid4())
-    with get_conn() as conn:
+    phone = normalize_phone(guest_phone)
+    check_rate(session_key, phone, booking=True)
+    booking_id = new_id()
+    created_at, created_at_ms = _timestamp()
+    with transaction() as conn:
+        guest_id = upsert_guest(conn, phone, guest_name or "", guest_residence or "", created_at_ms)
+        # A resubmitted form for the same unit while the first request is
+        # still unreviewed only bumps that request's hit counter.
+        if guest_id is not None:
+            row = conn.execute(
+                """
+                SELECT booking_id FROM bookings
+                WHERE guest_id=? AND unit_id=? AND created_at_ms>=? AND is_new_admin=1
+                ORDER BY created_at_ms DESC LIMIT 1
+                """,
+                (guest_id, unit_id, created_at_ms - int(BOOKING_COALESCE_SECONDS * 1000)),
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE bookings SET hit_count=hit_count+1, last_hit_at_ms=? WHERE booking_id=?",
+                    (created_at_ms, row["booking_id"]),
+                )
+                return row["booking_id"]
         conn.execute(
             """
             INSERT INTO bookings(
-              booking_id, unit_id, guest_name, guest_phone, guest_residence, duration_text, note
+              booking_id, created_at, created_at_ms, unit_id, guest_id, guest_name, guest_phone,
+              guest_residence, duration_text, note
             )
-            VALUES(?,?,?,?,?,?,?)
+            VALUES(?,?,?,?,?,?,?,?,?,?)
             """,
             (
                 booking_id,
+                created_at,
+                created_at_ms,
                 unit_id,
-                (guest_name or "").strip(),
-                (guest_phone or "").strip(),
-                (guest_residence or "").strip(),
+                guest_id,
+                "" if guest_id else (guest_name or "").strip(),
+                "" if guest_id else (guest_phone or "").strip(),
+                "" if guest_id else (guest_residence or "").strip(),
                 (duration_text or "").strip(),
                 (note or "").strip(),
             ),
@@ -254,23 +864,69 @@ def count_new_booking_requests() -> int:
         return int(row["c"] if row else 0)
 
 
+_BOOKING_COLUMNS = f"""
+    booking_id, created_at, unit_id, {_GUEST_COLUMNS},
+    duration_text, note, status, is_new_admin, booked_from, booked_to,
+    admin_schedule_text, reviewed_at, hit_count
+"""
+_BOOKINGS_FROM = "bookings LEFT JOIN guests USING(guest_id)"
+
+
+def _booking_row(row) -> dict[str, Any]:
+    d = dict(row)
+    d.pop("created_at_ms", None)
+    d["booked_days"] = _unit_days(d.get("booked_from", ""), d.get("booked_to", ""))
+    return d
+
+
 def list_bookings(limit: int = 1000) -> list[dict[str, Any]]:
     with get_conn() as conn:
         rows = conn.execute(
-            """
-            SELECT booking_id, created_at, unit_id, guest_name, guest_phone, guest_residence,
-                   duration_text, note, status, is_new_admin, booked_from, booked_to,
-                   admin_schedule_text, reviewed_at
-            FROM bookings
-            ORDER BY datetime(created_at) DESC
-            LIMIT ?
-            """,
+            f"SELECT {_BOOKING_COLUMNS} FROM {_BOOKINGS_FROM} ORDER BY created_at_ms DESC, booking_id DESC LIMIT ?",
             (limit,),
         ).fetchall()
-        data = [dict(r) for r in rows]
-        for d in data:
-            d["booked_days"] = _unit_days(d.get("booked_from", ""), d.get("booked_to", ""))
-        return data
+        return [_booking_row(r) for r in rows]
+
+
+def list_bookings_page(
+    *,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    unit_id: str = "",
+    status: str = "",
+    is_new_admin: Optional[bool] = None,
+    date_from: str = "",
+    date_to: str = "",
+) -> dict[str, Any]:
+    where: list[str] = []
+    params: list[Any] = []
+    if unit_id.strip():
+        where.append("unit_id=?")
+        params.append(unit_id.strip())
+    if status.strip():
+        where.append("status=?")
+        params.append(status.strip())
+    if is_new_admin is not None:
+        where.append("is_new_admin=1" if is_new_admin else "is_new_admin=0")
+    start_ms, end_ms = _date_range_ms(date_from, date_to)
+    if start_ms is not None:
+        where.append("created_at_ms>=?")
+        params.append(start_ms)
+    if end_ms is not None:
+        where.append("created_at_ms<=?")
+        params.append(end_ms)
+    with get_conn() as conn:
+        rows, next_cursor = _keyset_page(
+            conn,
+            select=f"SELECT {_BOOKING_COLUMNS}, created_at_ms FROM {_BOOKINGS_FROM}",
+            where=where,
+            params=params,
+            key_columns=("created_at_ms", "booking_id"),
+            descending=True,
+            cursor=cursor,
+            limit=limit,
+        )
+    return {"items": [_booking_row(r) for r in rows], "next_cursor": next_cursor}
 
 
 def review_booking(
@@ -282,34 +938,77 @@ def review_booking(
     admin_schedule_text: str = "",
 ) -> None:
     clean_status = status if status in {"confirmed", "rejected"} else "rejected"
-    with get_conn() as conn:
+    reviewed_at, reviewed_at_ms = _timestamp()
+    if clean_status == "confirmed":
+        booked_from, booked_to = _stay_dates(booked_from, booked_to)
+    with transaction() as conn:
+        # One unit of work: the overlap check, the booking update and the
+        # reservation insert either all land or none do, and two admins
+        # confirming the same dates are serialised by SQLite's write lock.
         row = conn.execute("SELECT unit_id FROM bookings WHERE booking_id=?", (booking_id,)).fetchone()
         if not row:
             return
         unit_id = row["unit_id"]
+        unit = conn.execute(
+            "SELECT is_booked, booked_from, booked_to FROM units WHERE unit_id=?", (unit_id,)
+        ).fetchone()
+
+        released = conn.execute(
+            "DELETE FROM unit_reservations WHERE booking_id=? RETURNING start_date, end_date", (booking_id,)
+        ).fetchall()
+        if clean_status == "confirmed":
+            _reserve(
+                conn,
+                unit_id=unit_id,
+                start=booked_from,
+                end=booked_to,
+                booking_id=booking_id,
+                note=admin_schedule_text,
+            )
 
         conn.execute(
             """
             UPDATE bookings
             SET status=?, is_new_admin=0, booked_from=?, booked_to=?,
-                admin_schedule_text=?, reviewed_at=datetime('now')
+                admin_schedule_text=?, reviewed_at=?, reviewed_at_ms=?
             WHERE booking_id=?
             """,
-            (clean_status, booked_from.strip(), booked_to.strip(), admin_schedule_text.strip(), booking_id),
+            (
+                clean_status,
+                booked_from.strip(),
+                booked_to.strip(),
+                admin_schedule_text.strip(),
+                reviewed_at,
+                reviewed_at_ms,
+                booking_id,
+            ),
         )
 
-    if clean_status == "confirmed":
-        set_unit_booking_status(
-            unit_id=unit_id,
-            is_booked=True,
-            booked_from=booked_from,
-            booked_to=booked_to,
-            booking_note_text=admin_schedule_text,
-        )
+        if clean_status == "confirmed":
+            _write_unit_booking_status(
+                conn,
+                unit_id=unit_id,
+                is_booked=True,
+                booked_from=booked_from,
+                booked_to=booked_to,
+                booking_note_text=admin_schedule_text,
+            )
+        elif (
+            unit
+            and int(unit["is_booked"]) == 1
+            and any((r["start_date"], r["end_date"]) == (unit["booked_from"], unit["booked_to"]) for r in released)
+        ):
+            # Rejecting a booking that was confirmed before: the unit was
+            # showing the stay that was just released.
+            _write_unit_booking_status(
+                conn, unit_id=unit_id, is_booked=False, booked_from="", booked_to="", booking_note_text=""
+            )
+        after_commit(availability.refresh_units, unit_id)
 
 
 def add_sponsor_media(*, slot: str, media_kind: str, url: str, title: str = "") -> str:
-    media_id = str(uuid.uuid4())
+    media_id = new_id()
+    created_at, created_at_ms = _timestamp()
     with get_conn() as conn:
         row = conn.execute(
             "SELECT COALESCE(MAX(sort_order), 0) AS m FROM sponsor_media WHERE slot=?",
@@ -318,11 +1017,15 @@ def add_sponsor_media(*, slot: str, media_kind: str, url: str, title: str = "")
         next_sort = int(row["m"] if row else 0) + 1
         conn.execute(
             """
-            INSERT INTO sponsor_media(media_id, slot, media_kind, title, url, is_active, sort_order)
-            VALUES(?,?,?,?,?,?,?)
+            INSERT INTO sponsor_media(
+              media_id, created_at, created_at_ms, slot, media_kind, title, url, is_active, sort_order
+            )
+            VALUES(?,?,?,?,?,?,?,?,?)
             """,
             (
                 media_id,
+                created_at,
+                created_at_ms,
                 (slot or "gallery").strip(),
                 (media_kind or "image").strip(),
                 (title or "").strip(),
@@ -361,11 +1064,12 @@ def update_sponsor_media(
         )
 
 
+@cached_read("sponsor_media")
 def list_sponsor_media(active_only: bool = True) -> list[dict[str, Any]]:
     q = "SELECT * FROM sponsor_media"
     if active_only:
         q += " WHERE is_active=1"
-    q += " ORDER BY slot ASC, sort_order ASC, datetime(created_at) ASC"
+    q += " ORDER BY slot ASC, sort_order ASC, created_at_ms ASC"
     with get_conn() as conn:
         return [dict(r) for r in conn.execute(q).fetchall()]
 
@@ -375,26 +1079,28 @@ def delete_sponsor_media(media_id: str) -> None:
         conn.execute("DELETE FROM sponsor_media WHERE media_id=?", (media_id,))
 
 
+@cached_read("guide_categories")
 def list_guide_categories(active_only: bool = True) -> list[dict[str, Any]]:
     q = "SELECT category_id, created_at, name, is_active, sort_order FROM guide_categories"
     if active_only:
         q += " WHERE is_active=1"
-    q += " ORDER BY sort_order ASC, datetime(created_at) ASC"
+    q += " ORDER BY sort_order ASC, created_at_ms ASC"
     with get_conn() as conn:
         return [dict(r) for r in conn.execute(q).fetchall()]
 
 
 def create_guide_category(name: str, is_active: bool = True) -> str:
-    category_id = str(uuid.uuid4())
+    category_id = new_id()
+    created_at, created_at_ms = _timestamp()
     with get_conn() as conn:
         row = conn.execute("SELECT COALESCE(MAX(sort_order), 0) AS m FROM guide_categories").fetchone()
         next_sort = int(row["m"] if row else 0) + 1
         conn.execute(
             """
-            INSERT INTO guide_categories(category_id, name, is_active, sort_order)
-            VALUES(?,?,?,?)
+            INSERT INTO guide_categories(category_id, created_at, created_at_ms, name, is_active, sort_order)
+            VALUES(?,?,?,?,?,?)
             """,
-            (category_id, (name or "").strip(), 1 if is_active else 0, next_sort),
+            (category_id, created_at, created_at_ms, (name or "").strip(), 1 if is_active else 0, next_sort),
         )
     return category_id
 
@@ -408,11 +1114,12 @@ def update_guide_category(category_id: str, name: str, is_active: bool = True) -
 
 
 def delete_guide_category(category_id: str) -> None:
-    with get_conn() as conn:
+    with transaction() as conn:
         conn.execute("DELETE FROM guide_items WHERE category_id=?", (category_id,))
         conn.execute("DELETE FROM guide_categories WHERE category_id=?", (category_id,))
 
 
+@cached_read("guide_items", "guide_categories")
 def list_guide_items(active_only: bool = True) -> list[dict[str, Any]]:
     q = """
     SELECT i.item_id, i.created_at, i.category_id, c.name AS category_name,
@@ -422,7 +1129,7 @@ def list_guide_items(active_only: bool = True) -> list[dict[str, Any]]:
     """
     if active_only:
         q += " WHERE i.is_active=1 AND c.is_active=1"
-    q += " ORDER BY c.sort_order ASC, c.name ASC, datetime(i.created_at) ASC"
+    q += " ORDER BY c.sort_order ASC, c.name ASC, i.created_at_ms ASC"
     with get_conn() as conn:
         return [dict(r) for r in conn.execute(q).fetchall()]
 
@@ -436,15 +1143,20 @@ def create_guide_item(
     image_url: str = "",
     is_active: bool = True,
 ) -> str:
-    item_id = str(uuid.uuid4())
+    item_id = new_id()
+    created_at, created_at_ms = _timestamp()
     with get_conn() as conn:
         conn.execute(
             """
-            INSERT INTO guide_items(item_id, category_id, name, description, location, image_url, is_active)
-            VALUES(?,?,?,?,?,?,?)
+            INSERT INTO guide_items(
+              item_id, created_at, created_at_ms, category_id, name, description, location, image_url, is_active
+            )
+            VALUES(?,?,?,?,?,?,?,?,?)
             """,
             (
                 item_id,
+                created_at,
+                created_at_ms,
                 (category_id or "").strip(),
                 (name or "").strip(),
                 (description or "").strip(),
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+
+# Arabic spelling variants that guests type interchangeably. The same
+# normalization is applied to indexed text and to search input, so "شالية"
+# matches "شاليه" and "أسماك" matches "اسماك". The definite article is
+# dropped too, so "العين" matches "عين" and "الساحل" matches "ساحل".
+_ARABIC_DIACRITICS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+_ARABIC_LETTERS = str.maketrans(
+    {
+        "أ": "ا",
+        "إ": "ا",
+        "آ": "ا",
+        "ٱ": "ا",
+        "ى": "ي",
+        "ة": "ه",
+        "٠": "0",
+        "١": "1",
+        "٢": "2",
+        "٣": "3",
+        "٤": "4",
+        "٥": "5",
+        "٦": "6",
+        "٧": "7",
+        "٨": "8",
+        "٩": "9",
+    }
+)
+_DEFINITE_ARTICLE = re.compile(r"\bال(?=\w{2,})")
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# units_fts holds each unit's normalized text under the unit's rowid. The
+# text is normalized here in Python when the app writes a unit (index_unit(),
+# called by create_unit() and update_unit()), so the only trigger is plain
+# SQL: deleting a unit deletes its row by rowid, from any connection. Units
+# inserted or edited outside the app (the sqlite3 shell, or after a VACUUM,
+# which may renumber rowids) are searchable again after
+# `python -m src.db.bootstrap --reindex-search`. init_db() reindexes on its
+# own whenever NORMALIZER_VERSION changes.
+NORMALIZER_VERSION = "1"
+NORMALIZER_VERSION_KEY = "search.normalizer_version"
+
+# bm25 column weights, in units_fts column order (unit_id is unindexed).
+FTS_WEIGHTS = (0.0, 10.0, 1.0, 4.0, 4.0)
+
+
+def normalize_arabic(text) -> str:
+    if text is None:
+        return ""
+    value = _ARABIC_DIACRITICS.sub("", str(text)).translate(_ARABIC_LETTERS)
+    return _DEFINITE_ARTICLE.sub("", value).casefold()
+
+
+def fts_query(text: str) -> str:
+    tokens = _TOKEN.findall(normalize_arabic(text))
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+def bm25_expr(table: str = "units_fts") -> str:
+    return f"bm25({table}, {', '.join(str(w) for w in FTS_WEIGHTS)})"
+
+
+_INDEX_SQL = """
+    INSERT INTO units_fts(rowid, unit_id, title, description, location, property_type)
+    VALUES (?,?,?,?,?,?)
+"""
+_UNIT_TEXT_SQL = "SELECT rowid, unit_id, title, description, location, property_type FROM units"
+
+
+def _fts_row(row) -> tuple:
+    rowid, unit_id, *text = row
+    return (rowid, unit_id, *(normalize_arabic(v) for v in text))
+
+
+def index_unit(conn: sqlite3.Connection, unit_id: str) -> None:
+    row = conn.execute(f"{_UNIT_TEXT_SQL} WHERE unit_id=?", (unit_id,)).fetchone()
+    if row is None:
+        return
+    conn.execute("DELETE FROM units_fts WHERE rowid=?", (row[0],))
+    conn.execute(_INDEX_SQL, _fts_row(row))
+
+
+def rebuild_units_fts(conn: sqlite3.Connection) -> None:
+    conn.execute("DELETE FROM units_fts")
+    conn.executemany(_INDEX_SQL, (_fts_row(r) for r in conn.execute(_UNIT_TEXT_SQL).fetchall()))
+    conn.execute(
+        """
+        INSERT INTO app_meta(key, value, updated_at) VALUES(?,?, datetime('now'))
+        ON CONFLICT(key) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at
+        """,
+        (NORMALIZER_VERSION_KEY, NORMALIZER_VERSION),
+    )
+
+
+def _indexed_version(conn: sqlite3.Connection) -> str:
+    row = conn.execute("SELECT value FROM app_meta WHERE key=?", (NORMALIZER_VERSION_KEY,)).fetchone()
+    return str(row[0]) if row else ""
+
+
+def sync_units_fts(conn: sqlite3.Connection) -> None:
+    if _indexed_version(conn) == NORMALIZER_VERSION:
+        return
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if _indexed_version(conn) != NORMALIZER_VERSION:
+            rebuild_units_fts(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
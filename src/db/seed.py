@@ -6,11 +6,10 @@ from .database import get_conn
 from .repository import add_sponsor_media, create_unit, create_guide_category, create_guide_item
 
 
-def seed_if_empty() -> None:
+def seed_catalog() -> None:
     _seed_units_if_empty()
     _seed_sponsors_if_empty()
     _seed_guide_if_empty()
-    _backfill_missing_media_links()
 
 
 def _seed_units_if_empty() -> None:
@@ -121,13 +120,18 @@ def _ensure_active_sponsor_slots() -> None:
             )
 
 
-def _backfill_missing_media_links() -> None:
+def backfill_media_links(since: str = "") -> str:
+    q = "SELECT unit_id, cover_image_url, photo_urls_json, youtube_url, available_to, updated_at FROM units"
+    params: tuple = ()
+    if since:
+        q += " WHERE updated_at >= ?"
+        params = (since,)
+    watermark = since
     with get_conn() as conn:
-        rows = conn.execute(
-            "SELECT unit_id, cover_image_url, photo_urls_json, youtube_url, available_to FROM units"
-        ).fetchall()
+        rows = conn.execute(q, params).fetchall()
         for r in rows:
             unit_id = r["unit_id"]
+            watermark = max(watermark, r["updated_at"] or "")
             cover = (r["cover_image_url"] or "").strip()
             photos_json = r["photo_urls_json"] or "[]"
             video = (r["youtube_url"] or "").strip()
@@ -138,6 +142,9 @@ def _backfill_missing_media_links() -> None:
             except Exception:
                 photos = []
 
+            if cover and photos and video and available_to:
+                continue
+
             if not cover:
                 cover = f"https://picsum.photos/seed/{unit_id}-cover/1200/800"
             if not photos:
@@ -158,6 +165,7 @@ def _backfill_missing_media_links() -> None:
                 """,
                 (cover, json.dumps(photos, ensure_ascii=False), video, available_to, unit_id),
             )
+    return watermark
 
 
 def _seed_guide_if_empty() -> None:
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Hashable, Iterable, Optional
+
+# Write-time guards for guest events (leads and booking requests):
+#
+# * RateLimiter keeps a token bucket per key (session, phone). Each event
+#   takes a token; an empty bucket rejects the event before it reaches SQLite.
+# * Coalescer remembers the row written for a (phone, unit, action) key so
+#   repeats inside the window become a hit on that row instead of a new one.
+#
+# Both are per process and bounded: idle keys are pruned once a table grows
+# past MAX_KEYS.
+LEAD_COALESCE_SECONDS = 600.0
+BOOKING_COALESCE_SECONDS = 3600.0
+
+# (capacity, tokens refilled per second)
+LEAD_SESSION_BUCKET = (20, 0.2)
+LEAD_PHONE_BUCKET = (30, 0.2)
+BOOKING_SESSION_BUCKET = (3, 1 / 120)
+BOOKING_PHONE_BUCKET = (3, 1 / 120)
+
+MAX_KEYS = 10_000
+
+
+class RateLimited(ValueError):
+    pass
+
+
+class RateLimiter:
+    def __init__(self, capacity: float, per_second: float, max_keys: int = MAX_KEYS) -> None:
+        self.capacity = float(capacity)
+        self.per_second = float(per_second)
+        self.max_keys = max_keys
+        self._buckets: dict[Hashable, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _prune(self, now: float) -> None:
+        full_after = self.capacity / self.per_second
+        self._buckets = {k: v for k, v in self._buckets.items() if now - v[1] < full_after}
+
+    def allow(self, key: Hashable, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last) * self.per_second)
+            if tokens < 1.0:
+                self._buckets[key] = (tokens, now)
+                self.rejected += 1
+                return False
+            self._buckets[key] = (tokens - 1.0, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class Coalescer:
+    def __init__(self, window_seconds: float, max_keys: int = MAX_KEYS) -> None:
+        self.window = float(window_seconds)
+        self.max_keys = max_keys
+        self._recent: dict[Hashable, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def recent(self, key: Hashable, now: Optional[float] = None) -> str:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._recent.get(key)
+            if entry is None or now - entry[1] > self.window:
+                return ""
+            self.hits += 1
+            return entry[0]
+
+    def remember(self, key: Hashable, row_id: str, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._recent[key] = (row_id, now)
+            if len(self._recent) > self.max_keys:
+                self._recent = {k: v for k, v in self._recent.items() if now - v[1] <= self.window}
+
+    def forget(self, row_ids: Optional[Iterable[str]] = None) -> None:
+        # Drop keys pointing at deleted rows (all keys when row_ids is None),
+        # so the next repeat writes a new row instead of a hit on nothing.
+        with self._lock:
+            if row_ids is None:
+                self._recent.clear()
+                return
+            gone = set(row_ids)
+            self._recent = {k: v for k, v in self._recent.items() if v[0] not in gone}
+
+
+lead_session_limiter = RateLimiter(*LEAD_SESSION_BUCKET)
+lead_phone_limiter = RateLimiter(*LEAD_PHONE_BUCKET)
+booking_session_limiter = RateLimiter(*BOOKING_SESSION_BUCKET)
+booking_phone_limiter = RateLimiter(*BOOKING_PHONE_BUCKET)
+lead_coalescer = Coalescer(LEAD_COALESCE_SECONDS)
+
+
+def check_rate(session_key: str, phone: str, *, booking: bool = False) -> None:
+    by_session, by_phone = (
+        (booking_session_limiter, booking_phone_limiter) if booking else (lead_session_limiter, lead_phone_limiter)
+    )
+    if session_key and not by_session.allow(session_key):
+        raise RateLimited("too many requests from this session")
+    if phone and not by_phone.allow(phone):
+        raise RateLimited("too many requests for this phone number")
+
+
+def reset_throttles() -> None:
+    # Forget all buckets and coalesced rows (tests and benchmarks).
+    for limiter in (lead_session_limiter, lead_phone_limiter, booking_session_limiter, booking_phone_limiter):
+        limiter.reset()
+    lead_coalescer.forget()
+
+
+def throttle_stats() -> dict[str, int]:
+    return {
+        "lead_rejected": lead_session_limiter.rejected + lead_phone_limiter.rejected,
+        "booking_rejected": booking_session_limiter.rejected + booking_phone_limiter.rejected,
+        "lead_coalesced": lead_coalescer.hits,
+    }
@@ -0,0 +1 @@
+# media package
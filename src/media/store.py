@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image, UnidentifiedImageError
+
+from ..db.database import after_commit, get_conn, transaction
+
+# Files uploaded by admins, stored once per distinct content:
+#
+#     static/media/ab/ab12...ef.jpg        (served at app/static/media/...)
+#
+# Catalog columns that used to hold only links (units.cover_image_url,
+# units.photo_urls_json, sponsor_media.url, guide_items.image_url) store a
+# media ID for uploads, 'media:<sha256>.<ext>', and keep accepting plain
+# links. Uploading the same bytes again, for any unit, sponsor or guide
+# item, returns the same ID.
+#
+# media_blobs.ref_count is kept by triggers (migration 0017) as catalog
+# rows start and stop using an ID. collect_unused_media() deletes blobs
+# nobody has used for GC_GRACE_SECONDS; the grace period covers files
+# uploaded in a form that has not been saved yet.
+STATIC_DIR = Path(__file__).resolve().parents[2] / "static"
+STATIC_URL = "app/static"
+MEDIA_DIR = STATIC_DIR / "media"
+
+MEDIA_PREFIX = "media:"
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+GC_GRACE_SECONDS = 24 * 3600
+
+# ext -> (mime, media kind as in sponsor_media.media_kind)
+MEDIA_TYPES = {
+    "jpg": ("image/jpeg", "image"),
+    "png": ("image/png", "image"),
+    "webp": ("image/webp", "image"),
+    "gif": ("image/gif", "gif"),
+    "mp4": ("video/mp4", "video"),
+    "webm": ("video/webm", "video"),
+}
+IMAGE_UPLOAD_TYPES = ["jpg", "jpeg", "png", "webp", "gif"]
+MEDIA_UPLOAD_TYPES = IMAGE_UPLOAD_TYPES + ["mp4", "webm"]
+
+_PIL_FORMATS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp", "GIF": "gif", "MPO": "jpg"}
+_REF = re.compile(r"media:([0-9a-f]{64})\.([a-z0-9]+)")
+
+
+class MediaError(ValueError):
+    pass
+
+
+def is_media_ref(value: str) -> bool:
+    m = _REF.fullmatch((value or "").strip())
+    return bool(m) and m.group(2) in MEDIA_TYPES
+
+
+def _parse(ref: str) -> tuple[str, str]:
+    m = _REF.fullmatch((ref or "").strip())
+    if not m or m.group(2) not in MEDIA_TYPES:
+        raise MediaError(f"معرف وسيط غير صالح: {ref}")
+    return m.group(1), m.group(2)
+
+
+def media_ref(media_id: str, ext: str) -> str:
+    return f"{MEDIA_PREFIX}{media_id}.{ext}"
+
+
+def media_path(ref: str) -> Path:
+    sha, ext = _parse(ref)
+    return MEDIA_DIR / sha[:2] / f"{sha}.{ext}"
+
+
+def media_url(ref: str) -> str:
+    sha, ext = _parse(ref)
+    return f"{STATIC_URL}/media/{sha[:2]}/{sha}.{ext}"
+
+
+def kind_of(ref: str) -> str:
+    # 'image', 'gif' or 'video', as in sponsor_media.media_kind.
+    return MEDIA_TYPES[_parse(ref)[1]][1]
+
+
+def _identify(data: bytes, filename: str) -> tuple[str, int, int]:
+    # (ext, width, height) from the content itself; the file name only has
+    # to agree on image vs. video.
+    ext = Path(filename or "").suffix.lower().lstrip(".")
+    ext = "jpg" if ext == "jpeg" else ext
+    if ext in ("mp4", "webm"):
+        if ext == "mp4" and data[4:8] != b"ftyp" or ext == "webm" and not data.startswith(b"\x1a\x45\xdf\xa3"):
+            raise MediaError(f"الملف {filename} ليس فيديو {ext} صالحاً.")
+        return ext, 0, 0
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            fmt, (width, height) = img.format, img.size
+            img.verify()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as e:
+        raise MediaError(f"الملف {filename} ليس صورة صالحة.") from e
+    if fmt not in _PIL_FORMATS:
+        raise MediaError(f"صيغة الصورة {fmt} غير مدعومة.")
+    return _PIL_FORMATS[fmt], width, height
+
+
+def save_upload(data: bytes, filename: str = "") -> str:
+    """Store ``data`` and return its media ID; identical bytes share one ID."""
+    if not data:
+        raise MediaError("الملف فارغ.")
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise MediaError(f"الملف أكبر من {MAX_UPLOAD_BYTES // (1024 * 1024)} ميجابايت.")
+    ext, width, height = _identify(data, filename)
+    sha = hashlib.sha256(data).hexdigest()
+    now_ms = int(time.time() * 1000)
+
+    # Write next to the target first; the rename and the row happen under
+    # the write lock, so collect_unused_media() cannot remove the file in
+    # between.
+    path = media_path(media_ref(sha, ext))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        with transaction() as conn:
+            row = conn.execute("SELECT ext FROM media_blobs WHERE media_id=?", (sha,)).fetchone()
+            if row:
+                ext = row["ext"]
+                path = media_path(media_ref(sha, ext))
+            if not path.exists():
+                os.replace(tmp, path)
+            if row:
+                # Re-uploading restarts the grace period of an unused blob.
+                conn.execute("UPDATE media_blobs SET uploaded_at_ms=? WHERE media_id=?", (now_ms, sha))
+            else:
+                mime, kind = MEDIA_TYPES[ext]
+                conn.execute(
+                    """
+                    INSERT INTO media_blobs(
+                      media_id, ext, mime, media_kind, size_bytes, width, height, original_name,
+                      ref_count, uploaded_at_ms
+                    )
+                    VALUES(?,?,?,?,?,?,?,?,(SELECT COUNT(*) FROM media_refs WHERE media_id=?),?)
+                    """,
+                    (sha, ext, mime, kind, len(data), width, height, (filename or "")[:200], sha, now_ms),
+                )
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    return media_ref(sha, ext)
+
+
+def get_media(ref: str) -> Optional[dict]:
+    if not is_media_ref(ref):
+        return None
+    with get_conn() as conn:
+        row = conn.execute("SELECT * FROM media_blobs WHERE media_id=?", (_parse(ref)[0],)).fetchone()
+    return dict(row) if row else None
+
+
+def collect_unused_media(grace_seconds: float = GC_GRACE_SECONDS) -> dict[str, int]:
+    """Delete blobs no catalog row has used for ``grace_seconds``, and stray
+    files without a row (an upload interrupted before it was recorded)."""
+    cutoff_ms = int((time.time() - grace_seconds) * 1000)
+    doomed: list[Path] = []
+    freed = 0
+    with transaction() as conn:
+        rows = conn.execute(
+            "SELECT media_id, ext, size_bytes FROM media_blobs WHERE ref_count=0 AND uploaded_at_ms < ?",
+            (cutoff_ms,),
+        ).fetchall()
+        conn.executemany("DELETE FROM media_blobs WHERE media_id=?", [(r["media_id"],) for r in rows])
+        for r in rows:
+            doomed.append(media_path(media_ref(r["media_id"], r["ext"])))
+            freed += int(r["size_bytes"])
+        if MEDIA_DIR.is_dir():
+            known = {r[0] for r in conn.execute("SELECT media_id FROM media_blobs")}
+            known.update(r["media_id"] for r in rows)
+            for path in MEDIA_DIR.glob("*/*"):
+                stat = path.stat()
+                if path.name.split(".", 1)[0] not in known and stat.st_mtime * 1000 < cutoff_ms:
+                    doomed.append(path)
+                    freed += stat.st_size
+        # Files go only once the rows are gone for good; a rollback keeps both.
+        after_commit(_unlink_unrecorded, doomed)
+    return {"removed": len(doomed), "freed_bytes": freed}
+
+
+def _unlink_unrecorded(paths: list[Path]) -> None:
+    # Under the write lock again: an upload of the same bytes may have
+    # recorded its blob since the commit, and then its file stays.
+    if not paths:
+        return
+    with transaction() as conn:
+        for path in paths:
+            sha = path.name.split(".", 1)[0]
+            if not conn.execute("SELECT 1 FROM media_blobs WHERE media_id=?", (sha,)).fetchone():
+                path.unlink(missing_ok=True)
+
+
+def media_stats() -> dict[str, int]:
+    with get_conn() as conn:
+        row = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0), COALESCE(SUM(ref_count=0), 0) FROM media_blobs"
+        ).fetchone()
+    return {"blobs": int(row[0]), "bytes": int(row[1]), "unused": int(row[2])}
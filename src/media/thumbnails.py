@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import requests
+from PIL import Image, ImageOps
+
+from ..db.database import get_conn
+from . import store
+
+# Remote images (unit covers, sponsor media, guide photos) and uploaded
+# media IDs (store.py) are read once,
+# resized to THUMB_WIDTHS as WebP and JPEG and stored content-addressed by
+# the SHA-256 of the source bytes:
+#
+#     static/thumbs/ab/ab12...ef-640.webp
+#
+# Streamlit serves ./static at app/static/ when server.enableStaticServing
+# is on, so pages point srcset at those files. lookup() never blocks a
+# render: an unknown URL is queued for a background fetch and the page uses
+# the original link until the derivatives exist. media_sources remembers
+# which URL produced which hash, so a URL is fetched again only after its
+# derivatives were evicted or a failed fetch is RETRY_SECONDS old.
+#
+# The directory is bounded to THUMB_CACHE_BYTES; whole sources are evicted
+# least recently used first. Use is tracked in memory and written back to
+# the files' mtime at most once per TOUCH_SECONDS, so the order survives
+# restarts without a write per page view. Animated images are left as they
+# are.
+THUMB_DIR = store.STATIC_DIR / "thumbs"
+
+THUMB_WIDTHS = (320, 640, 960)
+THUMB_FORMATS = (("webp", "WEBP", {"quality": 78, "method": 4}), ("jpg", "JPEG", {"quality": 80, "progressive": True}))
+THUMB_CACHE_BYTES = 256 * 1024 * 1024
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+FETCH_TIMEOUT_SECONDS = 10.0
+FETCH_WORKERS = 4
+RETRY_SECONDS = 24 * 3600
+TOUCH_SECONDS = 3600
+
+log = logging.getLogger(__name__)
+
+
+class Thumbnails:
+    def __init__(
+        self,
+        root: Path = THUMB_DIR,
+        widths: tuple[int, ...] = THUMB_WIDTHS,
+        max_bytes: int = THUMB_CACHE_BYTES,
+        workers: int = FETCH_WORKERS,
+    ) -> None:
+        self.root = Path(root)
+        self.widths = tuple(sorted(widths))
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbs")
+        self._loaded = False
+        self._sources: dict[str, tuple[str, tuple[int, ...], int, str]] = {}
+        self._files: OrderedDict[str, int] = OrderedDict()
+        self._touched: dict[str, float] = {}
+        self._pending: set[str] = set()
+        self._bytes = 0
+        self.fetches = 0
+        self.fetched_bytes = 0
+        self.failures = 0
+        self.evicted = 0
+
+    # -- index -------------------------------------------------------------
+
+    def _load(self) -> None:
+        # Called with self._lock held.
+        if self._loaded:
+            return
+        with get_conn() as conn:
+            rows = conn.execute("SELECT url, sha256, widths, fetched_at_ms, error FROM media_sources").fetchall()
+        for url, sha, widths, fetched_at_ms, error in rows:
+            parsed = tuple(int(w) for w in widths.split(",") if w)
+            self._sources[url] = (sha, parsed, int(fetched_at_ms), error)
+        on_disk: dict[str, tuple[float, int]] = {}
+        if self.root.is_dir():
+            for path in self.root.glob("*/*"):
+                sha = path.name.split("-", 1)[0]
+                mtime, size = on_disk.get(sha, (0.0, 0))
+                st = path.stat()
+                on_disk[sha] = (max(mtime, st.st_mtime), size + st.st_size)
+        for sha, (_, size) in sorted(on_disk.items(), key=lambda kv: kv[1][0]):
+            self._files[sha] = size
+            self._bytes += size
+        self._loaded = True
+
+    def _path(self, sha: str, width: int, ext: str) -> Path:
+        return self.root / sha[:2] / f"{sha}-{width}.{ext}"
+
+    def _static_url(self, sha: str, width: int, ext: str) -> str:
+        return f"{store.STATIC_URL}/thumbs/{sha[:2]}/{sha}-{width}.{ext}"
+
+    # -- lookups -----------------------------------------------------------
+
+    def lookup(self, url: str) -> Optional[dict[str, str]]:
+        """``{"src", "srcset", "webp_srcset"}`` for ``url``, or None when the
+        derivatives are not there yet (a fetch is queued)."""
+        url = (url or "").strip()
+        if not url.startswith(("http://", "https://")) and not store.is_media_ref(url):
+            return None
+        with self._lock:
+            self._load()
+            sha, widths, fetched_at_ms, error = self._sources.get(url, ("", (), 0, ""))
+            if sha and widths and sha in self._files:
+                self._files.move_to_end(sha)
+                self._touch(sha, widths)
+                return {
+                    "src": self._static_url(sha, widths[0], "jpg"),
+                    "srcset": ", ".join(f"{self._static_url(sha, w, 'jpg')} {w}w" for w in widths),
+                    "webp_srcset": ", ".join(f"{self._static_url(sha, w, 'webp')} {w}w" for w in widths),
+                }
+            if sha and not widths and not error:
+                return None
+            retry = error and time.time() * 1000 - fetched_at_ms < RETRY_SECONDS * 1000
+            if url not in self._pending and not retry:
+                self._pending.add(url)
+                self._pool.submit(self._fetch, url)
+        return None
+
+    def _touch(self, sha: str, widths: tuple[int, ...]) -> None:
+        now = time.time()
+        if now - self._touched.get(sha, 0.0) < TOUCH_SECONDS:
+            return
+        self._touched[sha] = now
+        for w in widths:
+            for ext, _, _ in THUMB_FORMATS:
+                try:
+                    os.utime(self._path(sha, w, ext))
+                except OSError:
+                    pass
+
+    # -- pipeline ----------------------------------------------------------
+
+    def _download(self, url: str) -> bytes:
+        if store.is_media_ref(url):
+            return store.media_path(url).read_bytes()
+        with requests.get(url, timeout=FETCH_TIMEOUT_SECONDS, stream=True) as resp:
+            resp.raise_for_status()
+            chunks, total = [], 0
+            for chunk in resp.iter_content(64 * 1024):
+                total += len(chunk)
+                if total > MAX_SOURCE_BYTES:
+                    raise ValueError(f"source larger than {MAX_SOURCE_BYTES} bytes")
+                chunks.append(chunk)
+        return b"".join(chunks)
+
+    def _derive(self, sha: str, data: bytes) -> tuple[tuple[int, ...], int]:
+        with Image.open(io.BytesIO(data)) as src:
+            if getattr(src, "is_animated", False):
+                return (), 0
+            img = ImageOps.exif_transpose(src).convert("RGB")
+        # Never upscale: widths above the source collapse into one at its width.
+        widths = tuple(sorted({min(w, img.width) for w in self.widths}))
+        written = 0
+        for w in widths:
+            resized = img if w == img.width else img.resize((w, max(1, round(img.height * w / img.width))), Image.LANCZOS)
+            for ext, fmt, options in THUMB_FORMATS:
+                path = self._path(sha, w, ext)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                buf = io.BytesIO()
+                resized.save(buf, fmt, **options)
+                tmp = path.with_suffix(path.suffix + ".tmp")
+                tmp.write_bytes(buf.getvalue())
+                os.replace(tmp, path)
+                written += buf.tell()
+        return widths, written
+
+    def _fetch(self, url: str) -> None:
+        now_ms = int(time.time() * 1000)
+        sha, widths, size, error = "", (), 0, ""
+        try:
+            data = self._download(url)
+            size = len(data)
+            sha = hashlib.sha256(data).hexdigest()
+            with self._lock:
+                known = self._sources_by_sha(sha)
+            if known:
+                # Same bytes behind another URL: reuse its derivatives.
+                widths, written = known, 0
+            else:
+                widths, written = self._derive(sha, data)
+        except Exception as e:
+            log.warning("thumbnail fetch failed for %s: %s", url, e)
+            error = str(e)[:200] or type(e).__name__
+            written = 0
+        with get_conn() as conn:
+            conn.execute(
+                """
+                INSERT INTO media_sources(url, sha256, widths, source_bytes, fetched_at_ms, error)
+                VALUES(?,?,?,?,?,?)
+                ON CONFLICT(url) DO UPDATE SET
+                  sha256=excluded.sha256, widths=excluded.widths, source_bytes=excluded.source_bytes,
+                  fetched_at_ms=excluded.fetched_at_ms, error=excluded.error
+                """,
+                (url, sha, ",".join(map(str, widths)), size, now_ms, error),
+            )
+        with self._lock:
+            self._pending.discard(url)
+            self._sources[url] = (sha, widths, now_ms, error)
+            self.fetches += 1
+            self.fetched_bytes += size
+            if error:
+                self.failures += 1
+                return
+            if not widths:
+                return
+            if sha not in self._files:
+                self._files[sha] = written
+                self._bytes += written
+            self._files.move_to_end(sha)
+            self._evict()
+
+    def _sources_by_sha(self, sha: str) -> tuple[int, ...]:
+        # Called with self._lock held.
+        if sha not in self._files:
+            return ()
+        return next((w for s, w, _, _ in self._sources.values() if s == sha and w), ())
+
+    def _evict(self) -> None:
+        # Called with self._lock held; oldest-used sources go first.
+        while self._bytes > self.max_bytes and len(self._files) > 1:
+            sha, size = self._files.popitem(last=False)
+            self._bytes -= size
+            self._touched.pop(sha, None)
+            self.evicted += 1
+            for path in (self.root / sha[:2]).glob(f"{sha}-*"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def wait(self, timeout: float = 30.0) -> None:
+        # Block until queued fetches are done (scripts and benchmarks).
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not self._pending:
+                    return
+            time.sleep(0.01)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "sources": len(self._files),
+                "bytes": self._bytes,
+                "pending": len(self._pending),
+                "fetches": self.fetches,
+                "fetched_bytes": self.fetched_bytes,
+                "failures": self.failures,
+                "evicted": self.evicted,
+            }
+
+
+_thumbnails: Optional[Thumbnails] = None
+_thumbnails_lock = threading.Lock()
+
+
+def get_thumbnails() -> Thumbnails:
+    global _thumbnails
+    if _thumbnails is None:
+        with _thumbnails_lock:
+            if _thumbnails is None:
+                _thumbnails = Thumbnails()
+    return _thumbnails
+
+
+def lookup(url: str) -> Optional[dict[str, str]]:
+    return get_thumbnails().lookup(url)
+
+
+def thumbnail_stats() -> dict[str, int]:
+    return get_thumbnails().stats()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import html
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+import streamlit as st
+
+from ..media import store, thumbnails
+
+# Read-only media and cards are built as HTML strings and sent as one
+# st.markdown element per grid or gallery, instead of one element per image,
+# caption and line. Every value that reaches the markup goes through esc()
+# or safe_url(); widgets stay in Streamlit where the page needs a click.
+#
+# Styles live in one stylesheet sent once per page (stylesheet(), called by
+# the layout), so each card carries class names instead of inline styles.
+#
+# Remote images are swapped for local resized copies once the thumbnail
+# pipeline has them (src/media/thumbnails.py); ``sizes`` tells the browser
+# how wide the image is drawn so it picks the smallest candidate that fits.
+STYLESHEET = """<style>
+.mb-grid{display:grid;gap:12px}
+.mb-media{width:100%;border-radius:10px;display:block}
+.mb-card{border:1px solid rgba(49,51,63,.2);border-radius:10px;padding:12px}
+.mb-card>div{margin-top:4px}
+.mb-title{font-weight:600}
+.mb-note{font-size:.85rem;opacity:.7;margin-top:4px}
+.mb-alert{color:#d33}
+</style>"""
+
+
+def stylesheet() -> None:
+    st.markdown(STYLESHEET, unsafe_allow_html=True)
+
+
+def esc(value) -> str:
+    return html.escape(str(value if value is not None else ""), quote=True)
+
+
+def safe_url(url: str) -> str:
+    # Only web links, site-relative paths and uploaded media IDs; anything
+    # else (javascript:, data:, ...) becomes an empty string.
+    url = (url or "").strip()
+    if not url:
+        return ""
+    if store.is_media_ref(url):
+        return esc(store.media_url(url))
+    scheme = urlsplit(url).scheme.lower()
+    if scheme not in ("http", "https", ""):
+        return ""
+    return esc(url)
+
+
+def image(url: str, *, alt: str = "", srcset: str = "", sizes: str = "100vw") -> str:
+    src = safe_url(url)
+    if not src:
+        return ""
+    thumbs = None if srcset else thumbnails.lookup(url)
+    if thumbs:
+        return (
+            f'<picture><source type="image/webp" srcset="{esc(thumbs["webp_srcset"])}" sizes="{esc(sizes)}">'
+            f'<img class="mb-media" src="{esc(thumbs["src"])}" srcset="{esc(thumbs["srcset"])}" sizes="{esc(sizes)}"'
+            f' alt="{esc(alt)}" loading="lazy"></picture>'
+        )
+    extra = f' srcset="{esc(srcset)}" sizes="{esc(sizes)}"' if srcset else ""
+    return f'<img class="mb-media" src="{src}"{extra} alt="{esc(alt)}" loading="lazy" referrerpolicy="no-referrer">'
+
+
+def video(url: str) -> str:
+    src = safe_url(url)
+    if not src:
+        return ""
+    return f'<video class="mb-media" autoplay muted loop playsinline controls><source src="{src}"></video>'
+
+
+def media(url: str, media_kind: str = "image", *, caption: str = "", sizes: str = "100vw") -> str:
+    body = video(url) if media_kind == "video" else image(url, alt=caption, sizes=sizes)
+    if not body:
+        return ""
+    if caption:
+        body += f'<div class="mb-note">{esc(caption)}</div>'
+    return f"<div>{body}</div>"
+
+
+def grid(cells: Iterable[str], columns: int = 3) -> str:
+    inner = "".join(c for c in cells if c)
+    if not inner:
+        return ""
+    template = f"repeat({max(1, int(columns))},minmax(0,1fr))"
+    return f'<div class="mb-grid" dir="rtl" style="grid-template-columns:{template}">{inner}</div>'
+
+
+def card(
+    *, image_url: str = "", title: str = "", lines: Iterable[str] = (), note: str = "", sizes: str = "100vw"
+) -> str:
+    # lines are pre-built markup (use esc() on every value inside them).
+    parts = [image(image_url, alt=title, sizes=sizes)]
+    if title:
+        parts.append(f'<div class="mb-title">{esc(title)}</div>')
+    parts.extend(f"<div>{line}</div>" for line in lines if line)
+    if note:
+        parts.append(f'<div class="mb-note">{esc(note)}</div>')
+    return f'<div class="mb-card">{"".join(parts)}</div>'
+
+
+def show(markup: str, *, fallback: Optional[str] = None) -> None:
+    """Send ``markup`` as a single element; nothing at all when it is empty."""
+    if markup:
+        st.markdown(markup, unsafe_allow_html=True)
+    elif fallback:
+        st.info(fallback)
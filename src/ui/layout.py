@@ -1,5 +1,6 @@
 ﻿import streamlit as st
 
+from . import blocks
 from .router import goto
 
 
@@ -10,6 +11,7 @@ def apply_theme() -> None:
 
 def header():
     apply_theme()
+    blocks.stylesheet()
     left, home_col, guide_col, right, admin_col = st.columns([2.3, 1, 1, 1, 1])
     with left:
         st.markdown("### دليل مطروح السياحي")
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+from typing import Optional
+
 import streamlit as st
 import streamlit.components.v1 as components
 
 from ..layout import footer, header
+from ..run_scope import loader, memo, run_scope
+from ...db.cache import cache_stats
+from ...db.lead_writer import lead_writer_stats
+from ...db.prices import parse_price
 from ...db.repository import (
     add_sponsor_media,
     count_new_booking_requests,
@@ -11,11 +17,16 @@ from ...db.repository import (
     delete_all_leads,
     delete_leads_by_guest,
     delete_sponsor_media,
-    get_unit,
-    list_bookings,
-    list_leads,
+    get_guest,
+    get_units,
+    list_bookings_page,
+    list_guest_activity,
+    list_leads_page,
     list_sponsor_media,
-    list_units,
+    list_unit_cards,
+    list_units_page,
+    list_unit_reservations,
+    ReservationConflict,
     list_guide_categories,
     list_guide_items,
     review_booking,
@@ -29,10 +40,25 @@ from ...db.repository import (
     delete_guide_item,
     update_unit,
 )
+from ...db.throttle import throttle_stats
+from ...media.store import (
+    IMAGE_UPLOAD_TYPES,
+    MEDIA_UPLOAD_TYPES,
+    MediaError,
+    collect_unused_media,
+    kind_of,
+    media_stats,
+    save_upload,
+)
+from ...media.thumbnails import thumbnail_stats
 
 PROPERTY_TYPES = ["شقة", "منزل", "فيلا", "شالية", "محل تجاري", "مخزن", "اخرى"]
 SPONSOR_SLOTS = ["main_image", "main_video", "gallery"]
 SPONSOR_KINDS = ["image", "video", "gif"]
+LEAD_ACTIONS = ["whatsapp", "call", "booking"]
+BOOKING_STATUSES = ["confirmed", "rejected"]
+PAGE_SIZE = 50
+MEDIA_ID_HELP = "الملفات المرفوعة تظهر كمعرف يبدأ بـ media: - احذف السطر لإزالة الملف."
 
 
 def _admin_gate() -> bool:
@@ -83,12 +109,11 @@ def _play_bell_once(new_count: int) -> None:
     )
 
 
-def _render_new_booking_card(b: dict, units_by_id: dict[str, dict]) -> None:
-    unit = units_by_id.get(b["unit_id"], {})
+def _render_new_booking_card(b: dict, unit: Optional[dict]) -> None:
     with st.container(border=True):
         st.markdown(f"### طلب حجز جديد - {b['booking_id'][:8]}")
         st.write(f"تاريخ الطلب: {b['created_at']}")
-        st.write(f"العقار: {unit.get('title', 'غير معروف')} (`{b['unit_id']}`)")
+        st.write(f"العقار: {unit['title'] if unit else 'غير معروف'} (`{b['unit_id']}`)")
         st.write(f"العميل: {b.get('guest_name', '')} - {b.get('guest_phone', '')}")
         st.write(f"المدينة: {b.get('guest_residence', '')}")
         st.write(f"المدة المطلوبة: {b.get('duration_text', '')}")
@@ -103,15 +128,19 @@ def _render_new_booking_card(b: dict, units_by_id: dict[str, dict]) -> None:
         c1, c2 = st.columns(2)
         with c1:
             if st.button("حفظ القرار", key=f"save_{k}", use_container_width=True):
-                review_booking(
-                    booking_id=k,
-                    status="confirmed" if confirmed else "rejected",
-                    booked_from=booked_from,
-                    booked_to=booked_to,
-                    admin_schedule_text=schedule_text,
-                )
-                st.success("تم حفظ القرار.")
-                st.rerun()
+                try:
+                    review_booking(
+                        booking_id=k,
+                        status="confirmed" if confirmed else "rejected",
+                        booked_from=booked_from,
+                        booked_to=booked_to,
+                        admin_schedule_text=schedule_text,
+                    )
+                except ValueError as e:
+                    _booking_error(e)
+                else:
+                    st.success("تم حفظ القرار.")
+                    st.rerun()
         with c2:
             if st.button("رفض / إغلاق", key=f"reject_{k}", use_container_width=True):
                 review_booking(booking_id=k, status="rejected")
@@ -119,41 +148,93 @@ def _render_new_booking_card(b: dict, units_by_id: dict[str, dict]) -> None:
                 st.rerun()
 
 
-def render():
-    header()
-    if not _admin_gate():
-        footer()
-        return
+def _prices_valid(*values: str) -> bool:
+    for v in values:
+        try:
+            parse_price(v)
+        except ValueError:
+            st.error(f"السعر غير صالح: {v} - اكتب رقم فقط (مثال: 1500).")
+            return False
+    return True
 
-    new_count = count_new_booking_requests()
-    if new_count > 0:
-        st.warning(f"يوجد {new_count} طلب حجز جديد")
-    else:
-        st.success("لا يوجد طلبات حجز جديدة")
-    _play_bell_once(new_count)
 
-    st.markdown("## لوحة الأدمن - إدارة العقارات والحجوزات والإعلانات")
-    tabs = st.tabs(["إضافة عقار", "تعديل عقار", "كل العقارات", "الحجوزات", "إعلانات السبونسر", "دليل مطروح", "Leads"])
-
-    with tabs[0]:
-        with st.form("add_unit"):
-            title = st.text_input("اسم العقار")
-            property_type = st.selectbox("نوع العقار", options=PROPERTY_TYPES, index=0)
-            location = st.text_input("المكان")
-            rooms = st.number_input("عدد الغرف", min_value=0, value=2, step=1)
-            available_from = st.text_input("متاح من (YYYY-MM-DD)", value="2026-06-01")
-            available_to = st.text_input("متاح حتى (YYYY-MM-DD)", value="2026-09-30")
-            price_day = st.text_input("سعر اليوم", value="1500")
-            price_week = st.text_input("سعر الأسبوع", value="9000")
-            contact_whatsapp = st.text_input("رقم واتساب العقار", placeholder="+2010xxxxxxxx")
-            contact_phone = st.text_input("رقم الاتصال بالعقار", placeholder="+2010xxxxxxxx")
-            youtube_url = st.text_input("لينك فيديو", value="https://www.w3schools.com/html/mov_bbb.mp4")
-            cover_image_url = st.text_input("لينك صورة الغلاف")
-            photos_multiline = st.text_area("روابط الصور (كل رابط في سطر)")
-            description = st.text_area("وصف العقار")
-            is_active = st.checkbox("مفعل", value=True)
-            ok = st.form_submit_button("حفظ وإضافة")
-        if ok:
+def _uploads(files) -> Optional[list[str]]:
+    # Media IDs of the uploaded files (none uploaded: []); None, with the
+    # error shown, if a file is rejected.
+    files = [f for f in (files if isinstance(files, list) else [files]) if f]
+    try:
+        return [save_upload(f.getvalue(), f.name) for f in files]
+    except MediaError as e:
+        st.error(str(e))
+        return None
+
+
+def _booking_error(e: ValueError) -> None:
+    if isinstance(e, ReservationConflict):
+        st.error(f"لا يمكن الحجز: توجد فترة حجز متداخلة لنفس العقار ({e}).")
+    else:
+        st.error("من فضلك اكتب تاريخ البداية والنهاية بصيغة YYYY-MM-DD والنهاية بعد البداية.")
+
+
+def _paged(key: str, fetch, filters: tuple = ()) -> dict:
+    state = st.session_state.setdefault(f"{key}_pager", {"filters": filters, "cursors": [None]})
+    if state["filters"] != filters:
+        state["filters"] = filters
+        state["cursors"] = [None]
+    try:
+        page = fetch(cursor=state["cursors"][-1])
+    except ValueError:
+        state["cursors"] = [None]
+        page = fetch(cursor=None)
+
+    # The buttons move the cursor in their callbacks, before the rerun their
+    # click starts; inside the admin fragment that rerun is the section only.
+    p1, p2, p3 = st.columns([1, 1, 3])
+    with p1:
+        st.button(
+            "السابق",
+            key=f"{key}_prev",
+            on_click=state["cursors"].pop,
+            disabled=len(state["cursors"]) == 1,
+            use_container_width=True,
+        )
+    with p2:
+        st.button(
+            "التالي",
+            key=f"{key}_next",
+            on_click=state["cursors"].append,
+            args=(page["next_cursor"],),
+            disabled=not page["next_cursor"],
+            use_container_width=True,
+        )
+    with p3:
+        st.caption(f"صفحة {len(state['cursors'])} - {len(page['items'])} صف")
+    return page
+
+
+def _section_add_unit() -> None:
+    with st.form("add_unit"):
+        title = st.text_input("اسم العقار")
+        property_type = st.selectbox("نوع العقار", options=PROPERTY_TYPES, index=0)
+        location = st.text_input("المكان")
+        rooms = st.number_input("عدد الغرف", min_value=0, value=2, step=1)
+        available_from = st.text_input("متاح من (YYYY-MM-DD)", value="2026-06-01")
+        available_to = st.text_input("متاح حتى (YYYY-MM-DD)", value="2026-09-30")
+        price_day = st.text_input("سعر اليوم", value="1500")
+        price_week = st.text_input("سعر الأسبوع", value="9000")
+        contact_whatsapp = st.text_input("رقم واتساب العقار", placeholder="+2010xxxxxxxx")
+        contact_phone = st.text_input("رقم الاتصال بالعقار", placeholder="+2010xxxxxxxx")
+        youtube_url = st.text_input("لينك فيديو", value="https://www.w3schools.com/html/mov_bbb.mp4")
+        cover_image_url = st.text_input("لينك صورة الغلاف")
+        cover_upload = st.file_uploader("أو ارفع صورة الغلاف", type=IMAGE_UPLOAD_TYPES)
+        photos_multiline = st.text_area("روابط الصور (كل رابط في سطر)")
+        photo_uploads = st.file_uploader("رفع صور إضافية", type=IMAGE_UPLOAD_TYPES, accept_multiple_files=True)
+        description = st.text_area("وصف العقار")
+        is_active = st.checkbox("مفعل", value=True)
+        ok = st.form_submit_button("حفظ وإضافة")
+    if ok and _prices_valid(price_day, price_week):
+        cover, photos = _uploads(cover_upload), _uploads(photo_uploads)
+        if cover is not None and photos is not None:
             create_unit(
                 {
                     "title": title,
@@ -162,8 +243,8 @@ def render():
                     "rooms": rooms,
                     "description": description,
                     "youtube_url": youtube_url,
-                    "cover_image_url": cover_image_url,
-                    "photo_urls": [x.strip() for x in photos_multiline.splitlines() if x.strip()],
+                    "cover_image_url": cover[0] if cover else cover_image_url,
+                    "photo_urls": [x.strip() for x in photos_multiline.splitlines() if x.strip()] + photos,
                     "contact_whatsapp": contact_whatsapp,
                     "contact_phone": contact_phone,
                     "available_from": available_from,
@@ -176,31 +257,38 @@ def render():
             st.success("تمت إضافة العقار.")
             st.rerun()
 
-    with tabs[1]:
-        units = list_units(active_only=False)
-        if units:
-            unit_id = st.selectbox("اختر عقار للتعديل", options=[u["unit_id"] for u in units])
-            unit = get_unit(unit_id)
-            if unit:
-                default_idx = PROPERTY_TYPES.index(unit.get("property_type", "شقة")) if unit.get("property_type") in PROPERTY_TYPES else 0
-                with st.form("edit_unit"):
-                    title = st.text_input("اسم العقار", value=unit["title"])
-                    property_type = st.selectbox("نوع العقار", options=PROPERTY_TYPES, index=default_idx)
-                    location = st.text_input("المكان", value=unit["location"])
-                    rooms = st.number_input("عدد الغرف", min_value=0, value=int(unit["rooms"]), step=1)
-                    available_from = st.text_input("متاح من (YYYY-MM-DD)", value=unit.get("available_from", ""))
-                    available_to = st.text_input("متاح حتى (YYYY-MM-DD)", value=unit.get("available_to", ""))
-                    price_day = st.text_input("سعر اليوم", value=unit.get("price_day", ""))
-                    price_week = st.text_input("سعر الأسبوع", value=unit.get("price_week", ""))
-                    contact_whatsapp = st.text_input("رقم واتساب العقار", value=unit.get("contact_whatsapp", ""))
-                    contact_phone = st.text_input("رقم الاتصال بالعقار", value=unit.get("contact_phone", ""))
-                    youtube_url = st.text_input("لينك فيديو", value=unit.get("youtube_url", ""))
-                    cover_image_url = st.text_input("لينك صورة الغلاف", value=unit.get("cover_image_url", ""))
-                    photos_multiline = st.text_area("روابط الصور (كل رابط في سطر)", value="\n".join(unit.get("photo_urls", [])))
-                    description = st.text_area("وصف العقار", value=unit.get("description", ""))
-                    is_active = st.checkbox("مفعل", value=bool(unit.get("is_active", 1)))
-                    save = st.form_submit_button("حفظ التعديلات")
-                if save:
+
+def _section_edit_unit() -> None:
+    units = memo(list_unit_cards, active_only=False)
+    if units:
+        unit_id = st.selectbox("اختر عقار للتعديل", options=[u.unit_id for u in units])
+        unit = loader(get_units).load(unit_id)
+        if unit:
+            default_idx = PROPERTY_TYPES.index(unit.get("property_type", "شقة")) if unit.get("property_type") in PROPERTY_TYPES else 0
+            with st.form("edit_unit"):
+                title = st.text_input("اسم العقار", value=unit["title"])
+                property_type = st.selectbox("نوع العقار", options=PROPERTY_TYPES, index=default_idx)
+                location = st.text_input("المكان", value=unit["location"])
+                rooms = st.number_input("عدد الغرف", min_value=0, value=int(unit["rooms"]), step=1)
+                available_from = st.text_input("متاح من (YYYY-MM-DD)", value=unit.get("available_from", ""))
+                available_to = st.text_input("متاح حتى (YYYY-MM-DD)", value=unit.get("available_to", ""))
+                price_day = st.text_input("سعر اليوم", value=unit.get("price_day", ""))
+                price_week = st.text_input("سعر الأسبوع", value=unit.get("price_week", ""))
+                contact_whatsapp = st.text_input("رقم واتساب العقار", value=unit.get("contact_whatsapp", ""))
+                contact_phone = st.text_input("رقم الاتصال بالعقار", value=unit.get("contact_phone", ""))
+                youtube_url = st.text_input("لينك فيديو", value=unit.get("youtube_url", ""))
+                cover_image_url = st.text_input("لينك صورة الغلاف", value=unit.get("cover_image_url", ""), help=MEDIA_ID_HELP)
+                cover_upload = st.file_uploader("أو ارفع صورة الغلاف", type=IMAGE_UPLOAD_TYPES)
+                photos_multiline = st.text_area(
+                    "روابط الصور (كل رابط في سطر)", value="\n".join(unit.get("photo_urls", [])), help=MEDIA_ID_HELP
+                )
+                photo_uploads = st.file_uploader("رفع صور إضافية", type=IMAGE_UPLOAD_TYPES, accept_multiple_files=True)
+                description = st.text_area("وصف العقار", value=unit.get("description", ""))
+                is_active = st.checkbox("مفعل", value=bool(unit.get("is_active", 1)))
+                save = st.form_submit_button("حفظ التعديلات")
+            if save and _prices_valid(price_day, price_week):
+                cover, photos = _uploads(cover_upload), _uploads(photo_uploads)
+                if cover is not None and photos is not None:
                     update_unit(
                         unit_id,
                         {
@@ -210,8 +298,8 @@ def render():
                             "rooms": rooms,
                             "description": description,
                             "youtube_url": youtube_url,
-                            "cover_image_url": cover_image_url,
-                            "photo_urls": [x.strip() for x in photos_multiline.splitlines() if x.strip()],
+                            "cover_image_url": cover[0] if cover else cover_image_url,
+                            "photo_urls": [x.strip() for x in photos_multiline.splitlines() if x.strip()] + photos,
                             "contact_whatsapp": contact_whatsapp,
                             "contact_phone": contact_phone,
                             "available_from": available_from,
@@ -223,39 +311,44 @@ def render():
                     )
                     st.success("تم الحفظ")
                     st.rerun()
-        else:
-            st.info("لا توجد عقارات.")
-
-    with tabs[2]:
-        units = list_units(active_only=False)
-        st.write(f"عدد العقارات: {len(units)}")
-        if units:
-            st.dataframe(units, use_container_width=True)
-
-    with tabs[3]:
-        units = list_units(active_only=False)
-        units_by_id = {u["unit_id"]: u for u in units}
-        bookings = list_bookings(limit=1000)
-        new_bookings = [b for b in bookings if int(b.get("is_new_admin", 0)) == 1]
-        old_bookings = [b for b in bookings if int(b.get("is_new_admin", 0)) == 0]
-
-        st.markdown(f"### حجوزات جديدة ({len(new_bookings)})")
-        if new_bookings:
-            for b in new_bookings:
-                _render_new_booking_card(b, units_by_id)
-        else:
-            st.info("لا يوجد حجوزات جديدة.")
+    else:
+        st.info("لا توجد عقارات.")
 
-        st.markdown("---")
-        st.markdown("### إدارة الحجز الحالي للعقار (إلغاء/تمديد)")
-        if units:
-            chosen_id = st.selectbox("اختر عقار", options=[u["unit_id"] for u in units], key="manage_booking_unit")
-            cu = get_unit(chosen_id) or {}
-            is_booked = st.checkbox("العقار محجوز", value=bool(int(cu.get("is_booked", 0))), key="manage_booked")
-            b_from = st.text_input("من تاريخ", value=cu.get("booked_from", ""), key="manage_bfrom")
-            b_to = st.text_input("إلى تاريخ", value=cu.get("booked_to", ""), key="manage_bto")
-            b_note = st.text_input("نص يظهر للعميل", value=cu.get("booking_note_text", ""), key="manage_bnote")
-            if st.button("حفظ حالة الحجز الحالية"):
+
+def _section_all_units() -> None:
+    page = _paged("all_units", lambda cursor: list_units_page(limit=PAGE_SIZE, cursor=cursor, active_only=False))
+    if page["items"]:
+        st.dataframe(page["items"], use_container_width=True)
+    else:
+        st.info("لا توجد عقارات.")
+
+
+def _section_bookings() -> None:
+    new_count = memo(count_new_booking_requests)
+    units = memo(list_unit_cards, active_only=False)
+    new_bookings = list_bookings_page(limit=PAGE_SIZE, is_new_admin=True)["items"]
+    # Every unit this section shows, fetched in one query on first load().
+    unit_rows = loader(get_units)
+    unit_rows.want(*(b["unit_id"] for b in new_bookings), st.session_state.get("manage_booking_unit"))
+
+    st.markdown(f"### حجوزات جديدة ({new_count})")
+    if new_bookings:
+        for b in new_bookings:
+            _render_new_booking_card(b, unit_rows.load(b["unit_id"]))
+    else:
+        st.info("لا يوجد حجوزات جديدة.")
+
+    st.markdown("---")
+    st.markdown("### إدارة الحجز الحالي للعقار (إلغاء/تمديد)")
+    if units:
+        chosen_id = st.selectbox("اختر عقار", options=[u.unit_id for u in units], key="manage_booking_unit")
+        cu = unit_rows.load(chosen_id) or {}
+        is_booked = st.checkbox("العقار محجوز", value=bool(int(cu.get("is_booked", 0))), key="manage_booked")
+        b_from = st.text_input("من تاريخ", value=cu.get("booked_from", ""), key="manage_bfrom")
+        b_to = st.text_input("إلى تاريخ", value=cu.get("booked_to", ""), key="manage_bto")
+        b_note = st.text_input("نص يظهر للعميل", value=cu.get("booking_note_text", ""), key="manage_bnote")
+        if st.button("حفظ حالة الحجز الحالية"):
+            try:
                 set_unit_booking_status(
                     unit_id=chosen_id,
                     is_booked=is_booked,
@@ -263,95 +356,137 @@ def render():
                     booked_to=b_to,
                     booking_note_text=b_note,
                 )
+            except ValueError as e:
+                _booking_error(e)
+            else:
                 st.success("تم تحديث حالة الحجز.")
                 st.rerun()
-
-        st.markdown("---")
-        st.markdown("### سجل الحجوزات")
-        if old_bookings:
-            st.dataframe(old_bookings, use_container_width=True)
-        else:
-            st.info("لا يوجد سجل حجوزات.")
-
-    with tabs[4]:
-        st.markdown("### إدارة إعلانات السبونسر")
-        with st.form("add_sponsor_media"):
-            slot = st.selectbox("مكان الإعلان", options=SPONSOR_SLOTS, index=2)
-            media_kind = st.selectbox("نوع الوسيط", options=SPONSOR_KINDS, index=0)
-            title = st.text_input("عنوان اختياري")
-            url = st.text_input("لينك الصورة/الفيديو/GIF")
-            add = st.form_submit_button("إضافة إعلان")
-        if add:
+        reservations = list_unit_reservations(chosen_id)
+        if reservations:
+            st.caption("كل فترات الحجز المسجلة لهذا العقار")
+            st.dataframe(reservations, use_container_width=True)
+
+    st.markdown("---")
+    st.markdown("### سجل الحجوزات")
+    h1, h2, h3, h4 = st.columns(4)
+    with h1:
+        hist_unit = st.text_input("كود العقار", key="bookings_hist_unit")
+    with h2:
+        hist_status = st.selectbox("الحالة", options=["الكل"] + BOOKING_STATUSES, key="bookings_hist_status")
+    with h3:
+        hist_from = st.text_input("من تاريخ (YYYY-MM-DD)", key="bookings_hist_from")
+    with h4:
+        hist_to = st.text_input("إلى تاريخ (YYYY-MM-DD)", key="bookings_hist_to")
+    hist_filters = (hist_unit, "" if hist_status == "الكل" else hist_status, hist_from, hist_to)
+    page = _paged(
+        "bookings_hist",
+        lambda cursor: list_bookings_page(
+            limit=PAGE_SIZE,
+            cursor=cursor,
+            is_new_admin=False,
+            unit_id=hist_filters[0],
+            status=hist_filters[1],
+            date_from=hist_filters[2],
+            date_to=hist_filters[3],
+        ),
+        hist_filters,
+    )
+    if page["items"]:
+        st.dataframe(page["items"], use_container_width=True)
+    else:
+        st.info("لا يوجد سجل حجوزات.")
+
+
+def _section_sponsors() -> None:
+    st.markdown("### إدارة إعلانات السبونسر")
+    with st.form("add_sponsor_media"):
+        slot = st.selectbox("مكان الإعلان", options=SPONSOR_SLOTS, index=2)
+        media_kind = st.selectbox("نوع الوسيط", options=SPONSOR_KINDS, index=0)
+        title = st.text_input("عنوان اختياري")
+        url = st.text_input("لينك الصورة/الفيديو/GIF")
+        upload = st.file_uploader("أو ارفع الملف", type=MEDIA_UPLOAD_TYPES)
+        add = st.form_submit_button("إضافة إعلان")
+    if add:
+        uploaded = _uploads(upload)
+        if uploaded:
+            # The stored file decides image / gif / video.
+            url, media_kind = uploaded[0], kind_of(uploaded[0])
+        if uploaded is not None:
             if not url.strip():
-                st.error("من فضلك أدخل لينك.")
+                st.error("من فضلك أدخل لينك أو ارفع ملفًا.")
             else:
                 add_sponsor_media(slot=slot, media_kind=media_kind, url=url, title=title)
                 st.success("تمت إضافة الإعلان.")
                 st.rerun()
 
-        media = list_sponsor_media(active_only=False)
-        active_media = [m for m in media if int(m.get("is_active", 1)) == 1]
-        inactive_media = [m for m in media if int(m.get("is_active", 1)) == 0]
-        st.write(f"إجمالي الوسائط: {len(media)} | النشطة: {len(active_media)} | المعطلة: {len(inactive_media)}")
-
-        if media:
-            c1, c2, c3 = st.columns(3)
-            with c1:
-                if active_media:
-                    disable_id = st.selectbox("اختيار إعلان لتعطيله", options=[m["media_id"] for m in active_media], key="sp_disable_id")
-                    if st.button("تعطيل الإعلان", use_container_width=True):
-                        cur = next((m for m in media if m["media_id"] == disable_id), None)
-                        if cur:
-                            update_sponsor_media(
-                                disable_id,
-                                slot=cur["slot"],
-                                media_kind=cur["media_kind"],
-                                url=cur.get("url", ""),
-                                title=cur.get("title", ""),
-                                is_active=False,
-                            )
-                            st.warning("تم تعطيل الإعلان.")
-                            st.rerun()
-                else:
-                    st.info("لا يوجد إعلان نشط.")
-            with c2:
-                if inactive_media:
-                    enable_id = st.selectbox("اختيار إعلان لإعادة التفعيل", options=[m["media_id"] for m in inactive_media], key="sp_enable_id")
-                    if st.button("إعادة تفعيل الإعلان", use_container_width=True):
-                        cur = next((m for m in media if m["media_id"] == enable_id), None)
-                        if cur:
-                            update_sponsor_media(
-                                enable_id,
-                                slot=cur["slot"],
-                                media_kind=cur["media_kind"],
-                                url=cur.get("url", ""),
-                                title=cur.get("title", ""),
-                                is_active=True,
-                            )
-                            st.success("تمت إعادة التفعيل.")
-                            st.rerun()
-                else:
-                    st.info("لا يوجد إعلان معطل.")
-            with c3:
-                del_id = st.selectbox("اختيار إعلان لحذفه نهائيًا", options=[m["media_id"] for m in media], key="sp_delete_id")
-                if st.button("حذف الإعلان نهائيًا", use_container_width=True):
-                    delete_sponsor_media(del_id)
-                    st.error("تم حذف الإعلان نهائيًا.")
-                    st.rerun()
+    media = memo(list_sponsor_media, active_only=False)
+    active_media = [m for m in media if int(m.get("is_active", 1)) == 1]
+    inactive_media = [m for m in media if int(m.get("is_active", 1)) == 0]
+    st.write(f"إجمالي الوسائط: {len(media)} | النشطة: {len(active_media)} | المعطلة: {len(inactive_media)}")
 
-            st.markdown("---")
-            edit_id = st.selectbox("اختيار وسيط للتعديل", options=[m["media_id"] for m in media], key="sp_edit_id")
-            cur = next((m for m in media if m["media_id"] == edit_id), None)
-            if cur:
-                e1, e2 = st.columns(2)
-                with e1:
-                    e_slot = st.selectbox("مكان الوسيط", options=SPONSOR_SLOTS, index=SPONSOR_SLOTS.index(cur["slot"]) if cur["slot"] in SPONSOR_SLOTS else 2)
-                    e_kind = st.selectbox("نوع الوسيط", options=SPONSOR_KINDS, index=SPONSOR_KINDS.index(cur["media_kind"]) if cur["media_kind"] in SPONSOR_KINDS else 0)
-                with e2:
-                    e_title = st.text_input("العنوان", value=cur.get("title", ""))
-                    e_url = st.text_input("اللينك", value=cur.get("url", ""))
-                e_active = st.checkbox("نشط", value=bool(int(cur.get("is_active", 1))))
-                if st.button("حفظ تعديل الوسيط", use_container_width=True):
+    if media:
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            if active_media:
+                disable_id = st.selectbox("اختيار إعلان لتعطيله", options=[m["media_id"] for m in active_media], key="sp_disable_id")
+                if st.button("تعطيل الإعلان", use_container_width=True):
+                    cur = next((m for m in media if m["media_id"] == disable_id), None)
+                    if cur:
+                        update_sponsor_media(
+                            disable_id,
+                            slot=cur["slot"],
+                            media_kind=cur["media_kind"],
+                            url=cur.get("url", ""),
+                            title=cur.get("title", ""),
+                            is_active=False,
+                        )
+                        st.warning("تم تعطيل الإعلان.")
+                        st.rerun()
+            else:
+                st.info("لا يوجد إعلان نشط.")
+        with c2:
+            if inactive_media:
+                enable_id = st.selectbox("اختيار إعلان لإعادة التفعيل", options=[m["media_id"] for m in inactive_media], key="sp_enable_id")
+                if st.button("إعادة تفعيل الإعلان", use_container_width=True):
+                    cur = next((m for m in media if m["media_id"] == enable_id), None)
+                    if cur:
+                        update_sponsor_media(
+                            enable_id,
+                            slot=cur["slot"],
+                            media_kind=cur["media_kind"],
+                            url=cur.get("url", ""),
+                            title=cur.get("title", ""),
+                            is_active=True,
+                        )
+                        st.success("تمت إعادة التفعيل.")
+                        st.rerun()
+            else:
+                st.info("لا يوجد إعلان معطل.")
+        with c3:
+            del_id = st.selectbox("اختيار إعلان لحذفه نهائيًا", options=[m["media_id"] for m in media], key="sp_delete_id")
+            if st.button("حذف الإعلان نهائيًا", use_container_width=True):
+                delete_sponsor_media(del_id)
+                st.error("تم حذف الإعلان نهائيًا.")
+                st.rerun()
+
+        st.markdown("---")
+        edit_id = st.selectbox("اختيار وسيط للتعديل", options=[m["media_id"] for m in media], key="sp_edit_id")
+        cur = next((m for m in media if m["media_id"] == edit_id), None)
+        if cur:
+            e1, e2 = st.columns(2)
+            with e1:
+                e_slot = st.selectbox("مكان الوسيط", options=SPONSOR_SLOTS, index=SPONSOR_SLOTS.index(cur["slot"]) if cur["slot"] in SPONSOR_SLOTS else 2)
+                e_kind = st.selectbox("نوع الوسيط", options=SPONSOR_KINDS, index=SPONSOR_KINDS.index(cur["media_kind"]) if cur["media_kind"] in SPONSOR_KINDS else 0)
+            with e2:
+                e_title = st.text_input("العنوان", value=cur.get("title", ""))
+                e_url = st.text_input("اللينك", value=cur.get("url", ""), help=MEDIA_ID_HELP)
+                e_upload = st.file_uploader("أو ارفع ملفًا بدلًا منه", type=MEDIA_UPLOAD_TYPES, key="sp_edit_upload")
+            e_active = st.checkbox("نشط", value=bool(int(cur.get("is_active", 1))))
+            if st.button("حفظ تعديل الوسيط", use_container_width=True):
+                uploaded = _uploads(e_upload)
+                if uploaded:
+                    e_url, e_kind = uploaded[0], kind_of(uploaded[0])
+                if uploaded is not None:
                     update_sponsor_media(
                         edit_id,
                         slot=e_slot,
@@ -363,163 +498,283 @@ def render():
                     st.success("تم تعديل الوسيط.")
                     st.rerun()
 
-            st.markdown("---")
-            st.dataframe(media, use_container_width=True)
-        else:
-            st.info("لا توجد وسائط حالياً.")
+        st.markdown("---")
+        st.dataframe(media, use_container_width=True)
+    else:
+        st.info("لا توجد وسائط حالياً.")
 
-    with tabs[5]:
-        st.markdown("### إدارة دليل مطروح")
+    st.markdown("#### الملفات المرفوعة")
+    ms = media_stats()
+    st.caption(
+        f"{ms['blobs']} ملف ({ms['bytes'] / 1_048_576:.1f} ميجابايت) - غير مستخدم {ms['unused']} "
+        "(العقارات والإعلانات والدليل تشترك في الملف نفسه عند رفعه أكثر من مرة)"
+    )
+    if st.button("حذف الملفات غير المستخدمة منذ يوم", key="media_gc"):
+        gc = collect_unused_media()
+        st.success(f"تم حذف {gc['removed']} ملف ({gc['freed_bytes'] / 1_048_576:.1f} ميجابايت).")
 
-        categories = list_guide_categories(active_only=False)
-        items = list_guide_items(active_only=False)
-        st.write(f"عدد الأقسام: {len(categories)} | عدد العناصر: {len(items)}")
 
-        with st.container(border=True):
-            st.markdown("#### إضافة قسم جديد")
-            new_cat_name = st.text_input("اسم القسم", key="guide_new_cat_name")
-            new_cat_active = st.checkbox("القسم نشط", value=True, key="guide_new_cat_active")
-            if st.button("إضافة القسم", key="guide_add_cat_btn"):
-                if not new_cat_name.strip():
-                    st.error("من فضلك اكتب اسم القسم.")
-                else:
-                    create_guide_category(new_cat_name, is_active=new_cat_active)
-                    st.success("تمت إضافة القسم.")
-                    st.rerun()
+def _section_guide() -> None:
+    st.markdown("### إدارة دليل مطروح")
 
-        if categories:
-            with st.container(border=True):
-                st.markdown("#### تعديل/حذف قسم")
-                cat_id = st.selectbox(
-                    "اختر القسم",
-                    options=[c["category_id"] for c in categories],
-                    format_func=lambda cid: next((c["name"] for c in categories if c["category_id"] == cid), cid),
-                    key="guide_edit_cat_id",
-                )
-                current_cat = next((c for c in categories if c["category_id"] == cat_id), None)
-                if current_cat:
-                    cat_name = st.text_input("اسم القسم", value=current_cat.get("name", ""), key="guide_edit_cat_name")
-                    cat_active = st.checkbox("القسم نشط", value=bool(int(current_cat.get("is_active", 1))), key="guide_edit_cat_active")
-                    c1, c2 = st.columns(2)
-                    with c1:
-                        if st.button("حفظ تعديل القسم", key="guide_update_cat_btn", use_container_width=True):
-                            if not cat_name.strip():
-                                st.error("اسم القسم مطلوب.")
-                            else:
-                                update_guide_category(cat_id, cat_name, is_active=cat_active)
-                                st.success("تم تعديل القسم.")
-                                st.rerun()
-                    with c2:
-                        if st.button("حذف القسم نهائيًا", key="guide_delete_cat_btn", use_container_width=True):
-                            delete_guide_category(cat_id)
-                            st.warning("تم حذف القسم وكل عناصره.")
-                            st.rerun()
+    categories = memo(list_guide_categories, active_only=False)
+    items = memo(list_guide_items, active_only=False)
+    st.write(f"عدد الأقسام: {len(categories)} | عدد العناصر: {len(items)}")
 
-        with st.container(border=True):
-            st.markdown("#### إضافة عنصر جديد داخل قسم")
-            active_categories = [c for c in categories if int(c.get("is_active", 1)) == 1]
-            if not active_categories:
-                st.info("أضف قسمًا نشطًا أولاً.")
+    with st.container(border=True):
+        st.markdown("#### إضافة قسم جديد")
+        new_cat_name = st.text_input("اسم القسم", key="guide_new_cat_name")
+        new_cat_active = st.checkbox("القسم نشط", value=True, key="guide_new_cat_active")
+        if st.button("إضافة القسم", key="guide_add_cat_btn"):
+            if not new_cat_name.strip():
+                st.error("من فضلك اكتب اسم القسم.")
             else:
-                add_item_cat = st.selectbox(
-                    "القسم",
-                    options=[c["category_id"] for c in active_categories],
-                    format_func=lambda cid: next((c["name"] for c in active_categories if c["category_id"] == cid), cid),
-                    key="guide_add_item_cat",
-                )
-                add_item_name = st.text_input("اسم العنصر", key="guide_add_item_name")
-                add_item_desc = st.text_area("وصف", key="guide_add_item_desc")
-                add_item_loc = st.text_input("الموقع", key="guide_add_item_loc")
-                add_item_img = st.text_input("لينك الصورة", key="guide_add_item_img")
-                add_item_active = st.checkbox("العنصر نشط", value=True, key="guide_add_item_active")
-                if st.button("إضافة العنصر", key="guide_add_item_btn"):
-                    if not add_item_name.strip():
-                        st.error("اسم العنصر مطلوب.")
-                    else:
+                create_guide_category(new_cat_name, is_active=new_cat_active)
+                st.success("تمت إضافة القسم.")
+                st.rerun()
+
+    if categories:
+        with st.container(border=True):
+            st.markdown("#### تعديل/حذف قسم")
+            cat_id = st.selectbox(
+                "اختر القسم",
+                options=[c["category_id"] for c in categories],
+                format_func=lambda cid: next((c["name"] for c in categories if c["category_id"] == cid), cid),
+                key="guide_edit_cat_id",
+            )
+            current_cat = next((c for c in categories if c["category_id"] == cat_id), None)
+            if current_cat:
+                cat_name = st.text_input("اسم القسم", value=current_cat.get("name", ""), key="guide_edit_cat_name")
+                cat_active = st.checkbox("القسم نشط", value=bool(int(current_cat.get("is_active", 1))), key="guide_edit_cat_active")
+                c1, c2 = st.columns(2)
+                with c1:
+                    if st.button("حفظ تعديل القسم", key="guide_update_cat_btn", use_container_width=True):
+                        if not cat_name.strip():
+                            st.error("اسم القسم مطلوب.")
+                        else:
+                            update_guide_category(cat_id, cat_name, is_active=cat_active)
+                            st.success("تم تعديل القسم.")
+                            st.rerun()
+                with c2:
+                    if st.button("حذف القسم نهائيًا", key="guide_delete_cat_btn", use_container_width=True):
+                        delete_guide_category(cat_id)
+                        st.warning("تم حذف القسم وكل عناصره.")
+                        st.rerun()
+
+    with st.container(border=True):
+        st.markdown("#### إضافة عنصر جديد داخل قسم")
+        active_categories = [c for c in categories if int(c.get("is_active", 1)) == 1]
+        if not active_categories:
+            st.info("أضف قسمًا نشطًا أولاً.")
+        else:
+            add_item_cat = st.selectbox(
+                "القسم",
+                options=[c["category_id"] for c in active_categories],
+                format_func=lambda cid: next((c["name"] for c in active_categories if c["category_id"] == cid), cid),
+                key="guide_add_item_cat",
+            )
+            add_item_name = st.text_input("اسم العنصر", key="guide_add_item_name")
+            add_item_desc = st.text_area("وصف", key="guide_add_item_desc")
+            add_item_loc = st.text_input("الموقع", key="guide_add_item_loc")
+            add_item_img = st.text_input("لينك الصورة", key="guide_add_item_img")
+            add_item_upload = st.file_uploader("أو ارفع الصورة", type=IMAGE_UPLOAD_TYPES, key="guide_add_item_upload")
+            add_item_active = st.checkbox("العنصر نشط", value=True, key="guide_add_item_active")
+            if st.button("إضافة العنصر", key="guide_add_item_btn"):
+                if not add_item_name.strip():
+                    st.error("اسم العنصر مطلوب.")
+                else:
+                    uploaded = _uploads(add_item_upload)
+                    if uploaded is not None:
                         create_guide_item(
                             category_id=add_item_cat,
                             name=add_item_name,
                             description=add_item_desc,
                             location=add_item_loc,
-                            image_url=add_item_img,
+                            image_url=uploaded[0] if uploaded else add_item_img,
                             is_active=add_item_active,
                         )
                         st.success("تمت إضافة العنصر.")
                         st.rerun()
 
-        if items:
-            with st.container(border=True):
-                st.markdown("#### تعديل/حذف عنصر")
-                item_id = st.selectbox(
-                    "اختر العنصر",
-                    options=[i["item_id"] for i in items],
-                    format_func=lambda iid: next((f"{it['name']} - {it.get('category_name','')}" for it in items if it["item_id"] == iid), iid),
-                    key="guide_edit_item_id",
+    if items:
+        with st.container(border=True):
+            st.markdown("#### تعديل/حذف عنصر")
+            item_id = st.selectbox(
+                "اختر العنصر",
+                options=[i["item_id"] for i in items],
+                format_func=lambda iid: next((f"{it['name']} - {it.get('category_name','')}" for it in items if it["item_id"] == iid), iid),
+                key="guide_edit_item_id",
+            )
+            current_item = next((i for i in items if i["item_id"] == item_id), None)
+            if current_item and categories:
+                edit_item_cat = st.selectbox(
+                    "القسم",
+                    options=[c["category_id"] for c in categories],
+                    index=[c["category_id"] for c in categories].index(current_item["category_id"]) if current_item["category_id"] in [c["category_id"] for c in categories] else 0,
+                    format_func=lambda cid: next((c["name"] for c in categories if c["category_id"] == cid), cid),
+                    key="guide_edit_item_cat",
                 )
-                current_item = next((i for i in items if i["item_id"] == item_id), None)
-                if current_item and categories:
-                    edit_item_cat = st.selectbox(
-                        "القسم",
-                        options=[c["category_id"] for c in categories],
-                        index=[c["category_id"] for c in categories].index(current_item["category_id"]) if current_item["category_id"] in [c["category_id"] for c in categories] else 0,
-                        format_func=lambda cid: next((c["name"] for c in categories if c["category_id"] == cid), cid),
-                        key="guide_edit_item_cat",
-                    )
-                    edit_item_name = st.text_input("اسم العنصر", value=current_item.get("name", ""), key="guide_edit_item_name")
-                    edit_item_desc = st.text_area("وصف", value=current_item.get("description", ""), key="guide_edit_item_desc")
-                    edit_item_loc = st.text_input("الموقع", value=current_item.get("location", ""), key="guide_edit_item_loc")
-                    edit_item_img = st.text_input("لينك الصورة", value=current_item.get("image_url", ""), key="guide_edit_item_img")
-                    edit_item_active = st.checkbox("العنصر نشط", value=bool(int(current_item.get("is_active", 1))), key="guide_edit_item_active")
-
-                    e1, e2 = st.columns(2)
-                    with e1:
-                        if st.button("حفظ تعديل العنصر", key="guide_update_item_btn", use_container_width=True):
-                            if not edit_item_name.strip():
-                                st.error("اسم العنصر مطلوب.")
-                            else:
+                edit_item_name = st.text_input("اسم العنصر", value=current_item.get("name", ""), key="guide_edit_item_name")
+                edit_item_desc = st.text_area("وصف", value=current_item.get("description", ""), key="guide_edit_item_desc")
+                edit_item_loc = st.text_input("الموقع", value=current_item.get("location", ""), key="guide_edit_item_loc")
+                edit_item_img = st.text_input(
+                    "لينك الصورة", value=current_item.get("image_url", ""), key="guide_edit_item_img", help=MEDIA_ID_HELP
+                )
+                edit_item_upload = st.file_uploader(
+                    "أو ارفع صورة بدلًا منه", type=IMAGE_UPLOAD_TYPES, key="guide_edit_item_upload"
+                )
+                edit_item_active = st.checkbox("العنصر نشط", value=bool(int(current_item.get("is_active", 1))), key="guide_edit_item_active")
+
+                e1, e2 = st.columns(2)
+                with e1:
+                    if st.button("حفظ تعديل العنصر", key="guide_update_item_btn", use_container_width=True):
+                        if not edit_item_name.strip():
+                            st.error("اسم العنصر مطلوب.")
+                        else:
+                            uploaded = _uploads(edit_item_upload)
+                            if uploaded is not None:
                                 update_guide_item(
                                     item_id,
                                     category_id=edit_item_cat,
                                     name=edit_item_name,
                                     description=edit_item_desc,
                                     location=edit_item_loc,
-                                    image_url=edit_item_img,
+                                    image_url=uploaded[0] if uploaded else edit_item_img,
                                     is_active=edit_item_active,
                                 )
                                 st.success("تم تعديل العنصر.")
                                 st.rerun()
-                    with e2:
-                        if st.button("حذف العنصر نهائيًا", key="guide_delete_item_btn", use_container_width=True):
-                            delete_guide_item(item_id)
-                            st.warning("تم حذف العنصر.")
-                            st.rerun()
+                with e2:
+                    if st.button("حذف العنصر نهائيًا", key="guide_delete_item_btn", use_container_width=True):
+                        delete_guide_item(item_id)
+                        st.warning("تم حذف العنصر.")
+                        st.rerun()
 
-        st.markdown("---")
-        if categories:
-            st.markdown("#### جدول الأقسام")
-            st.dataframe(categories, use_container_width=True)
-        if items:
-            st.markdown("#### جدول عناصر الدليل")
-            st.dataframe(items, use_container_width=True)
-
-    with tabs[6]:
-        leads = list_leads(limit=500)
-        st.write(f"عدد الـ Leads: {len(leads)}")
-        l1, l2 = st.columns(2)
-        with l1:
-            if st.button("مسح كل الـ Leads"):
-                delete_all_leads()
-                st.warning("تم مسح كل الـ Leads.")
-                st.rerun()
-        with l2:
-            guest_key = st.text_input("مسح Leads لاسم أو رقم مستخدم")
-            if st.button("مسح للمستخدم المحدد"):
-                n = delete_leads_by_guest(guest_key)
-                st.warning(f"تم مسح {n} Lead.")
-                st.rerun()
-        if leads:
-            st.dataframe(leads, use_container_width=True)
+    st.markdown("---")
+    if categories:
+        st.markdown("#### جدول الأقسام")
+        st.dataframe(categories, use_container_width=True)
+    if items:
+        st.markdown("#### جدول عناصر الدليل")
+        st.dataframe(items, use_container_width=True)
+
+
+def _section_leads() -> None:
+    l1, l2 = st.columns(2)
+    with l1:
+        if st.button("مسح كل الـ Leads"):
+            delete_all_leads()
+            st.warning("تم مسح كل الـ Leads.")
+            st.rerun()
+    with l2:
+        guest_key = st.text_input("مسح Leads لاسم أو رقم مستخدم")
+        if st.button("مسح للمستخدم المحدد"):
+            n = delete_leads_by_guest(guest_key)
+            st.warning(f"تم مسح {n} Lead.")
+            st.rerun()
+
+    activity_key = st.text_input("نشاط عميل (رقم التليفون أو الاسم)", key="guest_activity")
+    if activity_key.strip():
+        guest = get_guest(activity_key)
+        if guest:
+            st.caption(f"{guest['name'] or '-'} - {guest['phone']} - {guest['residence'] or '-'}")
+            st.dataframe(list_guest_activity(activity_key), use_container_width=True)
         else:
-            st.info("لا يوجد Leads.")
+            st.info("لا يوجد عميل بهذا الرقم أو الاسم.")
+
+    f1, f2, f3, f4 = st.columns(4)
+    with f1:
+        lead_unit = st.text_input("كود العقار", key="leads_unit")
+    with f2:
+        lead_action = st.selectbox("الإجراء", options=["الكل"] + LEAD_ACTIONS, key="leads_action")
+    with f3:
+        lead_from = st.text_input("من تاريخ (YYYY-MM-DD)", key="leads_from")
+    with f4:
+        lead_to = st.text_input("إلى تاريخ (YYYY-MM-DD)", key="leads_to")
+    lead_filters = (lead_unit, "" if lead_action == "الكل" else lead_action, lead_from, lead_to)
+    page = _paged(
+        "leads",
+        lambda cursor: list_leads_page(
+            limit=PAGE_SIZE,
+            cursor=cursor,
+            unit_id=lead_filters[0],
+            action=lead_filters[1],
+            date_from=lead_filters[2],
+            date_to=lead_filters[3],
+        ),
+        lead_filters,
+    )
+    if page["items"]:
+        st.dataframe(page["items"], use_container_width=True)
+    else:
+        st.info("لا يوجد Leads.")
+    lw = lead_writer_stats()
+    st.caption(
+        f"كاتب الـ Leads: في الانتظار {lw['queue_depth']} - مكتوب {lw['written']} "
+        f"في {lw['batches']} دفعة - متوسط الدفعة {lw['avg_flush_ms']} ms "
+        f"(أقصى {lw['max_flush_ms']} ms) - كتابة مباشرة {lw['sync_writes']}"
+    )
+    throttle = throttle_stats()
+    st.caption(
+        f"نقرات مكررة مدمجة {throttle['lead_coalesced']} - مرفوض بسبب التكرار السريع: "
+        f"Leads {throttle['lead_rejected']} / حجوزات {throttle['booking_rejected']}"
+    )
+
+
+def _section_diagnostics() -> None:
+    cache = cache_stats()
+    st.caption(
+        f"كاش الكتالوج: إصابات {cache['hits']} - إخفاقات {cache['misses']} "
+        f"(نسبة الإصابة {cache['hit_rate']:.0%}) - فحوصات التغيير {cache['checks']}"
+    )
+    thumbs = thumbnail_stats()
+    st.caption(
+        f"الصور المصغرة: {thumbs['sources']} صورة ({thumbs['bytes'] / 1_048_576:.1f} ميجابايت) - "
+        f"قيد التحميل {thumbs['pending']} - فشل {thumbs['failures']} - حذف {thumbs['evicted']}"
+    )
+
+
+# Only the selected section runs, inside a fragment: widgets in it rerun
+# that section alone, not the header, counters and the other sections.
+ADMIN_SECTIONS = {
+    "إضافة عقار": _section_add_unit,
+    "تعديل عقار": _section_edit_unit,
+    "كل العقارات": _section_all_units,
+    "الحجوزات": _section_bookings,
+    "إعلانات السبونسر": _section_sponsors,
+    "دليل مطروح": _section_guide,
+    "Leads": _section_leads,
+    "الأداء": _section_diagnostics,
+}
+
+
+@st.fragment
+def _admin_sections() -> None:
+    with run_scope():
+        section = st.radio(
+            "القسم",
+            options=list(ADMIN_SECTIONS),
+            horizontal=True,
+            key="admin_section",
+            label_visibility="collapsed",
+        )
+        ADMIN_SECTIONS[section]()
+
+
+def render():
+    header()
+    if not _admin_gate():
+        footer()
+        return
+
+    new_count = memo(count_new_booking_requests)
+    if new_count > 0:
+        st.warning(f"يوجد {new_count} طلب حجز جديد")
+    else:
+        st.success("لا يوجد طلبات حجز جديدة")
+    _play_bell_once(new_count)
+
+    st.markdown("## لوحة الأدمن - إدارة العقارات والحجوزات والإعلانات")
+    _admin_sections()
 
     footer()
@@ -1,29 +1,19 @@
+from datetime import date, timedelta
+
 import streamlit as st
 
+from .. import blocks
 from ..layout import header, footer
 from ..router import goto
-from ...db.repository import list_sponsor_media, list_units
-
-
-def _render_video(url: str) -> None:
-    st.markdown(
-        f"""
-        <video style="width:100%; border-radius:10px;" autoplay muted loop playsinline controls>
-          <source src="{url}">
-        </video>
-        """,
-        unsafe_allow_html=True,
-    )
+from ...db.repository import list_sponsor_media, list_unit_facets, search_units
 
-
-def _render_remote_image(url: str) -> None:
-    st.markdown(
-        f"""
-        <img src="{url}" referrerpolicy="no-referrer" loading="lazy"
-             style="width:100%; border-radius:10px; display:block;" />
-        """,
-        unsafe_allow_html=True,
-    )
+PAGE_SIZE = 30
+PAGE_SIZES = [15, 30, 60]
+SORT_OPTIONS = {
+    "الافتراضي": "code",
+    "السعر: من الأقل": "price_asc",
+    "السعر: من الأعلى": "price_desc",
+}
 
 
 def _render_sponsors() -> None:
@@ -38,33 +28,141 @@ def _render_sponsors() -> None:
     st.markdown("### رعاة وإعلانات")
     c1, c2 = st.columns([3, 2])
     with c1:
-        if main_image and main_image.get("url"):
-            _render_remote_image(main_image["url"])
-            if main_image.get("title"):
-                st.caption(main_image["title"])
+        if main_image:
+            blocks.show(
+                blocks.media(main_image.get("url", ""), "image", caption=main_image.get("title", ""), sizes="60vw")
+            )
     with c2:
-        if main_video and main_video.get("url"):
-            if main_video.get("media_kind") == "video":
-                _render_video(main_video["url"])
-            else:
-                _render_remote_image(main_video["url"])
-            if main_video.get("title"):
-                st.caption(main_video["title"])
+        if main_video:
+            blocks.show(
+                blocks.media(main_video.get("url", ""), main_video.get("media_kind", ""), caption=main_video.get("title", ""))
+            )
 
     if gallery:
         st.markdown("#### إعلانات إضافية")
-        cols = st.columns(5)
-        for i, item in enumerate(gallery):
-            with cols[i % 5]:
-                url = item.get("url", "")
-                if not url:
-                    continue
-                if item.get("media_kind") == "video":
-                    _render_video(url)
-                else:
-                    _render_remote_image(url)
-                if item.get("title"):
-                    st.caption(item["title"])
+        blocks.show(
+            blocks.grid(
+                (
+                    blocks.media(m.get("url", ""), m.get("media_kind", ""), caption=m.get("title", ""), sizes="20vw")
+                    for m in gallery
+                ),
+                columns=5,
+            )
+        )
+
+
+def _unit_card(u) -> str:
+    esc = blocks.esc
+    lines = [
+        f"<code>{esc(u.unit_id)}</code>",
+        f"النوع: <b>{esc(u.property_type or 'شقة')}</b>",
+        f"المكان: {esc(u.location)} - غرف: {esc(u.rooms)}",
+    ]
+    if int(u.is_booked or 0) == 1:
+        lines.append(
+            f'<span class="mb-alert">محجوز من {esc(u.booked_from or "-")} إلى {esc(u.booked_to or "-")}'
+            f" ({u.booked_days} يوم)</span>"
+        )
+        if u.booking_note_text:
+            lines.append(f"<small>{esc(u.booking_note_text)}</small>")
+    lines.append(f"متاح من: <b>{esc(u.available_from)}</b> حتى <b>{esc(u.available_to)}</b>")
+    lines.append(f"اليوم: <b>{esc(u.price_day)}</b> - الأسبوع: <b>{esc(u.price_week)}</b>")
+    return blocks.card(image_url=u.cover_image_url, title=u.title, lines=lines, sizes="33vw")
+
+
+def _set_page(page_no: int) -> None:
+    st.session_state["home_page"] = max(1, page_no)
+
+
+@st.fragment
+def _unit_grid(facets: dict[str, list[str]]) -> None:
+    # Filters, pager and cards rerun on their own: changing a filter or a
+    # page does not redraw the header, the sponsors or the footer.
+    f1, f2, f3, f4 = st.columns([2, 2, 1, 1])
+    with f1:
+        loc = st.selectbox("المكان", options=["الكل"] + facets["locations"])
+    with f2:
+        ptype = st.selectbox("نوع العقار", options=["الكل"] + facets["property_types"])
+    with f3:
+        min_rooms = st.number_input("أقل عدد غرف", min_value=0, value=0, step=1)
+    with f4:
+        search = st.text_input("بحث (اسم/كود)", placeholder="SH-0001")
+
+    p1, p2, p3, p4 = st.columns([1, 1, 1, 1])
+    with p1:
+        min_price = st.number_input("أقل سعر لليوم", min_value=0, value=0, step=100)
+    with p2:
+        max_price = st.number_input("أعلى سعر لليوم (0 = بدون حد)", min_value=0, value=0, step=100)
+    with p3:
+        sort_label = st.selectbox("الترتيب", options=list(SORT_OPTIONS))
+    with p4:
+        page_size = st.selectbox("عدد العقارات في الصفحة", options=PAGE_SIZES, index=PAGE_SIZES.index(PAGE_SIZE))
+
+    d1, d2 = st.columns([1, 3])
+    with d1:
+        by_dates = st.checkbox("متاح في فترة محددة")
+    stay_from = stay_to = ""
+    if by_dates:
+        with d2:
+            stay = st.date_input(
+                "فترة الإقامة",
+                value=(date.today(), date.today() + timedelta(days=7)),
+                min_value=date.today(),
+            )
+        if isinstance(stay, (tuple, list)) and len(stay) == 2:
+            stay_from, stay_to = stay[0].isoformat(), stay[1].isoformat()
+
+    filters = {
+        "location": "" if loc == "الكل" else loc,
+        "property_type": "" if ptype == "الكل" else ptype,
+        "min_rooms": int(min_rooms),
+        "search": search,
+        "min_price": int(min_price) if min_price else None,
+        "max_price": int(max_price) if max_price else None,
+        "stay_from": stay_from,
+        "stay_to": stay_to,
+        "sort": SORT_OPTIONS[sort_label],
+    }
+    # A new filter set or page size starts again from the first page.
+    if st.session_state.get("home_filters") != (filters, page_size):
+        st.session_state["home_filters"] = (filters, page_size)
+        st.session_state["home_page"] = 1
+    page_no = max(1, int(st.session_state.get("home_page", 1)))
+    # No COUNT over all matches: the first page costs the same however
+    # large the catalog is.
+    result = search_units(**filters, limit=page_size, offset=(page_no - 1) * page_size, count=False)
+    filtered = result["items"]
+
+    if not filtered:
+        st.warning("لا توجد نتائج.")
+        if page_no > 1:
+            st.button("الصفحة الأولى", on_click=_set_page, args=(1,))
+        return
+
+    st.markdown("### العقارات")
+    cols = st.columns(3)
+    for i, u in enumerate(filtered):
+        with cols[i % 3]:
+            # One HTML element per card; the button is the only widget.
+            blocks.show(_unit_card(u))
+            if st.button("عرض التفاصيل", key=f"open_{u.unit_id}", use_container_width=True):
+                goto("unit", unit_id=u.unit_id)
+                st.rerun()
+
+    n1, n2, n3 = st.columns([1, 1, 3])
+    with n1:
+        st.button("السابق", on_click=_set_page, args=(page_no - 1,), disabled=page_no == 1, use_container_width=True)
+    with n2:
+        st.button(
+            "التالي",
+            on_click=_set_page,
+            args=(page_no + 1,),
+            disabled=not result["has_more"],
+            use_container_width=True,
+        )
+    with n3:
+        first = (page_no - 1) * page_size + 1
+        st.caption(f"صفحة {page_no} - العقارات {first} إلى {first + len(filtered) - 1}")
 
 
 def render():
@@ -80,67 +178,12 @@ def render():
     st.write("اختر عقار لعرض التفاصيل.")
     _render_sponsors()
 
-    units = list_units(active_only=True)
-    if not units:
+    facets = list_unit_facets()
+    if not facets["locations"]:
         st.info("لا توجد عقارات بعد. ادخل Admin وأضف عقارات.")
         footer()
         return
 
-    locations = sorted({u["location"] for u in units})
-    property_types = sorted({u.get("property_type", "شقة") for u in units})
-
-    f1, f2, f3, f4 = st.columns([2, 2, 1, 1])
-    with f1:
-        loc = st.selectbox("المكان", options=["الكل"] + locations)
-    with f2:
-        ptype = st.selectbox("نوع العقار", options=["الكل"] + property_types)
-    with f3:
-        min_rooms = st.number_input("أقل عدد غرف", min_value=0, value=0, step=1)
-    with f4:
-        search = st.text_input("بحث (اسم/كود)", placeholder="SH-0001")
-
-    filtered = []
-    for u in units:
-        if loc != "الكل" and u["location"] != loc:
-            continue
-        if ptype != "الكل" and u.get("property_type", "شقة") != ptype:
-            continue
-        if int(u["rooms"]) < int(min_rooms):
-            continue
-        if search.strip():
-            s = search.strip().lower()
-            if s not in u["title"].lower() and s not in u["unit_id"].lower():
-                continue
-        filtered.append(u)
-
-    if not filtered:
-        st.warning("لا توجد نتائج.")
-        footer()
-        return
-
-    st.markdown("### العقارات")
-    cols = st.columns(3)
-    for i, u in enumerate(filtered):
-        with cols[i % 3]:
-            with st.container(border=True):
-                if u.get("cover_image_url"):
-                    _render_remote_image(u["cover_image_url"])
-                st.markdown(f"**{u['title']}**  \n`{u['unit_id']}`")
-                st.write(f"النوع: **{u.get('property_type', 'شقة')}**")
-                st.write(f"المكان: {u['location']} - غرف: {u['rooms']}")
-                if int(u.get("is_booked", 0)) == 1:
-                    st.error(
-                        f"محجوز من {u.get('booked_from', '-')} إلى {u.get('booked_to', '-')} "
-                        f"({u.get('booked_days', 0)} يوم)"
-                    )
-                    if u.get("booking_note_text"):
-                        st.caption(u["booking_note_text"])
-                st.write(
-                    f"متاح من: **{u.get('available_from', '')}** "
-                    f"حتى **{u.get('available_to', '')}**"
-                )
-                st.write(f"اليوم: **{u.get('price_day', '')}** - الأسبوع: **{u.get('price_week', '')}**")
-                if st.button("عرض التفاصيل", key=f"open_{u['unit_id']}", use_container_width=True):
-                    goto("unit", unit_id=u["unit_id"])
+    _unit_grid(facets)
 
     footer()
@@ -1,5 +1,6 @@
 ﻿import streamlit as st
 
+from .. import blocks
 from ..layout import footer, apply_theme
 from ..router import goto
 from ...db.repository import list_sponsor_media
@@ -13,31 +14,10 @@ def _go_user(name: str, phone: str, residence: str, role: str) -> None:
     goto("home")
 
 
-def _render_video(url: str) -> None:
-    st.markdown(
-        f"""
-        <video style="width:100%; border-radius:12px;" autoplay muted loop playsinline controls>
-          <source src="{url}">
-        </video>
-        """,
-        unsafe_allow_html=True,
-    )
-
-
-def _render_image(url: str) -> None:
-    st.markdown(
-        f"""
-        <img src="{url}" loading="lazy" referrerpolicy="no-referrer"
-             style="width:100%; border-radius:12px; display:block;" />
-        """,
-        unsafe_allow_html=True,
-    )
-
-
 def _landing_ads() -> None:
     media = list_sponsor_media(active_only=True)
     if not media:
-        _render_image("https://picsum.photos/seed/landing-sponsor-fallback/1400/800")
+        blocks.show(blocks.image("https://picsum.photos/seed/landing-sponsor-fallback/1400/800"))
         return
 
     main_image = next((m for m in media if m["slot"] == "main_image"), None)
@@ -45,30 +25,22 @@ def _landing_ads() -> None:
     gallery = [m for m in media if m["slot"] == "gallery"][:4]
 
     if main_image and main_image.get("url"):
-        _render_image(main_image["url"])
+        blocks.show(blocks.image(main_image["url"]))
     else:
-        _render_image("https://picsum.photos/seed/landing-main/1400/800")
+        blocks.show(blocks.image("https://picsum.photos/seed/landing-main/1400/800"))
 
     if main_video and main_video.get("url"):
         st.markdown("#### إعلان فيديو")
-        if main_video.get("media_kind") == "video":
-            _render_video(main_video["url"])
-        else:
-            _render_image(main_video["url"])
+        blocks.show(blocks.media(main_video["url"], main_video.get("media_kind", "")))
 
     if gallery:
         st.markdown("#### إعلانات سريعة")
-        gcols = st.columns(2)
-        for i, item in enumerate(gallery):
-            with gcols[i % 2]:
-                if item.get("media_kind") == "video":
-                    _render_video(item["url"])
-                else:
-                    _render_image(item["url"])
+        blocks.show(blocks.grid((blocks.media(m.get("url", ""), m.get("media_kind", ""), sizes="50vw") for m in gallery), columns=2))
 
 
 def render():
     apply_theme()
+    blocks.stylesheet()
     st.markdown(
         """
         <style>
@@ -1,14 +1,23 @@
 import streamlit as st
 
+from .. import blocks
 from ..layout import footer, header
 from ...db.repository import list_guide_categories, list_guide_items
 
 
-def _render_image(url: str) -> None:
-    if (url or "").strip():
-        st.image(url, use_container_width=True)
-    else:
-        st.image("https://picsum.photos/seed/guide-fallback/1200/800", use_container_width=True)
+GUIDE_FALLBACK_IMAGE = "https://picsum.photos/seed/guide-fallback/1200/800"
+
+
+def _item_card(item: dict) -> str:
+    lines = [f"<small>{blocks.esc(item['description'])}</small>"] if item.get("description") else []
+    if item.get("location"):
+        lines.append(f"📍 {blocks.esc(item['location'])}")
+    return blocks.card(
+        image_url=(item.get("image_url") or "").strip() or GUIDE_FALLBACK_IMAGE,
+        title=item["name"],
+        lines=lines,
+        sizes="33vw",
+    )
 
 
 def render():
@@ -35,15 +44,6 @@ def render():
             st.info("لا توجد عناصر داخل هذا القسم بعد.")
             continue
 
-        cols = st.columns(3)
-        for i, item in enumerate(cat_items):
-            with cols[i % 3]:
-                with st.container(border=True):
-                    _render_image(item.get("image_url", ""))
-                    st.markdown(f"**{item['name']}**")
-                    if item.get("description"):
-                        st.caption(item["description"])
-                    if item.get("location"):
-                        st.write(f"📍 {item['location']}")
+        blocks.show(blocks.grid((_item_card(item) for item in cat_items), columns=3))
 
     footer()
@@ -1,31 +1,34 @@
+import uuid
 from urllib.parse import quote
 
 import streamlit as st
 
+from .. import blocks
 from ..layout import footer, header
 from ..router import goto
-from ...db.repository import create_booking_request, create_lead, get_unit
+from ..run_scope import loader
+from ...db.phones import normalize_phone
+from ...db.repository import create_booking_request, create_lead, get_units
+from ...db.throttle import RateLimited
 
 
-def _normalize_phone(raw: str) -> str:
-    cleaned = "".join(ch for ch in (raw or "") if ch.isdigit())
-    if cleaned.startswith("00"):
-        cleaned = cleaned[2:]
-    return cleaned
+def _session_key() -> str:
+    if "session_key" not in st.session_state:
+        st.session_state["session_key"] = uuid.uuid4().hex
+    return st.session_state["session_key"]
 
 
-def _wa_url(phone: str, message: str) -> str:
-    return f"https://wa.me/{_normalize_phone(phone)}?text={quote(message)}"
+def _track(**lead) -> None:
+    # Click tracking must never block the guest: a rate-limited click is
+    # simply not recorded.
+    try:
+        create_lead(session_key=_session_key(), **lead)
+    except RateLimited:
+        pass
 
 
-def _render_remote_image(url: str) -> None:
-    st.markdown(
-        f"""
-        <img src="{url}" referrerpolicy="no-referrer" loading="lazy"
-             style="width:100%; border-radius:10px; display:block;" />
-        """,
-        unsafe_allow_html=True,
-    )
+def _wa_url(phone: str, message: str) -> str:
+    return f"https://wa.me/{normalize_phone(phone)}?text={quote(message)}"
 
 
 def render():
@@ -44,7 +47,7 @@ def render():
         footer()
         return
 
-    unit = get_unit(unit_id)
+    unit = loader(get_units).load(unit_id)
     if not unit:
         st.error("العقار غير موجود.")
         if st.button("رجوع"):
@@ -66,14 +69,9 @@ def render():
             st.info(unit["booking_note_text"])
 
     st.markdown("### الصور")
-    if unit.get("cover_image_url"):
-        _render_remote_image(unit["cover_image_url"])
+    blocks.show(blocks.image(unit.get("cover_image_url", ""), alt=unit["title"]))
     photos = unit.get("photo_urls") or []
-    if photos:
-        for p in photos:
-            _render_remote_image(p)
-    else:
-        st.info("لا توجد صور إضافية.")
+    blocks.show(blocks.grid((blocks.image(p) for p in photos), columns=1), fallback="لا توجد صور إضافية.")
 
     st.markdown("### الفيديو")
     if unit.get("youtube_url"):
@@ -98,12 +96,12 @@ def render():
 
     c1, c2 = st.columns(2)
     with c1:
-        if not _normalize_phone(contact_whatsapp):
+        if not normalize_phone(contact_whatsapp):
             st.warning("رقم واتساب غير مضاف لهذا العقار.")
         else:
             msg = f"مرحبًا، أريد الاستفسار عن {unit['title']} ({unit['unit_id']}). اسمي {guest_name} ورقمي {guest_phone}"
             if st.button("محادثة واتساب", use_container_width=True):
-                create_lead(
+                _track(
                     unit_id=unit_id,
                     action="whatsapp",
                     guest_name=guest_name,
@@ -114,7 +112,7 @@ def render():
 
     with c2:
         if st.button("إظهار الرقم / اتصال", use_container_width=True):
-            create_lead(
+            _track(
                 unit_id=unit_id,
                 action="call",
                 guest_name=guest_name,
@@ -137,24 +135,29 @@ def render():
             ok = st.form_submit_button("إرسال طلب الحجز")
 
         if ok:
-            create_lead(
-                unit_id=unit_id,
-                action="booking",
-                guest_name=guest_name,
-                guest_phone=guest_phone,
-                guest_residence=guest_residence,
-                duration_text=duration_text,
-                note=note,
-            )
-            create_booking_request(
-                unit_id=unit_id,
-                guest_name=guest_name,
-                guest_phone=guest_phone,
-                guest_residence=guest_residence,
-                duration_text=duration_text,
-                note=note,
-            )
-            st.success("تم إرسال طلب الحجز للإدارة.")
+            try:
+                create_booking_request(
+                    unit_id=unit_id,
+                    guest_name=guest_name,
+                    guest_phone=guest_phone,
+                    guest_residence=guest_residence,
+                    duration_text=duration_text,
+                    note=note,
+                    session_key=_session_key(),
+                )
+            except RateLimited:
+                st.error("تم إرسال طلبات كثيرة. حاول مرة أخرى بعد قليل.")
+            else:
+                _track(
+                    unit_id=unit_id,
+                    action="booking",
+                    guest_name=guest_name,
+                    guest_phone=guest_phone,
+                    guest_residence=guest_residence,
+                    duration_text=duration_text,
+                    note=note,
+                )
+                st.success("تم إرسال طلب الحجز للإدارة.")
 
     c3, c4 = st.columns(2)
     with c3:
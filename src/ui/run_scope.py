@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Hashable, Iterable, Iterator, Optional
+
+from ..db.database import get_pool
+
+# Streamlit executes a script rerun, or a fragment rerun, on a single thread,
+# so a thread-local opened by run_scope() lives exactly as long as that run.
+# memo() answers identical reads made inside it once. The memo empties
+# itself whenever this process has committed since it was filled, so a read
+# that follows a write in the same run sees the write.
+#
+# loader(fetch_many) is the batched counterpart for lookups by key: render
+# code declares the keys it is about to need with want(), and the first
+# load() fetches every pending key with one fetch_many(keys) call. Rows are
+# kept in the loader's identity map for the rest of the run, so each row is
+# fetched at most once per run whatever the number of cards showing it.
+_local = threading.local()
+
+
+@contextmanager
+def run_scope() -> Iterator[None]:
+    if getattr(_local, "memo", None) is not None:
+        yield
+        return
+    _local.memo = {}
+    _local.commits = get_pool().commits
+    try:
+        yield
+    finally:
+        _local.memo = None
+
+
+def _store() -> Optional[dict]:
+    store = getattr(_local, "memo", None)
+    if store is None:
+        return None
+    commits = get_pool().commits
+    if commits != _local.commits:
+        store.clear()
+        _local.commits = commits
+    return store
+
+
+def memo(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    store = _store()
+    if store is None:
+        return fn(*args, **kwargs)
+    key = (fn, args, tuple(sorted(kwargs.items())))
+    if key not in store:
+        store[key] = fn(*args, **kwargs)
+    return store[key]
+
+
+class Loader:
+    def __init__(self, fetch_many: Callable[[list], dict]) -> None:
+        self._fetch_many = fetch_many
+        self._rows: dict[Hashable, Any] = {}
+        self._pending: set[Hashable] = set()
+        self.fetches = 0
+
+    def want(self, *keys: Hashable) -> None:
+        self._pending.update(k for k in keys if k and k not in self._rows)
+
+    def _resolve(self) -> None:
+        if not self._pending:
+            return
+        keys = sorted(self._pending)
+        self._pending.clear()
+        found = self._fetch_many(keys)
+        self.fetches += 1
+        for k in keys:
+            self._rows[k] = found.get(k)
+
+    def load(self, key: Hashable) -> Any:
+        self.want(key)
+        self._resolve()
+        return self._rows.get(key)
+
+    def load_many(self, keys: Iterable[Hashable]) -> dict[Hashable, Any]:
+        keys = list(keys)
+        self.want(*keys)
+        self._resolve()
+        return {k: self._rows.get(k) for k in keys}
+
+
+def loader(fetch_many: Callable[[list], dict]) -> Loader:
+    store = _store()
+    if store is None:
+        return Loader(fetch_many)
+    key = (Loader, fetch_many)
+    if key not in store:
+        store[key] = Loader(fetch_many)
+    return store[key]
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.db import availability, database  # noqa: E402
+from src.db.cache import catalog_cache  # noqa: E402
+from src.db.lead_writer import flush_leads  # noqa: E402
+from src.db.throttle import reset_throttles  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh, migrated database for one test, with per-process state reset."""
+    flush_leads()
+    availability.reset()
+    database.close_pool()
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "app.db")
+    catalog_cache.clear()
+    reset_throttles()
+    database.init_db()
+    yield database
+    flush_leads()
+    availability.reset()
+    database.close_pool()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from src.db import availability, repository
+from src.db.cache import catalog_cache
+
+BOUNDS = ["", "soon", "2026-7-1", " {d}", "{d}", "{d}T00:00", "2026-02-30"]
+
+
+def _window(days_from_today: int, length: int = 3) -> tuple[str, str]:
+    start = date.today() + timedelta(days=days_from_today)
+    return start.isoformat(), (start + timedelta(days=length)).isoformat()
+
+
+def _sql_free(start: str, end: str) -> set[str]:
+    with repository.get_conn() as conn:
+        rows = conn.execute(
+            f"SELECT unit_id FROM units WHERE is_active=1 AND {repository._FREE_BETWEEN_SQL}",
+            (start, end, end, start),
+        ).fetchall()
+    return {r["unit_id"] for r in rows}
+
+
+def test_index_and_sql_fallback_read_unit_bounds_alike(db):
+    near, far = ((date.today() + timedelta(days=n)).isoformat() for n in (10, 60))
+    for lo in BOUNDS:
+        for hi in BOUNDS:
+            repository.create_unit(
+                {"title": "u", "available_from": lo.format(d=near), "available_to": hi.format(d=far)}
+            )
+    for days in (0, 20, 100):
+        start, end = _window(days)
+        assert set(availability.free_unit_ids(start, end)) == _sql_free(start, end)
+
+
+def test_total_counts_current_rows_not_the_index(db):
+    units = [repository.create_unit({"title": f"u{i}"}) for i in range(3)]
+    start, end = _window(5)
+    assert repository.search_units(stay_from=start, stay_to=end)["total"] == 3
+    # Another process deactivates a unit; this index has not seen it yet.
+    with repository.get_conn() as conn:
+        conn.execute("UPDATE units SET is_active=0 WHERE unit_id=?", (units[0],))
+    result = repository.search_units(stay_from=start, stay_to=end)
+    assert result["total"] == len(result["items"]) == 2
+
+
+def test_stale_index_keeps_answering_while_it_is_rebuilt(db):
+    unit = repository.create_unit({"title": "u"})
+    start, end = _window(5)
+    assert availability.free_unit_ids(start, end) == [unit]
+    old = availability._index
+    old.built_at -= availability.REBUILD_SECONDS + 1
+    added = repository.create_unit({"title": "v"})
+    assert availability.free_unit_ids(start, end) == [unit, added]
+    deadline = time.monotonic() + 5
+    while availability._index is old and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert availability._index is not old
+    assert availability.free_unit_ids(start, end) == [unit, added]
+
+
+def test_other_process_writes_reach_the_index(db, monkeypatch):
+    monkeypatch.setattr(catalog_cache, "check_seconds", 0.0)
+    kept, taken = repository.create_unit({"title": "u"}), repository.create_unit({"title": "v"})
+    start, end = _window(5)
+    assert availability.free_unit_ids(start, end) == [kept, taken]
+    other = sqlite3.connect(db.DB_PATH)
+    with other:
+        other.execute(
+            "INSERT INTO unit_reservations(unit_id, start_date, end_date) VALUES(?,?,?)", (taken, start, end)
+        )
+    other.close()
+    deadline = time.monotonic() + 5
+    while availability.free_unit_ids(start, end) != [kept] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert availability.free_unit_ids(start, end) == [kept]
+
+
+def test_stay_search_pages_over_free_units_only(db):
+    units = [repository.create_unit({"title": f"u{i}"}) for i in range(5)]
+    start, end = _window(5)
+    repository.set_unit_booking_status(unit_id=units[1], is_booked=True, booked_from=start, booked_to=end)
+    seen, offset = [], 0
+    while True:
+        page = repository.search_units(stay_from=start, stay_to=end, limit=2, offset=offset, count=False)
+        seen += [c.unit_id for c in page["items"]]
+        if not page["has_more"]:
+            break
+        offset += 2
+    assert seen == [u for u in units if u != units[1]]
+    counted = repository.search_units(stay_from=start, stay_to=end, limit=2, offset=2)
+    assert (counted["total"], counted["has_more"]) == (4, False)
+    assert [c.unit_id for c in counted["items"]] == [units[3], units[4]]
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from src.db import repository
+
+
+def _booking(unit_id: str, phone: str) -> str:
+    return repository.create_booking_request(unit_id=unit_id, guest_name="g", guest_phone=phone, guest_residence="")
+
+
+def _confirm(booking_id: str, start: str, end: str) -> None:
+    repository.review_booking(booking_id=booking_id, status="confirmed", booked_from=start, booked_to=end)
+
+
+def test_rejecting_a_confirmed_booking_releases_the_unit(db):
+    unit_id = repository.create_unit({"title": "u", "location": "x"})
+    booking_id = _booking(unit_id, "01011111111")
+    _confirm(booking_id, "2026-07-01", "2026-07-05")
+    assert repository.get_unit(unit_id)["is_booked"] == 1
+
+    repository.review_booking(booking_id=booking_id, status="rejected")
+    unit = repository.get_unit(unit_id)
+    assert (unit["is_booked"], unit["booked_from"], unit["booked_to"]) == (0, "", "")
+    assert repository.list_unit_reservations(unit_id) == []
+    assert [c.unit_id for c in repository.list_available_units("2026-07-01", "2026-07-05")["items"]] == [unit_id]
+
+
+def test_rejecting_another_booking_keeps_the_current_stay(db):
+    unit_id = repository.create_unit({"title": "u", "location": "x"})
+    earlier, current = _booking(unit_id, "01011111111"), _booking(unit_id, "01022222222")
+    _confirm(earlier, "2026-07-01", "2026-07-03")
+    _confirm(current, "2026-07-10", "2026-07-12")
+
+    repository.review_booking(booking_id=earlier, status="rejected")
+    unit = repository.get_unit(unit_id)
+    assert (unit["is_booked"], unit["booked_from"], unit["booked_to"]) == (1, "2026-07-10", "2026-07-12")
+    assert [r["booking_id"] for r in repository.list_unit_reservations(unit_id)] == [current]
+
+
+def test_booking_without_a_usable_phone_keeps_what_the_guest_typed(db):
+    unit_id = repository.create_unit({"title": "u", "location": "x"})
+    booking_id = repository.create_booking_request(
+        unit_id=unit_id, guest_name="سارة", guest_phone="بعدين", guest_residence="طنطا"
+    )
+    (row,) = repository.list_bookings()
+    assert row["booking_id"] == booking_id and row["guest_id"] is None
+    assert (row["guest_name"], row["guest_phone"], row["guest_residence"]) == ("سارة", "بعدين", "طنطا")
+
+
+@pytest.mark.parametrize("second_stay", [("2026-07-01", "2026-07-05"), ("2026-07-04", "2026-07-08")])
+def test_concurrent_confirmations_of_overlapping_stays_admit_one(db, second_stay):
+    unit_id = repository.create_unit({"title": "u", "location": "x"})
+    bookings = [_booking(unit_id, "01011111111"), _booking(unit_id, "01022222222")]
+    stays = [("2026-07-01", "2026-07-05"), second_stay]
+    barrier = threading.Barrier(2)
+    outcomes: list = [None, None]
+
+    def confirm(i: int) -> None:
+        barrier.wait()
+        try:
+            _confirm(bookings[i], *stays[i])
+            outcomes[i] = "confirmed"
+        except Exception as exc:  # recorded and asserted below
+            outcomes[i] = exc
+
+    threads = [threading.Thread(target=confirm, args=(i,)) for i in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert outcomes.count("confirmed") == 1
+    (failure,) = [o for o in outcomes if o != "confirmed"]
+    assert isinstance(failure, repository.ReservationConflict)
+    reservations = repository.list_unit_reservations(unit_id)
+    assert len(reservations) == 1
+    with repository.get_conn() as conn:
+        overlaps = conn.execute(
+            """
+            SELECT COUNT(*) FROM unit_reservations a JOIN unit_reservations b
+              ON a.unit_id=b.unit_id AND a.reservation_id<b.reservation_id
+             AND a.start_date<=b.end_date AND b.start_date<=a.end_date
+            """
+        ).fetchone()[0]
+    assert overlaps == 0
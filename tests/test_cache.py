@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import pytest
+
+from src.db import repository
+
+
+def test_cached_rows_cannot_be_changed_by_callers(db):
+    repository.add_sponsor_media(slot="gallery", media_kind="image", url="u")
+    repository.create_unit({"title": "u", "photo_urls": ["a", "b"]})
+
+    media = repository.list_sponsor_media()
+    with pytest.raises(TypeError):
+        media[0]["url"] = "changed"
+    media.clear()
+    assert repository.list_sponsor_media()[0]["url"] == "u"
+
+    unit = repository.list_units()[0]
+    with pytest.raises(TypeError):
+        unit["title"] = "changed"
+    with pytest.raises(AttributeError):
+        unit["photo_urls"].append("c")
+    assert repository.list_units()[0]["photo_urls"] == ("a", "b")
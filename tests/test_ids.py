@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+import uuid
+
+from src.db import migrations, repository
+from src.db.ids import id_time_ms, new_id
+
+
+def test_ids_are_uuid7_and_sort_in_creation_order():
+    ids = [new_id() for _ in range(5000)]
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+    assert {uuid.UUID(i).version for i in ids} == {7}
+
+
+def test_ids_carry_their_creation_time():
+    before = int(time.time() * 1000)
+    value = new_id()
+    after = int(time.time() * 1000)
+    assert before <= id_time_ms(value) <= after
+    assert id_time_ms(new_id(1_700_000_000_000)) == 1_700_000_000_000
+    assert id_time_ms(str(uuid.uuid4())) is None
+    assert id_time_ms("not-an-id") is None
+
+
+def test_ids_stay_monotonic_across_threads():
+    per_thread: list[list[str]] = [[] for _ in range(8)]
+
+    def work(i: int) -> None:
+        per_thread[i].extend(new_id() for _ in range(2000))
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    every = [i for batch in per_thread for i in batch]
+    assert len(set(every)) == len(every)
+    for batch in per_thread:
+        assert batch == sorted(batch)
+
+
+def test_new_rows_get_time_ordered_keys(db):
+    unit_id = repository.create_unit({"title": "u"})
+    bookings = [
+        repository.create_booking_request(unit_id=unit_id, guest_name="g", guest_phone=p, guest_residence="")
+        for p in ("01011111111", "01022222222", "01033333333")
+    ]
+    assert bookings == sorted(bookings)
+    assert [b["booking_id"] for b in repository.list_bookings()] == bookings[::-1]
+    category = repository.create_guide_category("c")
+    assert uuid.UUID(category).version == 7
+
+
+def test_migration_rekeys_uuid4_rows_and_their_references(tmp_path):
+    conn = sqlite3.connect(tmp_path / "old.db")
+    for step in migrations.MIGRATIONS:
+        if migrations._version(step) <= 12:
+            step(conn)
+    conn.execute("PRAGMA user_version=12")
+    old = [str(uuid.uuid4()) for _ in range(3)]
+    conn.executemany(
+        "INSERT INTO bookings(booking_id, created_at_ms, unit_id, status) VALUES(?,?,'u','confirmed')",
+        [(b, 1_700_000_000_000 + n) for n, b in enumerate(old)],
+    )
+    conn.execute(
+        "INSERT INTO unit_reservations(unit_id, start_date, end_date, booking_id) VALUES(?,?,?,?)",
+        ("u", "2026-07-01", "2026-07-02", old[1]),
+    )
+    conn.commit()
+    migrations.migrate(conn)
+
+    rows = conn.execute("SELECT booking_id, created_at_ms FROM bookings ORDER BY booking_id").fetchall()
+    assert [id_time_ms(b) for b, _ in rows] == [ms for _, ms in rows] == sorted(ms for _, ms in rows)
+    (ref,) = conn.execute("SELECT booking_id FROM unit_reservations").fetchone()
+    assert ref == rows[1][0]
+    conn.close()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from src.db import repository
+from src.db.lead_writer import flush_leads
+
+PHONE = "01055555555"
+
+
+def _click(unit_id: str) -> str:
+    return repository.create_lead(
+        unit_id=unit_id, action="call", guest_name="g", guest_phone=PHONE, guest_residence=""
+    )
+
+
+def _hit_counts() -> dict[str, int]:
+    flush_leads()
+    return {r["lead_id"]: r["hit_count"] for r in repository.list_leads()}
+
+
+def test_repeat_click_is_a_hit_on_the_first_lead(db):
+    first = _click("u1")
+    assert _click("u1") == first
+    assert _hit_counts() == {first: 2}
+
+
+def test_repeat_click_after_delete_all_leads_writes_a_new_lead(db):
+    first = _click("u1")
+    flush_leads()
+    repository.delete_all_leads()
+    second = _click("u1")
+    assert second != first
+    assert _hit_counts() == {second: 1}
+
+
+def test_repeat_click_after_delete_leads_by_guest_writes_a_new_lead(db):
+    first = _click("u1")
+    other = repository.create_lead(
+        unit_id="u1", action="call", guest_name="o", guest_phone="01066666666", guest_residence=""
+    )
+    flush_leads()
+    assert repository.delete_leads_by_guest(PHONE) == 1
+    second = _click("u1")
+    assert second != first
+    assert repository.create_lead(
+        unit_id="u1", action="call", guest_name="o", guest_phone="01066666666", guest_residence=""
+    ) == other
+    assert _hit_counts() == {second: 1, other: 2}
+
+
+def test_lead_without_a_usable_phone_keeps_what_the_guest_typed(db):
+    repository.create_lead(
+        unit_id="u1", action="call", guest_name="سارة", guest_phone="مش معايا", guest_residence="طنطا"
+    )
+    _click("u1")
+    flush_leads()
+    rows = {r["guest_name"]: r for r in repository.list_leads()}
+    assert rows["سارة"]["guest_id"] is None
+    assert (rows["سارة"]["guest_phone"], rows["سارة"]["guest_residence"]) == ("مش معايا", "طنطا")
+    assert rows["g"]["guest_phone"] == "201055555555"
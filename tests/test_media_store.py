@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+from PIL import Image
+
+from src.db import database
+from src.media import store
+
+
+@pytest.fixture
+def media_dir(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "MEDIA_DIR", tmp_path / "media")
+    return store.MEDIA_DIR
+
+
+def _png(size: tuple[int, int] = (8, 8)) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size).save(buf, "PNG")
+    return buf.getvalue()
+
+
+def test_decompression_bomb_is_a_media_error(media_dir, monkeypatch):
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 10)
+    with pytest.raises(store.MediaError):
+        store.save_upload(_png(), "bomb.png")
+
+
+def test_unused_media_files_go_only_when_the_delete_commits(media_dir):
+    ref = store.save_upload(_png(), "p.png")
+    path = store.media_path(ref)
+
+    with pytest.raises(RuntimeError):
+        with database.transaction():
+            assert store.collect_unused_media(grace_seconds=-1)["removed"] == 1
+            raise RuntimeError("rolled back")
+    assert path.exists() and store.get_media(ref)
+
+    assert store.collect_unused_media(grace_seconds=-1)["removed"] == 1
+    assert not path.exists() and store.get_media(ref) is None
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import pytest
+
+from src.db import repository
+
+
+def _bookings(created_at_ms: list[int]) -> list[str]:
+    # Inserted directly so several rows can share a timestamp.
+    ids = [f"b{i:02d}" for i in range(len(created_at_ms))]
+    with repository.get_conn() as conn:
+        conn.executemany(
+            "INSERT INTO bookings(booking_id, created_at_ms, unit_id) VALUES(?,?,'u')",
+            list(zip(ids, created_at_ms)),
+        )
+    return ids
+
+
+def _walk(fetch, limit: int) -> tuple[list[list[str]], list]:
+    pages, cursors = [], [None]
+    while True:
+        page = fetch(limit=limit, cursor=cursors[-1])
+        pages.append([r["booking_id"] for r in page["items"]])
+        if not page["next_cursor"]:
+            return pages, cursors
+        cursors.append(page["next_cursor"])
+
+
+def test_empty_table_is_one_empty_page(db):
+    assert repository.list_bookings_page(limit=3) == {"items": [], "next_cursor": None}
+
+
+@pytest.mark.parametrize(
+    "limit, expected", [(2, [[4, 3], [2, 1], [0]]), (5, [[4, 3, 2, 1, 0]]), (9, [[4, 3, 2, 1, 0]])]
+)
+def test_pages_end_without_a_trailing_empty_page(db, limit, expected):
+    ids = _bookings([1000, 2000, 3000, 4000, 5000])
+    pages, _ = _walk(repository.list_bookings_page, limit)
+    assert pages == [[ids[i] for i in page] for page in expected]
+
+
+def test_rows_sharing_a_timestamp_are_neither_skipped_nor_repeated(db):
+    ids = _bookings([1000, 2000, 2000, 2000, 3000])
+    pages, _ = _walk(repository.list_bookings_page, 2)
+    assert pages == [[ids[4], ids[3]], [ids[2], ids[1]], [ids[0]]]
+
+
+def test_previous_page_is_the_same_after_new_rows_arrive(db):
+    ids = _bookings([1000, 2000, 3000, 4000, 5000])
+    pages, cursors = _walk(repository.list_bookings_page, 2)
+    with repository.get_conn() as conn:
+        conn.execute("INSERT INTO bookings(booking_id, created_at_ms, unit_id) VALUES('new', 9000, 'u')")
+    # Going back pops the cursor stack and re-reads the earlier cursor.
+    for cursor, page in reversed(list(zip(cursors[1:], pages[1:]))):
+        assert [r["booking_id"] for r in repository.list_bookings_page(limit=2, cursor=cursor)["items"]] == page
+    assert [r["booking_id"] for r in repository.list_bookings_page(limit=2)["items"]] == ["new", ids[4]]
+
+
+def test_units_page_forward_in_code_order(db):
+    units = [repository.create_unit({"title": f"u{i}"}) for i in range(3)]
+    first = repository.list_units_page(limit=2)
+    second = repository.list_units_page(limit=2, cursor=first["next_cursor"])
+    assert [u["unit_id"] for u in first["items"]] == units[:2]
+    assert [u["unit_id"] for u in second["items"]] == units[2:]
+    assert second["next_cursor"] is None
+
+
+def test_tampered_cursor_is_rejected(db):
+    with pytest.raises(ValueError):
+        repository.list_bookings_page(limit=2, cursor="not-a-cursor")
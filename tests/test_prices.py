@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import pytest
+
+from src.db import repository
+from src.db.prices import parse_price
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("1500", 1500),
+        ("١٥٠٠", 1500),
+        ("۱۵۰۰", 1500),
+        ("1,500", 1500),
+        ("١٬٥٠٠", 1500),
+        ("1،500", 1500),
+        ("1,500 جنيه", 1500),
+        ("9000 EGP", 9000),
+        ("750 ج.م", 750),
+        ("  2500  ", 2500),
+        ("99.6", 100),
+        ("", None),
+        ("   ", None),
+        (None, None),
+    ],
+)
+def test_parse_price_accepts_what_admins_type(text, expected):
+    assert parse_price(text) == expected
+
+
+@pytest.mark.parametrize("text", ["abc", "call us", "1500-2000", "-5", "1.2.3", "جنيه", "$100"])
+def test_parse_price_rejects_garbage(text):
+    with pytest.raises(ValueError):
+        parse_price(text)
+
+
+def test_unit_prices_are_stored_as_numbers_for_filtering(db):
+    cheap = repository.create_unit({"title": "a", "price_day": "٨٠٠ جنيه"})
+    repository.create_unit({"title": "b", "price_day": "2,000"})
+    with pytest.raises(ValueError):
+        repository.create_unit({"title": "c", "price_day": "غالي"})
+    found = repository.search_units(max_price=1000)
+    assert [u.unit_id for u in found["items"]] == [cheap]
+    assert found["items"][0].price_day == "٨٠٠ جنيه"
@@ -0,0 +1,257 @@
+"""Every statement the data layer issues must be answerable without a full
+table scan. Statements are recorded with a trace callback while the real
+functions run, then EXPLAINed one by one, so the check cannot drift from the
+code the way a hand-copied list of queries does."""
+from __future__ import annotations
+
+import inspect
+import re
+import threading
+from datetime import date
+
+import pytest
+
+from src.db import availability, repository, seed
+from src.db.bootstrap import run_bootstrap
+from src.db.indexes import full_scans
+from src.db.lead_writer import flush_leads
+from src.media import store
+
+# Functions whose contract is "every row" (admin tables, catalog lists that
+# are cached whole, the availability index build). Scanning is the point.
+WHOLE_TABLE_READS = {
+    "list_units",
+    "list_unit_cards",
+    "list_unit_facets",
+    "list_sponsor_media",
+    "list_guide_categories",
+    "list_guide_items",
+    "availability.build",
+    "store.media_stats",
+    "store.collect_unused_media",
+    "thumbnails._load",
+}
+
+# Statements that read every match by contract: (call, statement pattern).
+EXPECTED_SCANS = (
+    # count=True asks for the number of all matches; the home grid pages
+    # with count=False instead.
+    ("search_units", re.compile(r"^SELECT COUNT\(\*\)")),
+    ("list_available_units", re.compile(r"^SELECT COUNT\(\*\)")),
+    # Stay filters inside the indexed season walk the matching ids in page
+    # order and test each against the availability index; count=False stops
+    # after the page.
+    ("search_units", re.compile(r"^SELECT unit_id FROM units .*ORDER BY")),
+    ("list_available_units", re.compile(r"^SELECT unit_id FROM units .*ORDER BY")),
+    # Walks the partial index of new requests only (is_new_admin=1).
+    ("count_new_booking_requests", re.compile(r"^SELECT COUNT\(\*\) AS c FROM bookings WHERE is_new_admin=1$")),
+)
+
+_DML = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|REPLACE|WITH)\b", re.IGNORECASE)
+
+
+@pytest.fixture
+def traced(db, monkeypatch):
+    db.close_pool()
+    recorded: list[str] = []
+    lock = threading.Lock()
+    connect = db.ConnectionPool._connect
+
+    def record(sql: str) -> None:
+        # Background index rebuilds run availability.build, a whole-table
+        # read by contract, whenever a call happens to bump a generation.
+        if threading.current_thread().name == "availability-rebuild":
+            return
+        with lock:
+            recorded.append(sql)
+
+    def traced_connect(self):
+        conn = connect(self)
+        conn.set_trace_callback(record)
+        return conn
+
+    monkeypatch.setattr(db.ConnectionPool, "_connect", traced_connect)
+    db.init_db()
+    return recorded
+
+
+def _calls(ctx: dict) -> dict[str, callable]:
+    unit, unit2 = ctx["unit"], ctx["unit2"]
+    return {
+        "get_meta": lambda: repository.get_meta("bootstrap.seeded_at"),
+        "set_meta": lambda: repository.set_meta("test.key", "1"),
+        "reserve_unit_ids": lambda: repository.reserve_unit_ids(2),
+        "list_units": lambda: (repository.list_units.uncached(True), repository.list_units.uncached(False)),
+        "list_units_page": lambda: repository.list_units_page(
+            limit=1, cursor=repository.list_units_page(limit=1)["next_cursor"]
+        ),
+        "list_unit_cards": lambda: repository.list_unit_cards.uncached(True),
+        "list_unit_facets": lambda: repository.list_unit_facets(),
+        "search_units": lambda: [
+            repository.search_units(**kw)
+            for kw in (
+                {},
+                {"count": False},
+                {"location": "الساحل الشمالي"},
+                {"location": "الساحل الشمالي", "property_type": "شقة", "min_rooms": 2},
+                {"property_type": "شقة"},
+                {"search": "شقة"},
+                {"min_price": 100, "max_price": 5000},
+                {"sort": "price_asc", "count": False},
+                {"sort": "price_desc", "count": False},
+                {"stay_from": "2026-07-01", "stay_to": "2026-07-05"},
+                {"stay_from": "2030-07-01", "stay_to": "2030-07-05"},
+                {"stay_from": ctx["soon"], "stay_to": ctx["soon"], "count": False},
+                {"stay_from": ctx["soon"], "stay_to": ctx["soon"], "search": "شقة", "sort": "price_asc"},
+            )
+        ],
+        "get_unit": lambda: repository.get_unit(unit),
+        "get_units": lambda: repository.get_units([unit, unit2]),
+        "create_unit": lambda: repository.create_unit({"title": "x", "price_day": "100"}),
+        "update_unit": lambda: repository.update_unit(unit2, {"title": "y", "price_day": "200"}),
+        "find_overlapping_reservations": lambda: repository.find_overlapping_reservations(
+            unit, "2026-07-01", "2026-07-09"
+        ),
+        "list_unit_reservations": lambda: repository.list_unit_reservations(unit),
+        "set_unit_booking_status": lambda: repository.set_unit_booking_status(
+            unit_id=unit2, is_booked=True, booked_from="2026-08-01", booked_to="2026-08-03"
+        ),
+        "list_available_units": lambda: (
+            repository.list_available_units("2026-07-01", "2026-07-05"),
+            repository.list_available_units("2030-07-01", "2030-07-05"),
+            repository.list_available_units(ctx["soon"], ctx["soon"]),
+        ),
+        "create_lead": lambda: repository.create_lead(
+            unit_id=unit, action="call", guest_name="g", guest_phone="01011111111", guest_residence=""
+        ),
+        "list_leads": lambda: repository.list_leads(),
+        "list_leads_page": lambda: [
+            repository.list_leads_page(**kw)
+            for kw in (
+                {},
+                {"unit_id": unit},
+                {"action": "call"},
+                {"date_from": "2020-01-01", "date_to": "2100-01-01"},
+                {"cursor": repository.list_leads_page(limit=1)["next_cursor"], "limit": 1},
+            )
+        ],
+        "delete_all_leads": lambda: repository.delete_all_leads(),
+        "get_guest": lambda: repository.get_guest("01022222222"),
+        "list_guest_activity": lambda: repository.list_guest_activity("01022222222"),
+        "delete_leads_by_guest": lambda: repository.delete_leads_by_guest("01022222222"),
+        "create_booking_request": lambda: repository.create_booking_request(
+            unit_id=unit, guest_name="b", guest_phone="01033333333", guest_residence=""
+        ),
+        "count_new_booking_requests": lambda: repository.count_new_booking_requests(),
+        "list_bookings": lambda: repository.list_bookings(),
+        "list_bookings_page": lambda: [
+            repository.list_bookings_page(**kw)
+            for kw in (
+                {},
+                {"unit_id": unit},
+                {"status": "new"},
+                {"is_new_admin": True},
+                {"is_new_admin": False},
+                {"date_from": "2020-01-01", "date_to": "2100-01-01"},
+                {"cursor": repository.list_bookings_page(limit=1)["next_cursor"], "limit": 1},
+            )
+        ],
+        "review_booking": lambda: repository.review_booking(
+            booking_id=ctx["booking"], status="confirmed", booked_from="2026-07-10", booked_to="2026-07-12"
+        ),
+        "add_sponsor_media": lambda: repository.add_sponsor_media(slot="gallery", media_kind="image", url="u"),
+        "update_sponsor_media": lambda: repository.update_sponsor_media(
+            ctx["sponsor"], slot="gallery", media_kind="image", url="v"
+        ),
+        "list_sponsor_media": lambda: (
+            repository.list_sponsor_media.uncached(True),
+            repository.list_sponsor_media.uncached(False),
+        ),
+        "delete_sponsor_media": lambda: repository.delete_sponsor_media(ctx["sponsor"]),
+        "list_guide_categories": lambda: (
+            repository.list_guide_categories.uncached(True),
+            repository.list_guide_categories.uncached(False),
+        ),
+        "create_guide_category": lambda: repository.create_guide_category("c"),
+        "update_guide_category": lambda: repository.update_guide_category(ctx["category"], "c2"),
+        "list_guide_items": lambda: (
+            repository.list_guide_items.uncached(True),
+            repository.list_guide_items.uncached(False),
+        ),
+        "create_guide_item": lambda: repository.create_guide_item(category_id=ctx["category"], name="i"),
+        "update_guide_item": lambda: repository.update_guide_item(ctx["item"], category_id=ctx["category"], name="j"),
+        "delete_guide_item": lambda: repository.delete_guide_item(ctx["item"]),
+        "delete_guide_category": lambda: repository.delete_guide_category(ctx["category"]),
+        "seed.backfill_media_links": lambda: seed.backfill_media_links("2000-01-01 00:00:00"),
+        "availability.build": lambda: (availability.reset(), availability.free_unit_ids("2026-07-01", "2026-07-02")),
+        "store.save_upload": lambda: store.save_upload(ctx["png"], "p.png"),
+        "store.get_media": lambda: store.get_media(ctx["media"]),
+        "store.media_stats": lambda: store.media_stats(),
+        "store.collect_unused_media": lambda: store.collect_unused_media(),
+    }
+
+
+def _setup(tmp_path, monkeypatch) -> dict:
+    import io
+
+    from PIL import Image
+
+    monkeypatch.setattr(store, "MEDIA_DIR", tmp_path / "media")
+    run_bootstrap()
+    units = [u.unit_id for u in repository.list_unit_cards.uncached(False)]
+    png = io.BytesIO()
+    Image.new("RGB", (4, 4)).save(png, "PNG")
+    ctx = {"unit": units[0], "unit2": units[1], "png": png.getvalue(), "soon": date.today().isoformat()}
+    ctx["media"] = store.save_upload(ctx["png"], "p.png")
+    repository.create_lead(unit_id=units[0], action="whatsapp", guest_name="a", guest_phone="01022222222",
+                           guest_residence="")
+    repository.create_lead(unit_id=units[1], action="call", guest_name="a", guest_phone="01044444444",
+                           guest_residence="")
+    flush_leads()
+    ctx["booking"] = repository.create_booking_request(
+        unit_id=units[0], guest_name="a", guest_phone="01022222222", guest_residence=""
+    )
+    ctx["sponsor"] = repository.add_sponsor_media(slot="gallery", media_kind="image", url=ctx["media"])
+    ctx["category"] = repository.create_guide_category("tmp")
+    ctx["item"] = repository.create_guide_item(category_id=ctx["category"], name="tmp", image_url=ctx["media"])
+    # Build the availability index now so its whole-table read is not
+    # attributed to the first search.
+    availability.free_unit_ids("2026-07-01", "2026-07-02")
+    return ctx
+
+
+def test_every_repository_function_is_exercised(db, tmp_path, monkeypatch):
+    ctx = _setup(tmp_path, monkeypatch)
+    public = {
+        name
+        for name, fn in inspect.getmembers(repository, inspect.isfunction)
+        if not name.startswith("_") and fn.__module__ == repository.__name__
+    }
+    assert public - set(_calls(ctx)) == set()
+
+
+def test_no_statement_needs_a_full_scan(traced, tmp_path, monkeypatch):
+    ctx = _setup(tmp_path, monkeypatch)
+    by_call: dict[str, list[str]] = {}
+    for name, call in _calls(ctx).items():
+        traced.clear()
+        call()
+        flush_leads()
+        by_call[name] = list(traced)
+    traced.clear()
+    from src.media.thumbnails import Thumbnails
+
+    Thumbnails(root=tmp_path / "thumbs")._load()
+    by_call["thumbnails._load"] = list(traced)
+
+    problems = []
+    with repository.get_conn() as conn:
+        for name, statements in by_call.items():
+            if name in WHOLE_TABLE_READS:
+                continue
+            for sql in dict.fromkeys(" ".join(s.split()) for s in statements if _DML.match(s)):
+                if any(call == name and pattern.search(sql) for call, pattern in EXPECTED_SCANS):
+                    continue
+                for table, line in full_scans(conn, sql):
+                    problems.append(f"{name}: {line}\n    {sql[:300]}")
+    assert not problems, "full table scans:\n" + "\n".join(problems)
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from src.db import repository
+from src.ui.run_scope import loader, memo, run_scope
+
+
+class _Counting:
+    def __init__(self, fn) -> None:
+        self.fn = fn
+        self.calls: list = []
+
+    def __call__(self, *args):
+        self.calls.append(args)
+        return self.fn(*args)
+
+
+def test_wanted_units_load_with_one_query(db):
+    units = [repository.create_unit({"title": f"u{i}"}) for i in range(5)]
+    fetch = _Counting(repository.get_units)
+    with run_scope():
+        units_loader = loader(fetch)
+        units_loader.want(*units, "SH-9999")
+        cards = [units_loader.load(u) for u in units]
+        assert loader(fetch) is units_loader
+        assert units_loader.load("SH-9999") is None
+        assert units_loader.load(units[0]) is cards[0]
+    assert [c["unit_id"] for c in cards] == units
+    assert fetch.calls == [(sorted([*units, "SH-9999"]),)]
+
+
+def test_a_write_in_the_run_drops_what_was_loaded(db):
+    unit = repository.create_unit({"title": "old"})
+    fetch = _Counting(repository.get_units)
+    with run_scope():
+        assert loader(fetch).load(unit)["title"] == "old"
+        assert memo(repository.get_unit, unit)["title"] == "old"
+        repository.update_unit(unit, {"title": "new"})
+        assert loader(fetch).load(unit)["title"] == "new"
+        assert memo(repository.get_unit, unit)["title"] == "new"
+    assert len(fetch.calls) == 2
+
+
+def test_memo_answers_identical_reads_once_per_run(db):
+    repository.create_unit({"title": "u"})
+    read = _Counting(repository.list_units.uncached)
+    with run_scope():
+        assert memo(read, True) is memo(read, True)
+        memo(read, False)
+    with run_scope():
+        memo(read, True)
+    assert read.calls == [(True,), (False,), (True,)]
+
+
+def test_without_a_run_nothing_is_kept(db):
+    unit = repository.create_unit({"title": "u"})
+    fetch = _Counting(repository.get_units)
+    loader(fetch).load(unit)
+    loader(fetch).load(unit)
+    assert len(fetch.calls) == 2
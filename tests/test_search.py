@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import sqlite3
+
+from src.db import bootstrap, database, repository
+
+
+def _found(text: str) -> list[str]:
+    return [u.unit_id for u in repository.search_units(search=text)["items"]]
+
+
+def test_spelling_variants_and_the_definite_article_match(db):
+    unit = repository.create_unit({"title": "شالية العين السخنة", "location": "أسماك"})
+    for text in ("شاليه", "عين", "العين", "السخنه", "اسماك", "الأسماك"):
+        assert _found(text) == [unit], text
+
+
+def test_update_unit_reindexes_the_new_text(db):
+    unit = repository.create_unit({"title": "استوديو"})
+    repository.update_unit(unit, {"title": "فيلا"})
+    assert _found("فيلا") == [unit]
+    assert _found("استوديو") == []
+
+
+def test_plain_sqlite_connections_can_write_units(db):
+    kept, dropped = repository.create_unit({"title": "استوديو"}), repository.create_unit({"title": "استوديو"})
+    conn = sqlite3.connect(database.DB_PATH)
+    with conn:
+        conn.execute("UPDATE units SET title='الشالية' WHERE unit_id=?", (kept,))
+        conn.execute("DELETE FROM units WHERE unit_id=?", (dropped,))
+    conn.close()
+    assert _found("استوديو") == [kept]
+
+    bootstrap.run_bootstrap(reindex_search=True)
+    assert _found("شاليه") == [kept]
+    assert _found("استوديو") == []
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import pytest
+
+from src.db import repository
+
+
+def _confirm(booking_id: str, start: str, end: str) -> None:
+    repository.review_booking(booking_id=booking_id, status="confirmed", booked_from=start, booked_to=end)
+
+
+def _counts() -> tuple[int, int, int]:
+    with repository.get_conn() as conn:
+        return tuple(
+            conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("units", "bookings", "unit_reservations")
+        )
+
+
+def test_confirming_a_booking_is_one_commit(db):
+    unit_id = repository.create_unit({"title": "u"})
+    booking_id = repository.create_booking_request(
+        unit_id=unit_id, guest_name="g", guest_phone="01011111111", guest_residence=""
+    )
+    before = db.get_pool().commits
+    _confirm(booking_id, "2026-07-01", "2026-07-03")
+    assert db.get_pool().commits - before == 1
+    unit = repository.get_unit(unit_id)
+    assert (unit["is_booked"], unit["booked_from"], unit["booked_to"]) == (1, "2026-07-01", "2026-07-03")
+    assert [r["booking_id"] for r in repository.list_unit_reservations(unit_id)] == [booking_id]
+
+
+def test_a_failing_step_rolls_back_the_whole_unit_of_work(db):
+    ran = []
+    with pytest.raises(repository.ReservationConflict):
+        with db.transaction():
+            unit_id = repository.create_unit({"title": "u"})
+            first, second = (
+                repository.create_booking_request(unit_id=unit_id, guest_name="g", guest_phone=p, guest_residence="")
+                for p in ("01011111111", "01022222222")
+            )
+            db.after_commit(ran.append, "committed")
+            _confirm(first, "2026-07-01", "2026-07-05")
+            # Overlaps the stay above, so this step raises.
+            _confirm(second, "2026-07-03", "2026-07-08")
+    assert _counts() == (0, 0, 0)
+    assert ran == []
+    assert not db.in_transaction()
+
+
+def test_nested_repository_calls_share_the_outer_commit(db):
+    before = db.get_pool().commits
+    with db.transaction():
+        unit_id = repository.create_unit({"title": "u"})
+        repository.create_booking_request(
+            unit_id=unit_id, guest_name="g", guest_phone="01011111111", guest_residence=""
+        )
+        assert db.in_transaction()
+    assert db.get_pool().commits - before == 1
+    assert _counts() == (1, 1, 0)
+
+
+def test_deleting_a_category_removes_its_items_in_one_commit(db):
+    category = repository.create_guide_category("c")
+    repository.create_guide_item(category_id=category, name="i")
+    before = db.get_pool().commits
+    repository.delete_guide_category(category)
+    assert db.get_pool().commits - before == 1
+    assert repository.list_guide_items.uncached(False) == []
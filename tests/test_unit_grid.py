@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import pytest
+
+from src.db import repository
+
+PRICES = ["500", "", "1500", "500", "900", "", "2000"]
+
+
+def _pages(page_size: int, **filters) -> list[list[str]]:
+    # What the home grid does: count=False, next page while has_more.
+    pages, page_no = [], 1
+    while True:
+        result = repository.search_units(**filters, limit=page_size, offset=(page_no - 1) * page_size, count=False)
+        assert result["total"] is None
+        pages.append([c.unit_id for c in result["items"]])
+        if not result["has_more"]:
+            return pages
+        page_no += 1
+
+
+@pytest.fixture
+def units(db) -> list[str]:
+    return [repository.create_unit({"title": f"u{i}", "price_day": p}) for i, p in enumerate(PRICES)]
+
+
+@pytest.mark.parametrize("sort", ["code", "price_asc", "price_desc"])
+@pytest.mark.parametrize("page_size", [2, 3, 7, 10])
+def test_pages_cover_every_unit_once_in_a_stable_order(units, sort, page_size):
+    pages = _pages(page_size, sort=sort)
+    flat = [u for page in pages for u in page]
+    assert flat == [c.unit_id for c in repository.search_units(sort=sort, limit=100)["items"]]
+    assert sorted(flat) == sorted(units)
+    assert all(len(page) == page_size for page in pages[:-1])
+    assert 0 < len(pages[-1]) <= page_size
+
+
+def test_price_sorts_keep_unpriced_units_last_and_break_ties_by_code(units):
+    def flat(sort: str) -> list[str]:
+        return [u for page in _pages(3, sort=sort) for u in page]
+
+    assert flat("price_asc") == [units[i] for i in (0, 3, 4, 2, 6, 1, 5)]
+    assert flat("price_desc") == [units[i] for i in (6, 2, 4, 0, 3, 1, 5)]
+
+
+def test_a_filter_with_no_matches_is_one_empty_page(units):
+    assert _pages(3, location="nowhere") == [[]]
+
+
+def test_units_page_walks_every_unit_with_its_cursor(units):
+    seen, cursor = [], None
+    while True:
+        page = repository.list_units_page(limit=3, cursor=cursor)
+        seen += [u["unit_id"] for u in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert seen == units
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import re
+import threading
+
+from src.db import repository
+
+THREADS = 8
+PER_THREAD = 25
+
+
+def test_concurrent_create_unit_issues_unique_codes(db):
+    issued: list[list[str]] = [[] for _ in range(THREADS)]
+    errors: list[BaseException] = []
+    barrier = threading.Barrier(THREADS)
+
+    def work(i: int) -> None:
+        barrier.wait()
+        try:
+            for n in range(PER_THREAD):
+                issued[i].append(repository.create_unit({"title": f"t{i}-{n}", "location": "x"}))
+        except BaseException as exc:  # noqa: BLE001
+            errors.append(exc)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    codes = [code for batch in issued for code in batch]
+    assert len(codes) == len(set(codes)) == THREADS * PER_THREAD
+    assert all(re.fullmatch(r"SH-\d{4,}", code) for code in codes)
+    assert sorted(int(code[3:]) for code in codes) == list(range(1, THREADS * PER_THREAD + 1))
+    # Each thread sees its own codes in increasing order.
+    for batch in issued:
+        assert batch == sorted(batch, key=lambda code: int(code[3:]))